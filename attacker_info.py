@@ -7,7 +7,8 @@ attacker_info_logger.py — Collect rich host/network metadata after a failed lo
   OS/arch, default gateway, and optional geolocation (City/Region/Country, ASN).
 * Hardens storage with SHA‑256 integrity tag + optional AES‑GCM encryption hook.
 * Gracefully degrades when offline or when interfaces are down; never crashes.
-* Designed to be imported OR executed as a CLI tool.
+* Designed to be imported OR executed as a CLI tool.  Importing is cheap: requests,
+  psutil & friends load on first use and LOG_DIR is created on first write.
 
 Example usage:
     from attacker_info_logger import collect_attacker_info, save_json_log
@@ -18,15 +19,17 @@ Auther : SpectralZero
 """
 from __future__ import annotations
 
-import json, os, socket, platform, datetime, hashlib, logging, pathlib
-from dataclasses import dataclass, asdict, field
-from typing import Dict, List, Tuple, Optional
+import json, os, datetime, pathlib, time, threading, functools
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, Iterator, List, Tuple, Optional
 
-import getpass, uuid, psutil, requests
+# Heavy / side‑effecting imports (requests, psutil, uuid, platform, concurrent.futures,
+# hashlib, logging, …) are done inside the functions that need them — short‑lived
+# workers that only format or save an existing record never pay for them.
 
 # ─────────────────────────── configuration ────────────────────────────
-LOG_DIR = pathlib.Path(__file__).with_name(pathlib.Path(__file__).stem + "_logs")
-LOG_DIR.mkdir(exist_ok=True)
+LOG_DIR = pathlib.Path(__file__).with_name(pathlib.Path(__file__).stem + "_logs")   # created on first write
 TIME_FMT          = "%Y-%m-%dT%H:%M:%S.%fZ"   # ISO‑8601‑R w/ milliseconds
 PUBLIC_IP_SVC     = [
     "https://api.ipify.org?format=json",
@@ -34,6 +37,14 @@ PUBLIC_IP_SVC     = [
 ]
 GEO_IP_SVC        = "https://ipinfo.io/{ip}/json"
 VERIFY_SSL        = True                       # flip for air‑gapped nets
+HTTP_TIMEOUT      = 3                          # per‑request timeout (s)
+COLLECT_DEADLINE  = 2.5                        # overall budget for collect_attacker_info(deadline=…)
+TIMED_OUT         = "<timed out>"              # placeholder for probes that missed the deadline
+PUBLIC_IP_TTL     = 300                        # seconds a looked‑up public IP is trusted
+GEO_TTL           = 24 * 3600                  # seconds a geo record is trusted
+GEO_CACHE_SIZE    = 256                        # max distinct IPs kept in the geo LRU
+GEOIP_DB          = os.environ.get("ATTACKER_INFO_GEOIP_DB")   # compiled offline db (attacker_info_geoip)
+GEO_HTTP_FALLBACK = os.environ.get("ATTACKER_INFO_GEO_HTTP_FALLBACK") == "1"   # db miss → GEO_IP_SVC (opt‑in)
 
 # ─────────────────────────── core dataclass ────────────────────────────
 @dataclass(slots=True)
@@ -52,32 +63,181 @@ class SystemInfo:
     mac_addresses: Dict[str, str]   = field(default_factory=dict)
     default_gateway: Optional[str]  = None
     uuid_hash: str                  = ""
+    timed_out: List[str]            = field(default_factory=list)   # fields that missed the deadline
+
+SYSTEMINFO_FIELDS = tuple(f.name for f in fields(SystemInfo))
+
+NetInfo = Tuple[Dict[str, List[str]], Dict[str, str], Optional[str]]   # (local_ips, macs, gateway)
+
+# ─────────────────────────── caching ──────────────────────────────────
+
+class TTLCache:
+    """Thread‑safe LRU with per‑entry expiry and hit/miss/eviction counters."""
+
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl, self.maxsize = ttl, maxsize
+        self.hits = self.misses = self.evictions = 0
+        self._data: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def put(self, key: Any, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self._data)}
+
+
+_ip_cache  = TTLCache(ttl=PUBLIC_IP_TTL, maxsize=1)
+_geo_cache = TTLCache(ttl=GEO_TTL, maxsize=GEO_CACHE_SIZE)
+_iface_fingerprint: Optional[int] = None
+_iface_invalidations = 0
+_geoip = None                                  # opened GeoIPDB, or False once opening failed
+_geoip_lock = threading.Lock()
+_geoip_counts = {"hits": 0, "misses": 0}
+
+
+def _check_iface_change(addrs: Dict[str, list]) -> None:
+    """Drop the cached public IP when the set of interfaces/addresses changes."""
+    global _iface_fingerprint, _iface_invalidations
+    fp = hash(frozenset((iface, a.family, a.address) for iface, lst in addrs.items() for a in lst))
+    if _iface_fingerprint is not None and fp != _iface_fingerprint:
+        _ip_cache.clear()
+        _iface_invalidations += 1
+    _iface_fingerprint = fp
+
+
+def configure_cache(public_ip_ttl: float | None = None, geo_ttl: float | None = None,
+                    geo_size: int | None = None) -> None:
+    if public_ip_ttl is not None:
+        _ip_cache.ttl = public_ip_ttl
+    if geo_ttl is not None:
+        _geo_cache.ttl = geo_ttl
+    if geo_size is not None:
+        _geo_cache.maxsize = geo_size
+
+
+def configure_geoip(db: str | os.PathLike | None, http_fallback: bool = False) -> None:
+    """Point geo lookups at a compiled offline db (None = HTTP only).
+
+    With a db, addresses it does not know stay without geo data unless
+    `http_fallback` is set, in which case they are sent to GEO_IP_SVC.
+    """
+    global GEOIP_DB, GEO_HTTP_FALLBACK, _geoip
+    with _geoip_lock:
+        if _geoip:
+            _geoip.close()
+        GEOIP_DB, GEO_HTTP_FALLBACK, _geoip = (None if db is None else str(db)), http_fallback, None
+    _geo_cache.clear()
+
+
+def clear_caches() -> None:
+    _ip_cache.clear()
+    _geo_cache.clear()
+    _collect_host_facts.cache_clear()
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    """Counters for monitoring: one entry per cache layer."""
+    hf = _collect_host_facts.cache_info()
+    return {
+        "host_facts": {"hits": hf.hits, "misses": hf.misses, "evictions": 0, "size": hf.currsize},
+        "public_ip":  {**_ip_cache.stats(), "iface_invalidations": _iface_invalidations},
+        "geo":        _geo_cache.stats(),
+        "geoip_db":   dict(_geoip_counts),
+    }
 
 # ─────────────────────────── helpers ──────────────────────────────────
 
+def _fetch_public_ip(url: str, timeout: float = HTTP_TIMEOUT) -> str:
+    import requests
+    r = requests.get(url, timeout=timeout, verify=VERIFY_SSL)
+    r.raise_for_status()
+    return r.json()["ip"] if r.headers.get("content-type", "").startswith("application/json") else r.text.strip()
+
+
+def _fetch_geo(ip: str, timeout: float = HTTP_TIMEOUT) -> Optional[Dict[str, str]]:
+    # Attempt basic geo lookup (no API‑key required)
+    import requests
+    try:
+        return requests.get(GEO_IP_SVC.format(ip=ip), timeout=timeout, verify=VERIFY_SSL).json()
+    except Exception:
+        return None
+
+
+def _local_geo(ip: str) -> Optional[Dict[str, str]]:
+    global _geoip
+    if _geoip is None:
+        with _geoip_lock:
+            if _geoip is None:
+                try:
+                    from attacker_info_geoip import GeoIPDB
+                    _geoip = GeoIPDB(GEOIP_DB)
+                except Exception:
+                    _geoip = False                 # unreadable db: don't retry on every event
+    if not _geoip:
+        return None
+    geo = _geoip.lookup(ip)
+    _geoip_counts["hits" if geo is not None else "misses"] += 1
+    return geo
+
+
+def _lookup_geo(ip: str, timeout: float = HTTP_TIMEOUT) -> Optional[Dict[str, str]]:
+    geo = _geo_cache.get(ip)
+    if geo is None:
+        if GEOIP_DB:
+            geo = _local_geo(ip)
+            if geo is None and GEO_HTTP_FALLBACK:
+                geo = _fetch_geo(ip, timeout)
+        else:
+            geo = _fetch_geo(ip, timeout)
+        if geo is not None:
+            _geo_cache.put(ip, geo)
+    return geo
+
+
 def _get_public_ip() -> Tuple[Optional[str], Optional[Dict[str, str]]]:
-    for url in PUBLIC_IP_SVC:
-        try:
-            r = requests.get(url, timeout=3, verify=VERIFY_SSL)
-            r.raise_for_status()
-            ip = r.json()["ip"] if r.headers.get("content-type", "").startswith("application/json") else r.text.strip()
-            # Attempt basic geo lookup (no API‑key required)
+    ip = _ip_cache.get("public")
+    if ip is None:
+        for url in PUBLIC_IP_SVC:
             try:
-                geo = requests.get(GEO_IP_SVC.format(ip=ip), timeout=3, verify=VERIFY_SSL).json()
+                ip = _fetch_public_ip(url)
             except Exception:
-                geo = None
-            return ip, geo
-        except Exception:
-            continue
-    return None, None
+                continue
+            _ip_cache.put("public", ip)
+            break
+        else:
+            return None, None
+    return ip, _lookup_geo(ip)
 
 
-def _collect_net_info() -> Tuple[Dict[str, List[str]], Dict[str, str], Optional[str]]:
+def _collect_net_info(if_addrs: Optional[Dict[str, list]] = None) -> NetInfo:
+    import socket, psutil
     local_ips: Dict[str, List[str]] = {}
     macs: Dict[str, str] = {}
     gw: Optional[str] = None
 
-    for iface, addrs in psutil.net_if_addrs().items():
+    for iface, addrs in (if_addrs if if_addrs is not None else psutil.net_if_addrs()).items():
         for a in addrs:
             if a.family in (socket.AF_INET, socket.AF_INET6):
                 local_ips.setdefault(iface, []).append(a.address)
@@ -92,40 +252,178 @@ def _collect_net_info() -> Tuple[Dict[str, List[str]], Dict[str, str], Optional[
     return local_ips, macs, gw
 
 
+@functools.lru_cache(maxsize=None)
+def _collect_host_facts() -> Dict[str, str]:
+    """Facts that cannot change during the process lifetime — computed once. Treat as read‑only."""
+    import getpass, hashlib, platform, socket, uuid
+    return {
+        "hostname":     socket.gethostname(),
+        "username":     getpass.getuser(),
+        "os":           platform.system(),
+        "os_release":   platform.release(),
+        "os_version":   platform.version(),
+        "architecture": platform.machine(),
+        "uuid_hash":    hashlib.sha256(str(uuid.getnode()).encode()).hexdigest(),
+    }
+
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def timestamp_to_us(ts: str) -> int:
+    """TIME_FMT string → integer µs since the epoch (inverse of `us_to_timestamp`)."""
+    try:                                  # fast path for the default ISO format
+        dt = datetime.datetime.fromisoformat(ts[:-1] if ts.endswith("Z") else ts)
+    except ValueError:
+        dt = datetime.datetime.strptime(ts, TIME_FMT)
+    d = dt.replace(tzinfo=None) - _EPOCH
+    return (d.days * 86_400 + d.seconds) * 1_000_000 + d.microseconds
+
+
+@functools.lru_cache(maxsize=4096)
+def _second_fmt(sec: int) -> str:
+    """TIME_FMT rendered for one whole second, with %f left as a hole."""
+    return (_EPOCH + datetime.timedelta(seconds=sec)).strftime(TIME_FMT.replace("%f", "%%f"))
+
+
+def us_to_timestamp(us: int) -> str:
+    sec, frac = divmod(us, 1_000_000)
+    return _second_fmt(sec).replace("%f", f"{frac:06d}", 1)
+
+
+def _left(end: float) -> float:
+    return max(end - time.monotonic(), 0.0)
+
+
+def _collect_concurrent(deadline: float, if_addrs: Dict[str, list]) -> Tuple[Dict[str, str], Optional[str], Optional[Dict[str, str]], NetInfo, List[str]]:
+    """Run every probe in parallel and give up on whatever is still running after `deadline` seconds.
+
+    Public‑IP providers race each other; the first good answer wins and the rest are cancelled
+    (those already in flight are bounded by the same deadline and their results discarded).
+    """
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+    end = time.monotonic() + deadline
+    timed_out: List[str] = []
+    pool = ThreadPoolExecutor(max_workers=len(PUBLIC_IP_SVC) + 3, thread_name_prefix="attacker_info")
+    try:
+        host_f = pool.submit(_collect_host_facts)
+        net_f  = pool.submit(_collect_net_info, if_addrs)
+
+        public_ip: Optional[str] = _ip_cache.get("public")
+        geo: Optional[Dict[str, str]] = None
+        pending = set() if public_ip is not None else \
+            {pool.submit(_fetch_public_ip, url, min(HTTP_TIMEOUT, deadline)) for url in PUBLIC_IP_SVC}
+        while pending and public_ip is None:
+            done, pending = wait(pending, timeout=_left(end), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for f in done:
+                if f.exception() is None:
+                    public_ip = f.result()
+                    _ip_cache.put("public", public_ip)
+                    break
+        for f in pending:
+            f.cancel()
+
+        if public_ip is not None:
+            geo_f = pool.submit(_lookup_geo, public_ip, max(_left(end), 0.05))
+            if wait([geo_f], timeout=_left(end)).done:
+                geo = geo_f.result()
+            else:
+                timed_out.append("geo")
+        elif pending:
+            timed_out += ["public_ip", "geo"]
+
+        wait([host_f, net_f], timeout=_left(end))
+        if host_f.done() and host_f.exception() is None:
+            host = host_f.result()
+        else:
+            host = dict.fromkeys(("hostname", "username", "os", "os_release", "os_version",
+                                  "architecture", "uuid_hash"), TIMED_OUT)
+            timed_out += list(host)
+        if net_f.done() and net_f.exception() is None:
+            net = net_f.result()
+        else:
+            net = ({}, {}, None)
+            timed_out += ["local_ips", "mac_addresses", "default_gateway"]
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return host, public_ip, geo, net, timed_out
+
+
 # ─────────────────────────── public API ───────────────────────────────
 
-def collect_attacker_info() -> SystemInfo:
+def collect_attacker_info(deadline: float | None = None) -> SystemInfo:
+    """Gather host/network metadata.
+
+    With `deadline` (seconds) every probe runs concurrently and the call returns within
+    that budget; fields whose probe did not finish are listed in `SystemInfo.timed_out`.
+    Host facts are computed once per process; public IP / geo are served from TTL caches
+    (see `configure_cache`, `cache_stats`).
+    """
     now = datetime.datetime.utcnow()
     utc = now.strftime(TIME_FMT)
     local = now.astimezone().strftime(TIME_FMT)
 
-    public_ip, geo = _get_public_ip()
-    local_ips, macs, gw = _collect_net_info()
+    import psutil
+    if_addrs = psutil.net_if_addrs()
+    _check_iface_change(if_addrs)
+
+    if deadline is None:
+        public_ip, geo = _get_public_ip()
+        local_ips, macs, gw = _collect_net_info(if_addrs)
+        host, timed_out = _collect_host_facts(), []
+    else:
+        host, public_ip, geo, (local_ips, macs, gw), timed_out = _collect_concurrent(deadline, if_addrs)
 
     sys_info = SystemInfo(
         timestamp_utc = utc,
         timestamp_local = local,
-        hostname       = socket.gethostname(),
-        username       = getpass.getuser(),
-        os             = platform.system(),
-        os_release     = platform.release(),
-        os_version     = platform.version(),
-        architecture   = platform.machine(),
+        hostname       = host["hostname"],
+        username       = host["username"],
+        os             = host["os"],
+        os_release     = host["os_release"],
+        os_version     = host["os_version"],
+        architecture   = host["architecture"],
         public_ip      = public_ip,
         geo            = geo,
         local_ips      = local_ips,
         mac_addresses  = macs,
         default_gateway= gw,
-        uuid_hash      = hashlib.sha256(str(uuid.getnode()).encode()).hexdigest(),
+        uuid_hash      = host["uuid_hash"],
+        timed_out      = timed_out,
     )
     return sys_info
 
 
-def save_json_log(sys_info: SystemInfo, log_dir: pathlib.Path = LOG_DIR, key: bytes | None = None) -> pathlib.Path:
-    """Append *one* JSON‑L line.  If `key` supplied, encrypt with AES‑GCM (pyca/cryptography)."""
+JSON_SUFFIX      = ".jsonl"
+PLAINTEXT_SUFFIX = "_failed_login.log"
+
+
+def _utc_day() -> str:
+    return f"{datetime.datetime.utcnow():%Y%m%d}"
+
+
+_ready_dirs: set = set()
+
+
+def _ensure_dir(log_dir: pathlib.Path) -> pathlib.Path:
+    """mkdir once per directory per process (replaces the old import‑time mkdir)."""
+    if log_dir not in _ready_dirs:
+        log_dir.mkdir(exist_ok=True)
+        _ready_dirs.add(log_dir)
+    return log_dir
+
+
+def _record_json(sys_info: SystemInfo) -> str:
+    # shallow field map: same output as asdict() without deep‑copying every nested dict
+    return json.dumps({f: getattr(sys_info, f) for f in SYSTEMINFO_FIELDS}, separators=(",", ":"), ensure_ascii=False)
+
+
+def _format_json_record(sys_info: SystemInfo, key: bytes | None = None, clear_meta: Tuple[str, ...] = ()) -> str:
+    import hashlib
     from base64 import b64encode
-    filepath = log_dir / f"{datetime.datetime.utcnow():%Y%m%d}.jsonl"
-    record = json.dumps(asdict(sys_info), separators=(",", ":"), ensure_ascii=False)
+    record = _record_json(sys_info)
 
     # Integrity tag (SHA‑256)  – visible even when encrypted
     tag = hashlib.sha256(record.encode()).hexdigest()
@@ -138,16 +436,17 @@ def save_json_log(sys_info: SystemInfo, log_dir: pathlib.Path = LOG_DIR, key: by
             ct = aesgcm.encrypt(nonce, record.encode(), None)
             record = b64encode(nonce + ct).decode()
         except ImportError:
+            import logging
             logging.warning("cryptography not installed - writing plaintext log.")
+        else:
+            if clear_meta:   # opt‑in cleartext fields so encrypted logs stay searchable
+                meta = {f: getattr(sys_info, f) for f in clear_meta}
+                return json.dumps({"sig": tag, "data": record, "meta": meta}) + "\n"
 
-    with filepath.open("a", encoding="utf-8") as f:
-        f.write(json.dumps({"sig": tag, "data": record}) + "\n")
-    return filepath
+    return json.dumps({"sig": tag, "data": record}) + "\n"
 
-def save_plaintext_log(sys_info: SystemInfo, log_dir: pathlib.Path = LOG_DIR) -> pathlib.Path:
-    """Save collected info in clean human-readable .log format."""
-    log_path = log_dir / f"{datetime.datetime.utcnow():%Y%m%d}_failed_login.log"
 
+def _format_plaintext(sys_info: SystemInfo) -> str:
     lines = [
         f"[{sys_info.timestamp_local}] New Failed Login Attempt",
         f"Username       : {sys_info.username}",
@@ -176,14 +475,246 @@ def save_plaintext_log(sys_info: SystemInfo, log_dir: pathlib.Path = LOG_DIR) ->
         f"OS             : {sys_info.os} ({sys_info.os_version}) {sys_info.architecture}",
         f"Default Gateway: {sys_info.default_gateway or 'N/A'}",
         f"UUID Hash      : {sys_info.uuid_hash}",
-        "-" * 60
     ])
+    if sys_info.timed_out:
+        lines.append(f"Timed Out      : {', '.join(sys_info.timed_out)}")
+    lines.append("-" * 60)
+    return "\n".join(lines) + "\n"
 
-    # Write to log file
-    with log_path.open("a", encoding="utf-8") as f:
-        f.write("\n".join(lines) + "\n")
 
+def save_json_log(sys_info: SystemInfo, log_dir: pathlib.Path = LOG_DIR, key: bytes | None = None,
+                  clear_meta: Tuple[str, ...] = ()) -> pathlib.Path:
+    """Append *one* JSON‑L line.  If `key` supplied, encrypt with AES‑GCM (pyca/cryptography).
+
+    `clear_meta` names SystemInfo fields to keep in cleartext next to the ciphertext
+    (e.g. ("timestamp_utc", "public_ip")) so attacker_info_query can index them.
+    """
+    filepath = _ensure_dir(log_dir) / f"{_utc_day()}{JSON_SUFFIX}"
+    with filepath.open("a", encoding="utf-8") as f:
+        f.write(_format_json_record(sys_info, key, clear_meta))
+    return filepath
+
+def save_plaintext_log(sys_info: SystemInfo, log_dir: pathlib.Path = LOG_DIR) -> pathlib.Path:
+    """Save collected info in clean human-readable .log format."""
+    log_path = _ensure_dir(log_dir) / f"{_utc_day()}{PLAINTEXT_SUFFIX}"
+    with log_path.open("a", encoding="utf-8") as f:
+        f.write(_format_plaintext(sys_info))
     return log_path
+
+# ─────────────────────────── background writer ───────────────────────
+
+class LogWriter:
+    """Batching writer that moves formatting and file I/O off the caller's thread.
+
+    `save_json` / `save_plaintext` only enqueue.  A dedicated thread drains the queue in
+    batches (up to `batch_size` records or `flush_interval` seconds), keeps one handle per
+    daily file open and rotates it when the UTC day changes.  When the queue is full,
+    `on_full="block"` waits up to `put_timeout` s (back‑pressure) and `"drop"` discards at
+    once; either way the record is counted in `dropped`.  `close()` (also run at exit)
+    writes out everything still queued.  With `sink`, JSON records go to that
+    EncryptedLogSink one batch per frame instead of the per‑record `key` path.
+    """
+
+    _STOP = object()
+
+    def __init__(self, log_dir: pathlib.Path = LOG_DIR, key: bytes | None = None, max_queue: int = 10_000,
+                 batch_size: int = 256, flush_interval: float = 0.5, on_full: str = "block",
+                 put_timeout: float = 1.0, sink: EncryptedLogSink | None = None):
+        import atexit, queue
+        if on_full not in ("block", "drop"):
+            raise ValueError("on_full must be 'block' or 'drop'")
+        self.log_dir, self.key, self.sink = log_dir, key, sink
+        self.batch_size, self.flush_interval = batch_size, flush_interval
+        self.on_full, self.put_timeout = on_full, put_timeout
+        self.written = self.dropped = self.batches = 0
+        self._q: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._files: Dict[str, Tuple[str, Any]] = {}          # suffix → (day, open handle)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="attacker_info-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # producer side
+    def save_json(self, sys_info: SystemInfo) -> bool:
+        return self._put((_utc_day(), JSON_SUFFIX, sys_info))
+
+    def save_plaintext(self, sys_info: SystemInfo) -> bool:
+        return self._put((_utc_day(), PLAINTEXT_SUFFIX, sys_info))
+
+    def _put(self, item: Tuple[str, str, SystemInfo]) -> bool:
+        import queue
+        if self._closed:
+            raise RuntimeError("LogWriter is closed")
+        try:
+            if self.on_full == "block":
+                self._q.put(item, timeout=self.put_timeout)
+            else:
+                self._q.put_nowait(item)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def flush(self) -> None:
+        """Block until every record queued so far is on disk."""
+        self._q.join()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._q.put(self._STOP)
+        self._thread.join()
+
+    def stats(self) -> Dict[str, int]:
+        return {"written": self.written, "dropped": self.dropped, "batches": self.batches, "queued": self._q.qsize()}
+
+    # consumer side
+    def _run(self) -> None:
+        import logging, queue
+        stop = False
+        while not stop:
+            batch = [self._q.get()]
+            end = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not self._STOP:
+                try:
+                    batch.append(self._q.get(timeout=_left(end)))
+                except queue.Empty:
+                    break
+            stop = batch[-1] is self._STOP
+            try:
+                self._write([item for item in batch if item is not self._STOP])
+            except Exception:
+                logging.exception("attacker_info: background log write failed")
+            finally:
+                for _ in batch:
+                    self._q.task_done()
+        for _, f in self._files.values():
+            f.close()
+        self._files.clear()
+        if self.sink is not None:
+            self.sink.close()
+
+    def _write(self, batch: List[Tuple[str, str, SystemInfo]]) -> None:
+        chunks: Dict[Tuple[str, str], List[str]] = {}
+        if self.sink is not None:
+            sealed = [info for _, suffix, info in batch if suffix == JSON_SUFFIX]
+            if sealed:
+                self.sink.write_batch(sealed)
+                self.written += len(sealed)
+            batch = [item for item in batch if item[1] != JSON_SUFFIX]
+        for day, suffix, info in batch:
+            text = _format_json_record(info, self.key) if suffix == JSON_SUFFIX else _format_plaintext(info)
+            chunks.setdefault((day, suffix), []).append(text)
+        for (day, suffix), texts in chunks.items():
+            f = self._handle(day, suffix)
+            f.write("".join(texts))
+            f.flush()
+            self.written += len(texts)
+        self.batches += 1
+
+    def _handle(self, day: str, suffix: str):
+        cur = self._files.get(suffix)
+        if cur is None or cur[0] != day:                       # first use or UTC midnight rollover
+            if cur is not None:
+                cur[1].close()
+            cur = (day, (_ensure_dir(self.log_dir) / f"{day}{suffix}").open("a", encoding="utf-8"))
+            self._files[suffix] = cur
+        return cur[1]
+
+# ─────────────────────────── encrypted sink ──────────────────────────
+ENC_MAGIC      = b"AIG1"            # binary file header: format tag + version
+ENC_BIN_SUFFIX = ".gcm"
+ENC_JSON_SUFFIX = ".gcm.jsonl"
+
+
+class EncryptedLogSink:
+    """AES‑GCM log sink that builds the cipher once and reuses it for every record.
+
+    Every frame gets a fresh 96‑bit `os.urandom` nonce: restarts, worker processes and
+    rotated files all share the key, so a per‑sink counter could repeat a nonce across
+    sinks.  GCM's tag already authenticates each frame, so no separate SHA‑256 `sig`
+    is written.
+
+    fmt="binary": file starts with ENC_MAGIC, then frames of
+                  `uint32 length | nonce(12) | ciphertext+tag`.
+    fmt="jsonl":  one `{"data": base64(nonce + ciphertext)}` line per frame.
+    Each frame holds one or more newline‑separated JSON records (`write_batch`).
+    Read back with `iter_encrypted_log()`.
+    """
+
+    def __init__(self, key: bytes, log_dir: pathlib.Path = LOG_DIR, fmt: str = "binary"):
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+        if fmt not in ("binary", "jsonl"):
+            raise ValueError("fmt must be 'binary' or 'jsonl'")
+        self._aead = AESGCM(key)
+        self._lock = threading.Lock()
+        self.log_dir, self.fmt = log_dir, fmt
+        self.suffix = ENC_BIN_SUFFIX if fmt == "binary" else ENC_JSON_SUFFIX
+        self._day: Optional[str] = None
+        self._f = None
+
+    def write(self, sys_info: SystemInfo) -> pathlib.Path:
+        return self.write_batch([sys_info])
+
+    def write_batch(self, infos: List[SystemInfo]) -> pathlib.Path:
+        """Encrypt `infos` as a single frame and append it to today's file."""
+        plain = "\n".join(_record_json(i) for i in infos).encode()
+        with self._lock:
+            nonce = os.urandom(12)
+            frame = nonce + self._aead.encrypt(nonce, plain, None)
+            f = self._handle()
+            if self.fmt == "binary":
+                f.write(len(frame).to_bytes(4, "big") + frame)
+            else:
+                from base64 import b64encode
+                f.write(b'{"data":"' + b64encode(frame) + b'"}\n')
+            f.flush()
+            return pathlib.Path(f.name)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._f is not None:
+                self._f.close()
+                self._f = None
+
+    def _handle(self):
+        day = _utc_day()
+        if self._f is None or day != self._day:
+            if self._f is not None:
+                self._f.close()
+            path = _ensure_dir(self.log_dir) / f"{day}{self.suffix}"
+            fresh = not path.exists() or path.stat().st_size == 0
+            self._f, self._day = path.open("ab"), day
+            if fresh and self.fmt == "binary":
+                self._f.write(ENC_MAGIC)
+        return self._f
+
+
+def iter_encrypted_log(path: pathlib.Path, key: bytes) -> Iterator[Dict[str, Any]]:
+    """Stream‑decrypt a log written by EncryptedLogSink (or save_json_log with a key).
+
+    Yields one record dict at a time; only a single frame is held in memory.
+    Raises cryptography's InvalidTag if a frame was tampered with.
+    """
+    from base64 import b64decode
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    aead = AESGCM(key)
+
+    def _open(frame: bytes) -> Iterator[Dict[str, Any]]:
+        for line in aead.decrypt(frame[:12], frame[12:], None).splitlines():
+            yield json.loads(line)
+
+    with pathlib.Path(path).open("rb") as f:
+        if f.read(len(ENC_MAGIC)) == ENC_MAGIC:
+            while hdr := f.read(4):
+                yield from _open(f.read(int.from_bytes(hdr, "big")))
+        else:
+            f.seek(0)
+            for line in f:
+                if line.strip():
+                    yield from _open(b64decode(json.loads(line)["data"]))
+
 # ─────────────────────────── CLI entry ────────────────────────────────
 
 if __name__ == "__main__":
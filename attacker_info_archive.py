@@ -0,0 +1,231 @@
+"""
+attacker_info_archive.py — Columnar archive for rolled‑over attacker_info logs
+------------------------------------------------------------------------------
+* Converts closed daily `YYYYMMDD.jsonl` files into `YYYYMMDD.aic` archives.
+* One column per SystemInfo field, each compressed on its own so readers can
+  project just the columns they need (only those byte ranges are read).
+* Encodings:
+    ts     – timestamp_utc as µs since epoch, delta‑encoded int64
+    tsoff  – timestamp_local as µs offset from timestamp_utc (usually constant)
+    dict   – strings / nested values interned into a dictionary + int32 codes
+             (hostname, os, geo, local_ips, … repeat on nearly every line)
+  Any timestamp that does not round‑trip exactly falls back to `dict`.
+* Encrypted JSON‑L lines cannot be columnised and are left out (counted).
+
+Layout:  b"AIC1" | uint32 header length | header JSON | column blobs (zlib)
+
+Example usage:
+    from attacker_info_archive import compact, read_columns, iter_systeminfo
+    compact()                                   # archive every closed day
+    ips = read_columns(path, ["public_ip"])["public_ip"]
+    infos = list(iter_systeminfo(path))
+
+Auther : SpectralZero
+"""
+from __future__ import annotations
+
+import argparse, dataclasses, datetime, json, pathlib, zlib
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from attacker_info import LOG_DIR, JSON_SUFFIX, SystemInfo, timestamp_to_us, us_to_timestamp
+
+ARCHIVE_MAGIC  = b"AIC1"
+ARCHIVE_SUFFIX = ".aic"
+COLUMNS        = [f.name for f in dataclasses.fields(SystemInfo)]
+_NESTED        = {"geo", "local_ips", "mac_addresses", "timed_out"}
+
+# ─────────────────────────── column codecs ────────────────────────────
+
+def _ints(values: Iterable[int]) -> bytes:
+    return array("q", values).tobytes()
+
+
+def _unints(raw: bytes) -> List[int]:
+    a = array("q")
+    a.frombytes(raw)
+    return a.tolist()
+
+
+def _enc_dict(values: Sequence[Any], nested: bool) -> Tuple[Dict[str, Any], bytes]:
+    lookup: Dict[Any, int] = {}
+    words: List[Any] = []
+    codes = array("i")
+    for v in values:
+        k = json.dumps(v, separators=(",", ":"), ensure_ascii=False) if nested else v
+        code = lookup.get(k)
+        if code is None:
+            code = lookup[k] = len(words)
+            words.append(k)
+        codes.append(code)
+    return {"enc": "dict", "nested": nested, "words": words}, codes.tobytes()
+
+
+def _dec_dict(meta: Dict[str, Any], raw: bytes) -> List[Any]:
+    codes = array("i")
+    codes.frombytes(raw)
+    words = [json.loads(w) for w in meta["words"]] if meta["nested"] else meta["words"]
+    return [words[c] for c in codes]
+
+
+def _enc_column(name: str, values: List[Any], utc_us: Optional[List[int]]) -> Tuple[Dict[str, Any], bytes]:
+    try:
+        if name == "timestamp_utc":
+            us = [timestamp_to_us(v) for v in values]
+            if all(us_to_timestamp(u) == v for u, v in zip(us, values)):
+                return {"enc": "ts"}, _ints(b - a for a, b in zip([0] + us, us))
+        elif name == "timestamp_local" and utc_us is not None:
+            off = [timestamp_to_us(v) - u for v, u in zip(values, utc_us)]
+            if all(us_to_timestamp(u + o) == v for u, o, v in zip(utc_us, off, values)):
+                return {"enc": "tsoff"}, _ints(off)
+    except (TypeError, ValueError):
+        pass
+    return _enc_dict(values, name in _NESTED)
+
+
+def _dec_column(meta: Dict[str, Any], raw: bytes, utc_us: Optional[List[int]]) -> List[Any]:
+    if meta["enc"] == "ts":
+        out, acc = [], 0
+        for d in _unints(raw):
+            acc += d
+            out.append(us_to_timestamp(acc))
+        return out
+    if meta["enc"] == "tsoff":
+        return [us_to_timestamp(u + o) for u, o in zip(utc_us, _unints(raw))]
+    return _dec_dict(meta, raw)
+
+# ─────────────────────────── writer ───────────────────────────────────
+
+def _read_jsonl(path: pathlib.Path) -> Tuple[List[Dict[str, Any]], int]:
+    rows, skipped = [], 0
+    defaults = {f.name: (f.default_factory() if f.default_factory is not dataclasses.MISSING else f.default)
+                for f in dataclasses.fields(SystemInfo)}
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                rec = json.loads(json.loads(line)["data"])
+            except (ValueError, KeyError, TypeError):
+                skipped += 1                                   # encrypted / malformed
+                continue
+            rows.append({c: rec.get(c, defaults.get(c)) for c in COLUMNS})
+    return rows, skipped
+
+
+def write_archive(rows: List[Dict[str, Any]], out: pathlib.Path, level: int = 9) -> pathlib.Path:
+    """Columnise `rows` (dicts with SystemInfo fields) into `out`."""
+    header: Dict[str, Any] = {"rows": len(rows), "columns": {}}
+    blobs: List[bytes] = []
+    utc_us = None
+    if rows:
+        try:
+            utc_us = [timestamp_to_us(r["timestamp_utc"]) for r in rows]
+        except (TypeError, ValueError):
+            pass
+    pos = 0
+    for name in COLUMNS:
+        meta, raw = _enc_column(name, [r[name] for r in rows], utc_us)
+        if name == "timestamp_utc" and meta["enc"] != "ts":
+            utc_us = None                                      # tsoff needs exact utc timestamps
+        blob = zlib.compress(raw, level)
+        meta.update(offset=pos, length=len(blob))
+        header["columns"][name] = meta
+        blobs.append(blob)
+        pos += len(blob)
+    hdr = json.dumps(header, separators=(",", ":"), ensure_ascii=False).encode()
+    tmp = out.with_suffix(out.suffix + ".tmp")
+    with tmp.open("wb") as f:
+        f.write(ARCHIVE_MAGIC + len(hdr).to_bytes(4, "big") + hdr)
+        for blob in blobs:
+            f.write(blob)
+    tmp.replace(out)
+    return out
+
+
+def compact(log_dir: pathlib.Path = LOG_DIR, remove_source: bool = False,
+            today: datetime.date | None = None) -> List[Tuple[pathlib.Path, int, int]]:
+    """Archive every closed (before today, UTC) JSON‑L file that has no archive yet.
+
+    Returns (archive, archived rows, skipped encrypted rows) per file.  The source is
+    only removed after the archive was read back and matched row for row.
+    """
+    today = today or datetime.datetime.utcnow().date()
+    done = []
+    for src in sorted(pathlib.Path(log_dir).glob(f"*{JSON_SUFFIX}")):
+        try:
+            day = datetime.datetime.strptime(src.name[:8], "%Y%m%d").date()
+        except ValueError:
+            continue
+        if src.name[8:] != JSON_SUFFIX or day >= today:
+            continue
+        dst = src.with_name(src.name[:8] + ARCHIVE_SUFFIX)
+        if dst.exists():
+            continue
+        rows, skipped = _read_jsonl(src)
+        write_archive(rows, dst)
+        if remove_source and not skipped and list(iter_rows(dst)) == rows:
+            src.unlink()
+        done.append((dst, len(rows), skipped))
+    return done
+
+# ─────────────────────────── reader ───────────────────────────────────
+
+def _header(f) -> Tuple[Dict[str, Any], int]:
+    if f.read(4) != ARCHIVE_MAGIC:
+        raise ValueError("not an attacker_info archive")
+    n = int.from_bytes(f.read(4), "big")
+    return json.loads(f.read(n)), 8 + n
+
+
+def read_columns(path: pathlib.Path, columns: Sequence[str] | None = None) -> Dict[str, List[Any]]:
+    """Decode only `columns` (default: all); other column blobs are never read.
+
+    Nested values (geo, local_ips, …) are decoded once per distinct value and shared
+    between rows — treat them as read‑only.
+    """
+    wanted = list(columns or COLUMNS)
+    with pathlib.Path(path).open("rb") as f:
+        header, base = _header(f)
+        metas = header["columns"]
+
+        def load(name: str) -> bytes:
+            f.seek(base + metas[name]["offset"])
+            return zlib.decompress(f.read(metas[name]["length"]))
+
+        utc_us = None
+        if "timestamp_local" in wanted and metas["timestamp_local"]["enc"] == "tsoff":
+            acc, utc_us = 0, []
+            for d in _unints(load("timestamp_utc")):
+                acc += d
+                utc_us.append(acc)
+        return {name: _dec_column(metas[name], load(name), utc_us) for name in wanted}
+
+
+def iter_rows(path: pathlib.Path, columns: Sequence[str] | None = None) -> Iterator[Dict[str, Any]]:
+    cols = read_columns(path, columns)
+    names = list(cols)
+    for values in zip(*(cols[n] for n in names)):
+        yield dict(zip(names, values))
+
+
+def iter_systeminfo(path: pathlib.Path) -> Iterator[SystemInfo]:
+    for row in iter_rows(path):
+        yield SystemInfo(**row)
+
+# ─────────────────────────── CLI entry ────────────────────────────────
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Compact closed attacker_info JSON-L logs into columnar archives.")
+    ap.add_argument("--dir", type=pathlib.Path, default=LOG_DIR)
+    ap.add_argument("--remove", action="store_true", help="delete each source file once verified")
+    ap.add_argument("--cat", type=pathlib.Path, help="print rows of an archive instead of compacting")
+    ap.add_argument("--columns", help="comma separated projection for --cat")
+    args = ap.parse_args()
+
+    if args.cat:
+        for row in iter_rows(args.cat, args.columns.split(",") if args.columns else None):
+            print(json.dumps(row, ensure_ascii=False))
+    else:
+        for dst, n, skipped in compact(args.dir, args.remove):
+            print(f"✔ {dst.name}: {n} rows" + (f" ({skipped} encrypted lines left in source)" if skipped else ""))
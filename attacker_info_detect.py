@@ -0,0 +1,198 @@
+"""
+attacker_info_detect.py — Streaming failed‑login burst detector
+------------------------------------------------------------------------------
+* Feed it `collect_attacker_info()` results (or raw (ts, ip, user) tuples) and it
+  keeps sliding‑window counts per public IP, username and /24 subnet.
+* Each dimension is a count‑min sketch split into a ring of time buckets:
+  memory is fixed (depth × width × buckets counters) no matter how many
+  distinct attackers show up.  The closed buckets of the window are summed
+  once per bucket change, so an update touches just `depth` counters of the
+  open bucket plus `depth` reads of that sum.
+* Counts are estimates that can only err high (hash collisions); size
+  `width` so that width ≫ distinct keys per window for tight numbers.
+* When a key's windowed count reaches its threshold an Alert is emitted once;
+  the same key is muted for one window (bounded mute table).
+* Events older than the current bucket are counted in the current bucket.
+
+Example usage:
+    from attacker_info_detect import RateDetector
+    det = RateDetector(window_s=60, thresholds={"public_ip": 20, "username": 50, "subnet": 100},
+                       on_alert=print)
+    det.observe(collect_attacker_info())
+
+Auther : SpectralZero
+"""
+from __future__ import annotations
+
+import operator, socket
+from array import array
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from attacker_info import SystemInfo, timestamp_to_us
+
+DEFAULT_THRESHOLDS = {"public_ip": 20, "username": 50, "subnet": 100}
+
+# ─────────────────────────── sketch ───────────────────────────────────
+
+class SlidingCountMin:
+    """Count‑min sketch over the last `window_s` seconds, in `buckets` time slices."""
+
+    def __init__(self, window_s: float = 60.0, buckets: int = 12, width: int = 8192, depth: int = 4):
+        width = 1 << max(width - 1, 1).bit_length()     # power of two → row index is a bit slice of hash()
+        self.window_s, self.buckets, self.width, self.depth = window_s, buckets, width, depth
+        self.span = window_s / buckets
+        self._bits = width.bit_length() - 1
+        self._mask = width - 1
+        cells = width * depth
+        self._past = array("I", bytes(4 * cells))    # Σ of the closed slices still inside the window
+        self._slices = [array("I", bytes(4 * cells)) for _ in range(buckets)]
+        self._dirty = [False] * buckets
+        self._offsets = range(0, cells, width)   # start of each sketch row
+        self._cur = None                       # absolute bucket number being filled
+        self._next = float("-inf")
+        self._slice = self._slices[0]
+        if depth == 4 and 4 * self._bits <= 64:
+            self.add = self._add4                     # unrolled hot path for the default shape
+
+    def _index(self, key: str) -> List[int]:
+        h, out = hash(key), []
+        for off in self._offsets:
+            out.append(off + (h & self._mask))
+            h >>= self._bits
+            if not h:                                 # ran out of hash bits: rehash for deeper sketches
+                h = hash((key, off))
+        return out
+
+    def _advance(self, b: int) -> None:
+        past = self._past
+        if self._cur is not None:              # the open slice closes and joins the window sum
+            past = array("I", map(operator.add, past, self._slice))
+        start = b - self.buckets + 1 if self._cur is None else max(self._cur + 1, b - self.buckets + 1)
+        for n in range(start, b + 1):          # expire every slice we are about to reuse
+            s = n % self.buckets
+            if self._dirty[s]:
+                past = array("I", map(operator.sub, past, self._slices[s]))
+                self._slices[s] = array("I", bytes(4 * len(past)))
+                self._dirty[s] = False
+        cur = b % self.buckets
+        self._past = past
+        self._cur = b
+        self._next = (b + 1) * self.span          # first timestamp that belongs to the next slice
+        self._slice = self._slices[cur]
+        self._dirty[cur] = True
+
+    def add(self, key: str, ts: float) -> int:
+        """Count one occurrence of `key` at time `ts` (s); returns the new windowed estimate."""
+        if ts >= self._next:
+            self._advance(int(ts // self.span))
+        sl, past = self._slice, self._past
+        est = 1 << 62
+        for j in self._index(key):
+            v = sl[j] = sl[j] + 1
+            v += past[j]
+            if v < est:
+                est = v
+        return est
+
+    def _add4(self, key: str, ts: float) -> int:
+        if ts >= self._next:
+            self._advance(int(ts // self.span))
+        h, m, b, w = hash(key), self._mask, self._bits, self.width
+        j0 = h & m
+        j1 = w + (h >> b & m)
+        j2 = 2 * w + (h >> 2 * b & m)
+        j3 = 3 * w + (h >> 3 * b & m)
+        sl, past = self._slice, self._past
+        a = sl[j0] = sl[j0] + 1
+        c = sl[j1] = sl[j1] + 1
+        d = sl[j2] = sl[j2] + 1
+        e = sl[j3] = sl[j3] + 1
+        return min(a + past[j0], c + past[j1], d + past[j2], e + past[j3])
+
+    def estimate(self, key: str, now: float | None = None) -> int:
+        if now is not None and (self._cur is None or int(now // self.span) > self._cur):
+            self._advance(int(now // self.span))
+        return min(self._past[j] + self._slice[j] for j in self._index(key))
+
+    def nbytes(self) -> int:
+        return 4 * self.width * self.depth * (self.buckets + 1)
+
+# ─────────────────────────── detector ─────────────────────────────────
+
+@dataclass(slots=True)
+class Alert:
+    dimension: str           # "public_ip" | "username" | "subnet"
+    key: str
+    count: int               # windowed estimate when the threshold was crossed
+    window_s: float
+    ts: float                # event time (s since epoch)
+
+
+def subnet_of(ip: str) -> str:
+    """/24 for IPv4 (textual, cheap), /48 for IPv6 (normalised, so every spelling maps to one key)."""
+    if ":" in ip:
+        try:                                 # same key as ipaddress.ip_network(f"{ip}/48", strict=False), ~10x faster
+            packed = socket.inet_pton(socket.AF_INET6, ip.partition("%")[0])
+        except OSError:
+            return ip                        # not an address: keep it as its own key
+        return socket.inet_ntop(socket.AF_INET6, packed[:6] + bytes(10)) + "/48"
+    return ip.rpartition(".")[0] + ".0/24"
+
+
+class RateDetector:
+    def __init__(self, window_s: float = 60.0, thresholds: Dict[str, int] | None = None,
+                 width: int = 8192, depth: int = 4, buckets: int = 12,
+                 on_alert: Optional[Callable[[Alert], None]] = None, max_muted: int = 10_000):
+        self.window_s = window_s
+        self.thresholds = dict(DEFAULT_THRESHOLDS if thresholds is None else thresholds)
+        self.sketches = {dim: SlidingCountMin(window_s, buckets, width, depth) for dim in self.thresholds}
+        self.recent_alerts: deque = deque(maxlen=1000)
+        self.on_alert = on_alert or self.recent_alerts.append
+        self.events = self.alerts = 0
+        self._muted: "OrderedDict[tuple, float]" = OrderedDict()
+        self._max_muted = max_muted
+        self._ip  = self.sketches.get("public_ip")
+        self._usr = self.sketches.get("username")
+        self._net = self.sketches.get("subnet")
+        self._ip_max, self._usr_max, self._net_max = (self.thresholds.get(d, 0) for d in ("public_ip", "username", "subnet"))
+
+    def observe(self, info: SystemInfo) -> None:
+        self.observe_raw(timestamp_to_us(info.timestamp_utc) / 1e6, info.public_ip, info.username)
+
+    def observe_raw(self, ts: float, public_ip: str | None, username: str | None) -> None:
+        self.events += 1
+        if public_ip:
+            if self._ip is not None:
+                n = self._ip.add(public_ip, ts)
+                if n >= self._ip_max:
+                    self._fire("public_ip", public_ip, n, ts)
+            if self._net is not None:
+                net = subnet_of(public_ip)
+                n = self._net.add(net, ts)
+                if n >= self._net_max:
+                    self._fire("subnet", net, n, ts)
+        if username and self._usr is not None:
+            n = self._usr.add(username, ts)
+            if n >= self._usr_max:
+                self._fire("username", username, n, ts)
+
+    def _fire(self, dim: str, key: str, n: int, ts: float) -> None:
+        k = (dim, key)
+        until = self._muted.get(k)
+        if until is not None and ts < until:
+            return
+        self._muted[k] = ts + self.window_s
+        self._muted.move_to_end(k)
+        if len(self._muted) > self._max_muted:
+            self._muted.popitem(last=False)
+        self.alerts += 1
+        self.on_alert(Alert(dim, key, n, self.window_s, ts))
+
+    def estimate(self, dimension: str, key: str, now: float | None = None) -> int:
+        return self.sketches[dimension].estimate(key, now)
+
+    def stats(self) -> Dict[str, int]:
+        return {"events": self.events, "alerts": self.alerts, "muted": len(self._muted),
+                "sketch_bytes": sum(s.nbytes() for s in self.sketches.values())}
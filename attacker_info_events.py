@@ -0,0 +1,248 @@
+"""
+attacker_info_events.py — Memory‑compact rolling store of SystemInfo events
+------------------------------------------------------------------------------
+* Keeps the last `capacity` failed‑login events in a ring buffer of flat
+  `array` columns instead of one SystemInfo (plus fresh dicts) per event.
+* Host facts (hostname, OS, NICs, gateway, uuid hash) are interned into one
+  shared HostFacts object; usernames, public IPs and geo records are interned
+  into small tables, so each event costs a handful of integers.
+* Timestamps are stored as int64 µs since the epoch (UTC) + a local offset in
+  seconds, instead of two formatted strings.
+* `json_line()` rebuilds the exact JSON that save_json_log would write from
+  pre‑encoded fragments — no SystemInfo, no `asdict()` deep copy.
+
+Example usage:
+    from attacker_info_events import EventStore
+    store = EventStore(capacity=100_000)
+    store.append(collect_attacker_info())
+    store.count_by("public_ip", since_us=now_us - 60_000_000)
+
+Auther : SpectralZero
+"""
+from __future__ import annotations
+
+import json
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from attacker_info import SystemInfo, timestamp_to_us, us_to_timestamp
+
+_NONE = -1                                # id stored for a missing public IP / geo
+
+
+def _js(v: Any) -> str:
+    return json.dumps(v, separators=(",", ":"), ensure_ascii=False)
+
+
+def _geo_key(geo: Dict[str, Any]) -> Any:
+    key = tuple(geo.items())
+    try:
+        hash(key)
+    except TypeError:                     # unhashable nested value from the geo service
+        return _js(geo)
+    return key
+
+# ─────────────────────────── interned values ──────────────────────────
+
+@dataclass(frozen=True, slots=True)
+class HostFacts:
+    """Per‑host fields shared by every event from that host, with their JSON pre‑encoded."""
+    hostname: str
+    os: str
+    os_release: str
+    os_version: str
+    architecture: str
+    local_ips: Dict[str, List[str]]
+    mac_addresses: Dict[str, str]
+    default_gateway: Optional[str]
+    uuid_hash: str
+    timed_out: Tuple[str, ...]
+    js_hostname: str
+    js_os: str            # "os" … "architecture" run, ready to splice
+    js_net: str           # "local_ips" … "uuid_hash" run
+    js_timed_out: str
+
+    @staticmethod
+    def key(info: SystemInfo) -> tuple:
+        return (info.hostname, info.os, info.os_release, info.os_version, info.architecture,
+                tuple((k, tuple(v)) for k, v in info.local_ips.items()),
+                tuple(info.mac_addresses.items()), info.default_gateway, info.uuid_hash,
+                tuple(info.timed_out))
+
+    @classmethod
+    def build(cls, info: SystemInfo) -> "HostFacts":
+        local_ips = {k: list(v) for k, v in info.local_ips.items()}
+        macs = dict(info.mac_addresses)
+        return cls(
+            info.hostname, info.os, info.os_release, info.os_version, info.architecture,
+            local_ips, macs, info.default_gateway, info.uuid_hash, tuple(info.timed_out),
+            js_hostname=_js(info.hostname),
+            js_os=(f'"os":{_js(info.os)},"os_release":{_js(info.os_release)},'
+                   f'"os_version":{_js(info.os_version)},"architecture":{_js(info.architecture)}'),
+            js_net=(f'"local_ips":{_js(local_ips)},"mac_addresses":{_js(macs)},'
+                    f'"default_gateway":{_js(info.default_gateway)},"uuid_hash":{_js(info.uuid_hash)}'),
+            js_timed_out=_js(list(info.timed_out)),
+        )
+
+
+class _Interner:
+    """value ↔ small int id; `encoded[id]` holds the value's JSON text."""
+
+    __slots__ = ("ids", "values", "encoded")
+
+    def __init__(self):
+        self.ids: Dict[Any, int] = {}
+        self.values: List[Any] = []
+        self.encoded: List[str] = []
+
+    def intern(self, key: Any, value: Any = None) -> int:
+        i = self.ids.get(key)
+        if i is None:
+            i = self.ids[key] = len(self.values)
+            value = key if value is None else value
+            self.values.append(value)
+            self.encoded.append(_js(value))
+        return i
+
+# ─────────────────────────── event store ──────────────────────────────
+
+class EventStore:
+    """Fixed‑capacity ring buffer of failed‑login events, oldest overwritten first.
+
+    Columns (one slot per event): ts_us int64, local_off int32 (s), host/user/ip/geo int32 ids.
+    Interned tables only grow; call `compact_tables()` occasionally for very long runs.
+    """
+
+    def __init__(self, capacity: int = 100_000):
+        self.capacity = capacity
+        self.ts_us     = array("q", bytes(8 * capacity))
+        self.local_off = array("i", bytes(4 * capacity))
+        self.host_id   = array("i", bytes(4 * capacity))
+        self.user_id   = array("i", bytes(4 * capacity))
+        self.ip_id     = array("i", bytes(4 * capacity))
+        self.geo_id    = array("i", bytes(4 * capacity))
+        self._head = 0                    # next slot to write
+        self._size = 0
+        self.hosts: List[HostFacts] = []
+        self._host_ids: Dict[tuple, int] = {}
+        self.users, self.ips, self.geos = _Interner(), _Interner(), _Interner()
+
+    # ─────────── ingest
+    def append(self, info: SystemInfo) -> None:
+        hkey = HostFacts.key(info)
+        h = self._host_ids.get(hkey)
+        if h is None:
+            h = self._host_ids[hkey] = len(self.hosts)
+            self.hosts.append(HostFacts.build(info))
+        utc = timestamp_to_us(info.timestamp_utc)
+        self.add_raw(utc, (timestamp_to_us(info.timestamp_local) - utc) // 1_000_000, h,
+                     self.users.intern(info.username),
+                     _NONE if info.public_ip is None else self.ips.intern(info.public_ip),
+                     _NONE if info.geo is None else self.geos.intern(_geo_key(info.geo), dict(info.geo)))
+
+    def add_raw(self, ts_us: int, local_off: int, host: int, user: int, ip: int, geo: int) -> None:
+        """Append pre‑interned ids (hot path for replay / benchmarks)."""
+        i = self._head
+        self.ts_us[i], self.local_off[i] = ts_us, local_off
+        self.host_id[i], self.user_id[i], self.ip_id[i], self.geo_id[i] = host, user, ip, geo
+        self._head = (i + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    # ─────────── access
+    def __len__(self) -> int:
+        return self._size
+
+    def _slot(self, n: int) -> int:
+        """Ring slot of the n‑th oldest event."""
+        if not -self._size <= n < self._size:
+            raise IndexError(n)
+        n %= self._size
+        return (self._head - self._size + n) % self.capacity
+
+    def slots(self, since_us: int | None = None) -> Iterator[int]:
+        start = (self._head - self._size) % self.capacity
+        for k in range(self._size):
+            i = (start + k) % self.capacity
+            if since_us is None or self.ts_us[i] >= since_us:
+                yield i
+
+    def __getitem__(self, n: int) -> SystemInfo:
+        """Materialise the n‑th oldest event (nested values are shared; treat as read‑only)."""
+        i = self._slot(n)
+        h = self.hosts[self.host_id[i]]
+        ip, geo = self.ip_id[i], self.geo_id[i]
+        return SystemInfo(
+            timestamp_utc=us_to_timestamp(self.ts_us[i]),
+            timestamp_local=us_to_timestamp(self.ts_us[i] + self.local_off[i] * 1_000_000),
+            hostname=h.hostname, username=self.users.values[self.user_id[i]],
+            os=h.os, os_release=h.os_release, os_version=h.os_version, architecture=h.architecture,
+            public_ip=None if ip == _NONE else self.ips.values[ip],
+            geo=None if geo == _NONE else self.geos.values[geo],
+            local_ips=h.local_ips, mac_addresses=h.mac_addresses, default_gateway=h.default_gateway,
+            uuid_hash=h.uuid_hash, timed_out=list(h.timed_out),
+        )
+
+    def json_line(self, n: int) -> str:
+        """The record JSON save_json_log would produce, built from pre‑encoded fragments."""
+        i = self._slot(n)
+        h = self.hosts[self.host_id[i]]
+        ip, geo = self.ip_id[i], self.geo_id[i]
+        return "".join((
+            '{"timestamp_utc":"', us_to_timestamp(self.ts_us[i]),
+            '","timestamp_local":"', us_to_timestamp(self.ts_us[i] + self.local_off[i] * 1_000_000),
+            '","hostname":', h.js_hostname, ',"username":', self.users.encoded[self.user_id[i]],
+            ",", h.js_os,
+            ',"public_ip":', "null" if ip == _NONE else self.ips.encoded[ip],
+            ',"geo":', "null" if geo == _NONE else self.geos.encoded[geo],
+            ",", h.js_net, ',"timed_out":', h.js_timed_out, "}",
+        ))
+
+    def write_jsonl(self, f) -> int:
+        """Dump the window as plain record JSON‑L to text file `f`; returns lines written."""
+        for n in range(self._size):
+            f.write(self.json_line(n))
+            f.write("\n")
+        return self._size
+
+    # ─────────── aggregation
+    def count_by(self, field: str, since_us: int | None = None) -> Counter:
+        """Events per username / public_ip / hostname within the window (optionally since `since_us`)."""
+        col, values = {
+            "username":  (self.user_id, self.users.values),
+            "public_ip": (self.ip_id, self.ips.values),
+            "hostname":  (self.host_id, [h.hostname for h in self.hosts]),
+        }[field]
+        counts = Counter(col[i] for i in self.slots(since_us))
+        return Counter({(None if k == _NONE else values[k]): v for k, v in counts.items()})
+
+    def compact_tables(self) -> None:
+        """Drop interned users / IPs / geos / hosts no longer referenced by the window."""
+        live = list(self.slots())
+        for col, table in ((self.user_id, self.users), (self.ip_id, self.ips), (self.geo_id, self.geos)):
+            remap: Dict[int, int] = {}
+            fresh = _Interner()
+            for i in live:
+                old = col[i]
+                if old != _NONE:
+                    if old not in remap:
+                        value = table.values[old]
+                        key = _geo_key(value) if isinstance(value, dict) else value
+                        remap[old] = fresh.intern(key, value)
+                    col[i] = remap[old]
+            table.ids, table.values, table.encoded = fresh.ids, fresh.values, fresh.encoded
+        remap, hosts, host_ids = {}, [], {}
+        inverse = {v: k for k, v in self._host_ids.items()}
+        for i in live:
+            old = self.host_id[i]
+            if old not in remap:
+                remap[old] = host_ids[inverse[old]] = len(hosts)
+                hosts.append(self.hosts[old])
+            self.host_id[i] = remap[old]
+        self.hosts, self._host_ids = hosts, host_ids
+
+    def nbytes(self) -> int:
+        """Approximate bytes held by the column arrays (excludes interned tables)."""
+        return sum(a.itemsize * len(a) for a in
+                   (self.ts_us, self.local_off, self.host_id, self.user_id, self.ip_id, self.geo_id))
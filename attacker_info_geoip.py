@@ -0,0 +1,210 @@
+"""
+attacker_info_geoip.py — Offline GeoIP lookups for attacker_info
+------------------------------------------------------------------------------
+* Compiles a CSV of `network,city,region,country,org` rows (CIDR, IPv4 and
+  IPv6) into one flat binary file of sorted, non‑overlapping intervals.
+  Nested networks are split so the most specific one always wins.
+* The file is memory‑mapped read‑only: pages are shared by every worker
+  process that opens it, and opening is O(1) — nothing is parsed up front.
+* Lookups are a binary search over the mapped arrays (µs per address) and
+  return an ipinfo‑style dict {"ip", "city", "region", "country", "org"}.
+* attacker_info uses it when GEOIP_DB is set (or $ATTACKER_INFO_GEOIP_DB);
+  addresses missing from the db then only go to ipinfo.io if that fallback
+  is switched on (configure_geoip(db, http_fallback=True) or
+  $ATTACKER_INFO_GEO_HTTP_FALLBACK=1).
+
+Layout (little‑endian):
+    b"AIGEO1\\0\\0" | u32 n4, n6, nrec, blob_len
+    v4 start[n4] u32 | v4 end[n4] u32 | v4 rec[n4] u32
+    v6 start[n6] 16 B | v6 end[n6] 16 B | v6 rec[n6] u32
+    rec offset[nrec + 1] u32 | blob (UTF‑8 JSON records)
+
+Example usage:
+    python attacker_info_geoip.py compile geo.csv geo.db
+    python attacker_info_geoip.py lookup geo.db 203.0.113.7 2001:db8::1
+
+Auther : SpectralZero
+"""
+from __future__ import annotations
+
+import argparse, csv, ipaddress, json, mmap, pathlib, socket, struct, sys
+from array import array
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+DB_MAGIC = b"AIGEO1\0\0"
+_HEADER  = struct.Struct("<8s4I")
+FIELDS   = ("city", "region", "country", "org")
+
+Interval = Tuple[int, int, int]           # (first address, last address, record index)
+
+# ─────────────────────────── compiler ─────────────────────────────────
+
+def _flatten(nets: List[Interval]) -> List[Interval]:
+    """Nested CIDRs → disjoint intervals where the innermost network owns each address."""
+    nets.sort(key=lambda n: (n[0], n[0] - n[1]))          # by start, widest first
+    out: List[Interval] = []
+    stack: List[Tuple[int, int]] = []                     # open parents: (end, rec)
+    cursor = 0                                            # first address not yet emitted
+
+    def emit(lo: int, hi: int, rec: int) -> None:
+        if lo <= hi:
+            if out and out[-1][2] == rec and out[-1][1] + 1 == lo:
+                out[-1] = (out[-1][0], hi, rec)           # merge adjacent pieces of one record
+            else:
+                out.append((lo, hi, rec))
+
+    for start, end, rec in nets:
+        while stack and stack[-1][0] < start:             # parents that close before this net
+            pend, prec = stack.pop()
+            emit(cursor, pend, prec)
+            cursor = max(cursor, pend + 1)
+        if stack:
+            emit(cursor, start - 1, stack[-1][1])
+        stack.append((end, rec))
+        cursor = start
+    while stack:
+        pend, prec = stack.pop()
+        emit(cursor, pend, prec)
+        cursor = max(cursor, pend + 1)
+    return out
+
+
+def compile_db(rows: Iterable[Dict[str, str]], out: pathlib.Path) -> Tuple[int, int]:
+    """Build the binary db from dict rows with `network` + FIELDS; returns (#v4, #v6) intervals."""
+    recs: Dict[Tuple[str, ...], int] = {}
+    v4: List[Interval] = []
+    v6: List[Interval] = []
+    for row in rows:
+        net = ipaddress.ip_network(row["network"].strip(), strict=False)
+        key = tuple((row.get(f) or "").strip() for f in FIELDS)
+        idx = recs.setdefault(key, len(recs))
+        (v4 if net.version == 4 else v6).append((int(net.network_address), int(net.broadcast_address), idx))
+    v4, v6 = _flatten(v4), _flatten(v6)
+
+    blobs = [json.dumps(dict(zip(FIELDS, k)), separators=(",", ":"), ensure_ascii=False).encode() for k in recs]
+    offsets = array("I", [0])
+    for b in blobs:
+        offsets.append(offsets[-1] + len(b))
+
+    def u32(values: Iterable[int]) -> bytes:
+        a = array("I", values)
+        if sys.byteorder == "big":
+            a.byteswap()
+        return a.tobytes()
+
+    tmp = out.with_suffix(out.suffix + ".tmp")
+    with tmp.open("wb") as f:
+        f.write(_HEADER.pack(DB_MAGIC, len(v4), len(v6), len(blobs), offsets[-1]))
+        f.write(u32(s for s, _, _ in v4))
+        f.write(u32(e for _, e, _ in v4))
+        f.write(u32(r for _, _, r in v4))
+        f.write(b"".join(s.to_bytes(16, "big") for s, _, _ in v6))
+        f.write(b"".join(e.to_bytes(16, "big") for _, e, _ in v6))
+        f.write(u32(r for _, _, r in v6))
+        f.write(u32(offsets))
+        f.write(b"".join(blobs))
+    tmp.replace(out)
+    return len(v4), len(v6)
+
+
+def compile_csv(csv_path: pathlib.Path, out: pathlib.Path) -> Tuple[int, int]:
+    with pathlib.Path(csv_path).open(newline="", encoding="utf-8") as f:
+        return compile_db(csv.DictReader(f), pathlib.Path(out))
+
+# ─────────────────────────── reader ───────────────────────────────────
+
+class _Keys16(Sequence):
+    """16‑byte big‑endian keys in a mapped buffer, compared as bytes (== numeric order)."""
+
+    def __init__(self, mv: memoryview):
+        self._mv = mv
+
+    def __len__(self) -> int:
+        return len(self._mv) // 16
+
+    def __getitem__(self, i: int) -> bytes:
+        return self._mv[i * 16:i * 16 + 16].tobytes()
+
+
+class GeoIPDB:
+    """Read‑only, memory‑mapped view of a compiled db.  Safe to share across threads."""
+
+    def __init__(self, path: pathlib.Path):
+        if sys.byteorder == "big":
+            raise RuntimeError("GeoIPDB reads little‑endian u32 arrays in place")
+        self.path = pathlib.Path(path)
+        with self.path.open("rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n4, n6, nrec, blob_len = _HEADER.unpack_from(self._mm, 0)
+        if magic != DB_MAGIC:
+            raise ValueError(f"{path}: not a GeoIP db")
+        mv, pos = memoryview(self._mm), _HEADER.size
+
+        def take(nbytes: int, fmt: str | None = "I") -> memoryview:
+            nonlocal pos
+            part = mv[pos:pos + nbytes]
+            pos += nbytes
+            return part.cast(fmt) if fmt else part
+
+        self._v4_start, self._v4_end, self._v4_rec = take(4 * n4), take(4 * n4), take(4 * n4)
+        self._v6_start = _Keys16(take(16 * n6, None))
+        self._v6_end   = _Keys16(take(16 * n6, None))
+        self._v6_rec   = take(4 * n6)
+        self._rec_off  = take(4 * (nrec + 1))
+        self._blob     = take(blob_len, None)
+        self._decoded: Dict[int, Dict[str, str]] = {}
+        self.counts = (n4, n6, nrec)
+
+    def _record(self, idx: int) -> Dict[str, str]:
+        rec = self._decoded.get(idx)
+        if rec is None:
+            rec = self._decoded[idx] = json.loads(bytes(self._blob[self._rec_off[idx]:self._rec_off[idx + 1]]))
+        return rec
+
+    def lookup(self, ip: str) -> Optional[Dict[str, str]]:
+        """ipinfo‑style dict for `ip`, or None if unknown / not an address."""
+        try:
+            if ":" in ip:
+                key = socket.inet_pton(socket.AF_INET6, ip)
+                i = bisect_right(self._v6_start, key) - 1
+                if i < 0 or key > self._v6_end[i]:
+                    return None
+                idx = self._v6_rec[i]
+            else:
+                key = int.from_bytes(socket.inet_aton(ip), "big")
+                i = bisect_right(self._v4_start, key) - 1
+                if i < 0 or key > self._v4_end[i]:
+                    return None
+                idx = self._v4_rec[i]
+        except OSError:
+            return None
+        return {"ip": ip, **self._record(idx)}
+
+    def close(self) -> None:
+        for name in ("_v4_start", "_v4_end", "_v4_rec", "_v6_rec", "_rec_off", "_blob"):
+            getattr(self, name).release()
+        self._v6_start._mv.release()
+        self._v6_end._mv.release()
+        self._mm.close()
+
+# ─────────────────────────── CLI entry ────────────────────────────────
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Compile / query the offline GeoIP db used by attacker_info.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    c = sub.add_parser("compile", help="CSV (network,city,region,country,org) → binary db")
+    c.add_argument("csv", type=pathlib.Path)
+    c.add_argument("out", type=pathlib.Path)
+    q = sub.add_parser("lookup", help="resolve addresses against a compiled db")
+    q.add_argument("db", type=pathlib.Path)
+    q.add_argument("ips", nargs="+")
+    args = ap.parse_args()
+
+    if args.cmd == "compile":
+        n4, n6 = compile_csv(args.csv, args.out)
+        print(f"✔ {args.out}: {n4} IPv4 + {n6} IPv6 intervals")
+    else:
+        db = GeoIPDB(args.db)
+        for ip in args.ips:
+            print(ip, "→", json.dumps(db.lookup(ip), ensure_ascii=False))
@@ -0,0 +1,301 @@
+"""
+attacker_info_query.py — Indexed lookups over the attacker_info log directory
+------------------------------------------------------------------------------
+* Keeps one sidecar index (`<logfile>.idx`, JSON) next to every daily
+  `YYYYMMDD.jsonl` / `YYYYMMDD_failed_login.log` file.
+* Each index maps public IP, username, hostname, geo country, ASN and `sig`
+  → byte offsets of the matching records, plus (offset, epoch) pairs for time.
+* Updates are incremental: only bytes appended since the last run are parsed;
+  a file that shrank (truncated / replaced) is re‑indexed from scratch.
+* Encrypted JSON‑L records are indexed by their cleartext `sig`, plus any
+  fields stored in cleartext under `meta` (see save_json_log(clear_meta=…)).
+* Queries only open files whose day falls in the requested range, intersect
+  posting lists, then seek straight to the matching records.
+
+Example usage:
+    from attacker_info_query import query
+    for rec in query(public_ip="203.0.113.7", days=30):
+        print(rec["timestamp_utc"], rec["username"])
+
+    python attacker_info_query.py --ip 203.0.113.7 --days 30
+
+Auther : SpectralZero
+"""
+from __future__ import annotations
+
+import argparse, datetime, json, os, pathlib, re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from attacker_info import LOG_DIR, TIME_FMT, JSON_SUFFIX, PLAINTEXT_SUFFIX
+
+INDEX_SUFFIX  = ".idx"
+INDEX_VERSION = 1
+INDEX_FIELDS  = ("public_ip", "username", "hostname", "country", "asn", "sig")
+_SEPARATOR    = "-" * 60
+_ASN_RE       = re.compile(r"^(AS\d+)")
+_LOC_RE       = re.compile(r"^(.*), (.*), (.*) \((.*)\)$")
+
+Entry = Tuple[int, Optional[float], Dict[str, str]]   # (offset, epoch, field → value)
+
+# ─────────────────────────── parsing ──────────────────────────────────
+
+def _epoch(ts: Optional[str]) -> Optional[float]:
+    try:
+        return datetime.datetime.strptime(ts, TIME_FMT).replace(tzinfo=datetime.timezone.utc).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def _asn(org: Optional[str]) -> Optional[str]:
+    m = _ASN_RE.match(org or "")
+    return m.group(1) if m else None
+
+
+def _keys(rec: Dict[str, Any]) -> Dict[str, str]:
+    geo = rec.get("geo") or {}
+    keys = {
+        "public_ip": rec.get("public_ip"),
+        "username":  rec.get("username"),
+        "hostname":  rec.get("hostname"),
+        "country":   geo.get("country"),
+        "asn":       _asn(geo.get("org")),
+    }
+    return {k: v for k, v in keys.items() if v}
+
+
+def _parse_json_line(line: bytes) -> Tuple[Optional[float], Dict[str, str], Dict[str, Any]]:
+    """→ (epoch, index keys, record).  Encrypted lines come back as their envelope."""
+    env = json.loads(line)
+    try:
+        rec = json.loads(env["data"])
+    except (ValueError, TypeError):                      # base64 ciphertext
+        meta = env.get("meta") or {}
+        keys = _keys(meta)
+        if env.get("sig"):
+            keys["sig"] = env["sig"]
+        return _epoch(meta.get("timestamp_utc")), keys, env
+    keys = _keys(rec)
+    if env.get("sig"):
+        keys["sig"] = env["sig"]
+    return _epoch(rec.get("timestamp_utc")), keys, rec
+
+
+def _parse_plaintext_block(lines: List[str]) -> Dict[str, Any]:
+    """Rebuild the subset of SystemInfo that save_plaintext_log writes."""
+    rec: Dict[str, Any] = {"local_ips": {}, "mac_addresses": {}}
+    if lines and lines[0].startswith("["):
+        rec["timestamp_local"] = lines[0][1:lines[0].index("]")]
+    for line in lines[1:]:
+        label, _, value = line.partition(": ")
+        label = label.strip()
+        if label == "Username":
+            rec["username"] = value
+        elif label == "Hostname":
+            rec["hostname"] = value
+        elif label == "Public IP":
+            rec["public_ip"] = None if value == "N/A" else value
+        elif label == "Location" and (m := _LOC_RE.match(value)):
+            rec["geo"] = dict(zip(("city", "region", "country", "org"), m.groups()))
+        elif label == "Local IPs":
+            iface, _, ips = value.partition(": ")
+            rec["local_ips"][iface] = ips.split(", ")
+        elif label == "MAC Address":
+            iface, _, mac = value.partition(": ")
+            rec["mac_addresses"][iface] = mac
+        elif label == "Default Gateway":
+            rec["default_gateway"] = None if value == "N/A" else value
+        elif label == "UUID Hash":
+            rec["uuid_hash"] = value
+        elif label == "OS":
+            rec["os_line"] = value
+    return rec
+
+
+def _scan_jsonl(f, start: int) -> Tuple[List[Entry], int]:
+    f.seek(start)
+    out: List[Entry] = []
+    pos = start
+    for line in f:
+        if not line.endswith(b"\n"):                     # writer is mid‑append; pick it up next time
+            break
+        if line.strip():
+            try:
+                epoch, keys, _ = _parse_json_line(line)
+                out.append((pos, epoch, keys))
+            except (ValueError, KeyError, AttributeError):
+                pass
+        pos += len(line)
+    return out, pos
+
+
+def _scan_plaintext(f, start: int) -> Tuple[List[Entry], int]:
+    f.seek(start)
+    out: List[Entry] = []
+    pos = block_start = start
+    block: List[str] = []
+    for raw in f:
+        if not raw.endswith(b"\n"):
+            break
+        pos += len(raw)
+        line = raw.decode("utf-8", "replace").rstrip("\n")
+        if line == _SEPARATOR:
+            rec = _parse_plaintext_block(block)
+            out.append((block_start, _epoch(rec.get("timestamp_local")), _keys(rec)))
+            block, block_start = [], pos
+        else:
+            block.append(line)
+    return out, block_start                               # resume at the first incomplete block
+
+# ─────────────────────────── index maintenance ────────────────────────
+
+def _blank_index() -> Dict[str, Any]:
+    return {"version": INDEX_VERSION, "indexed_to": 0, "count": 0,
+            "keys": {f: {} for f in INDEX_FIELDS}, "times": []}
+
+
+def _index_path(log_path: pathlib.Path) -> pathlib.Path:
+    return log_path.with_name(log_path.name + INDEX_SUFFIX)
+
+
+def _load_index(log_path: pathlib.Path) -> Dict[str, Any]:
+    try:
+        idx = json.loads(_index_path(log_path).read_text(encoding="utf-8"))
+        if idx.get("version") == INDEX_VERSION:
+            return idx
+    except (OSError, ValueError):
+        pass
+    return _blank_index()
+
+
+def update_index(log_path: pathlib.Path) -> Dict[str, Any]:
+    """Bring `log_path`'s sidecar index up to date and return it."""
+    log_path = pathlib.Path(log_path)
+    idx = _load_index(log_path)
+    size = log_path.stat().st_size
+    if size < idx["indexed_to"]:
+        idx = _blank_index()
+    if size == idx["indexed_to"]:
+        return idx
+
+    scan = _scan_jsonl if log_path.name.endswith(JSON_SUFFIX) else _scan_plaintext
+    with log_path.open("rb") as f:
+        entries, idx["indexed_to"] = scan(f, idx["indexed_to"])
+    for offset, epoch, keys in entries:
+        for field, value in keys.items():
+            idx["keys"][field].setdefault(value, []).append(offset)
+        idx["times"].append([offset, epoch])
+    idx["count"] += len(entries)
+
+    tmp = _index_path(log_path).with_suffix(".tmp")
+    tmp.write_text(json.dumps(idx, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, _index_path(log_path))
+    return idx
+
+
+def _log_files(log_dir: pathlib.Path) -> List[Tuple[datetime.date, pathlib.Path]]:
+    out = []
+    for p in pathlib.Path(log_dir).iterdir():
+        if p.name[8:] in (JSON_SUFFIX, PLAINTEXT_SUFFIX):      # skips .idx sidecars and .gcm sink files
+            try:
+                out.append((datetime.datetime.strptime(p.name[:8], "%Y%m%d").date(), p))
+            except ValueError:
+                continue
+    return sorted(out)
+
+
+def update_all(log_dir: pathlib.Path = LOG_DIR) -> int:
+    """Refresh every sidecar index under `log_dir`; returns the number of indexed records."""
+    return sum(update_index(p)["count"] for _, p in _log_files(log_dir))
+
+# ─────────────────────────── query API ────────────────────────────────
+
+def _read_at(f, offset: int, plaintext: bool, key: bytes | None) -> Dict[str, Any]:
+    f.seek(offset)
+    if not plaintext:
+        _, _, rec = _parse_json_line(f.readline())
+        if key and "sig" in rec and "data" in rec:
+            from base64 import b64decode
+            from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+            frame = b64decode(rec["data"])
+            rec = json.loads(AESGCM(key).decrypt(frame[:12], frame[12:], None))
+        return rec
+    block = []
+    for raw in f:
+        line = raw.decode("utf-8", "replace").rstrip("\n")
+        if line == _SEPARATOR:
+            break
+        block.append(line)
+    return _parse_plaintext_block(block)
+
+
+def query(log_dir: pathlib.Path = LOG_DIR, *, public_ip: str | None = None, username: str | None = None,
+          hostname: str | None = None, country: str | None = None, asn: str | None = None,
+          sig: str | None = None, since: datetime.datetime | None = None, until: datetime.datetime | None = None,
+          days: int | None = None, kind: str = "json", key: bytes | None = None,
+          refresh: bool = True) -> Iterator[Dict[str, Any]]:
+    """Yield records matching every given filter, oldest file first.
+
+    `kind` is "json" (YYYYMMDD.jsonl), "plaintext" (…_failed_login.log) or "all".
+    `days` is shorthand for `since = now - days`.  Timestamps are UTC.
+    Encrypted records are returned as their envelope unless `key` is given.
+    """
+    filters = {k: v for k, v in (("public_ip", public_ip), ("username", username), ("hostname", hostname),
+                                 ("country", country), ("asn", asn), ("sig", sig)) if v is not None}
+    now = datetime.datetime.now(datetime.timezone.utc)
+    if days is not None:
+        since = now - datetime.timedelta(days=days)
+    lo = since.replace(tzinfo=since.tzinfo or datetime.timezone.utc).timestamp() if since else None
+    hi = until.replace(tzinfo=until.tzinfo or datetime.timezone.utc).timestamp() if until else None
+
+    for day, path in _log_files(log_dir):
+        plaintext = path.name.endswith(PLAINTEXT_SUFFIX)
+        if kind != "all" and plaintext != (kind == "plaintext"):
+            continue
+        if (since and day < since.date()) or (until and day > until.date()):
+            continue
+        idx = update_index(path) if refresh else _load_index(path)
+
+        offsets: Optional[set] = None
+        for field, value in filters.items():
+            hits = set(idx["keys"][field].get(value, ()))
+            offsets = hits if offsets is None else offsets & hits
+            if not offsets:
+                break
+        if offsets is not None and not offsets:
+            continue
+        if lo is not None or hi is not None:
+            in_range = {off for off, ep in idx["times"]
+                        if ep is None or ((lo is None or ep >= lo) and (hi is None or ep <= hi))}
+            offsets = in_range if offsets is None else offsets & in_range
+        if offsets is None:
+            offsets = {off for off, _ in idx["times"]}
+
+        with path.open("rb") as f:
+            for off in sorted(offsets):
+                yield _read_at(f, off, plaintext, key)
+
+# ─────────────────────────── CLI entry ────────────────────────────────
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Query attacker_info logs through sidecar indexes.")
+    ap.add_argument("--dir", type=pathlib.Path, default=LOG_DIR)
+    ap.add_argument("--ip", dest="public_ip")
+    ap.add_argument("--user", dest="username")
+    ap.add_argument("--host", dest="hostname")
+    ap.add_argument("--country")
+    ap.add_argument("--asn")
+    ap.add_argument("--sig")
+    ap.add_argument("--days", type=int)
+    ap.add_argument("--kind", choices=["json", "plaintext", "all"], default="json")
+    ap.add_argument("--reindex", action="store_true", help="only refresh indexes, print record count")
+    args = ap.parse_args()
+
+    if args.reindex:
+        print("indexed records:", update_all(args.dir))
+    else:
+        opts = {k: v for k, v in vars(args).items() if k not in ("dir", "reindex")}
+        n = 0
+        for rec in query(args.dir, **opts):
+            print(json.dumps(rec, ensure_ascii=False))
+            n += 1
+        print(f"✔ {n} record(s)")
@@ -0,0 +1,432 @@
+"""
+bench_attacker_info.py — Latency benchmarks for attacker_info
+------------------------------------------------------------------------------
+* Spins up local stub HTTP servers that stand in for the public‑IP / geo services
+  so nothing leaves the machine and results are repeatable.
+* Scenarios: all providers healthy, first provider slow, first provider dead
+  (accepts but never answers) + second refusing connections.
+* Reports p50/p99 of `collect_attacker_info()` in serial vs deadline mode (caches
+  cleared before every call) and with warm caches.
+* `writer` suite: records/second of the per‑call save_*_log path vs LogWriter.
+* `crypto` suite: µs/record and bytes/record of save_json_log(key=…) vs
+  EncryptedLogSink (jsonl / binary, per record and batched).
+* `archive` suite: size and full / projected scan time of raw JSON‑L vs the
+  columnar archive from attacker_info_archive.
+* `events` suite: traced memory of a window of SystemInfo objects vs the
+  array‑backed EventStore (1M events by default).
+* `detect` suite: events/second of RateDetector replaying a synthetic trace
+  (background noise + single‑IP brute force, /24 spread, username spray).
+* `geoip` suite: lookups/second of the offline GeoIP db (attacker_info_geoip)
+  over random IPv4 / IPv6 addresses vs per‑event HTTP geo calls to the stub.
+* `import` suite: `-X importtime` cost of each attacker_info module in a fresh
+  interpreter; exits non‑zero if over budget or if a heavy dependency
+  (requests, psutil, …) gets imported eagerly again.
+
+Run:
+    python bench_attacker_info.py collect --runs 20
+    python bench_attacker_info.py writer --records 100000
+    python bench_attacker_info.py crypto --records 50000
+    python bench_attacker_info.py archive --records 200000
+    python bench_attacker_info.py events --records 1000000
+    python bench_attacker_info.py detect --records 1000000
+    python bench_attacker_info.py geoip --records 2000000
+    python bench_attacker_info.py import --runs 7 --max-ms 50
+
+Auther : SpectralZero
+"""
+from __future__ import annotations
+
+import argparse, datetime, gc, json, os, pathlib, random, socket, statistics, subprocess, sys, tempfile, threading, time, tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List
+
+import attacker_info
+
+# ─────────────────────────── stub servers ─────────────────────────────
+
+def _stub_server(delay: float = 0.0, hang: bool = False) -> ThreadingHTTPServer:
+    """Serve `{"ip": ...}` for every path (geo requests get a tiny geo doc) after `delay` s."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if hang:
+                time.sleep(3600)
+            time.sleep(delay)
+            body = {"city": "Stubville", "region": "Local", "country": "ZZ", "org": "AS0 Stub"} \
+                if "/geo/" in self.path else {"ip": "203.0.113.7"}
+            raw = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def log_message(self, *args):
+            pass
+
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    srv.daemon_threads = True
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv
+
+
+def _dead_port() -> int:
+    """A port with nothing listening → immediate ConnectionRefused."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _url(srv: ThreadingHTTPServer) -> str:
+    return f"http://127.0.0.1:{srv.server_address[1]}"
+
+
+# ─────────────────────────── measurement ──────────────────────────────
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    xs = sorted(samples)
+    pick = lambda q: xs[min(int(q * len(xs)), len(xs) - 1)]
+    return {"p50_ms": pick(0.50) * 1e3, "p99_ms": pick(0.99) * 1e3, "mean_ms": statistics.fmean(xs) * 1e3}
+
+
+def _time(fn: Callable[[], object], runs: int) -> List[float]:
+    out = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        out.append(time.perf_counter() - t0)
+    return out
+
+
+def _cold(fn: Callable[..., object], **kw) -> object:
+    attacker_info.clear_caches()
+    return fn(**kw)
+
+
+def bench_collect(runs: int, deadline: float) -> None:
+    fast, slow, hung = _stub_server(), _stub_server(delay=1.5), _stub_server(hang=True)
+    geo = _url(fast) + "/geo/{ip}"
+    scenarios = {
+        "healthy": [_url(fast) + "/ip", _url(fast) + "/ip"],
+        "slow":    [_url(slow) + "/ip", _url(fast) + "/ip"],
+        "dead":    [_url(hung) + "/ip", f"http://127.0.0.1:{_dead_port()}/ip"],
+    }
+    attacker_info.GEO_IP_SVC = geo
+    print(f"{'scenario':<10}{'mode':<12}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for name, providers in scenarios.items():
+        attacker_info.PUBLIC_IP_SVC = providers
+        for mode, fn in (("serial",   lambda: _cold(attacker_info.collect_attacker_info)),
+                         ("deadline", lambda: _cold(attacker_info.collect_attacker_info, deadline=deadline)),
+                         ("cached",   lambda: attacker_info.collect_attacker_info(deadline=deadline))):
+            st = _percentiles(_time(fn, runs))
+            print(f"{name:<10}{mode:<12}{st['p50_ms']:>10.1f}{st['p99_ms']:>10.1f}{st['mean_ms']:>10.1f}")
+
+
+def _sample_info(i: int = 0) -> attacker_info.SystemInfo:
+    return attacker_info.SystemInfo(
+        timestamp_utc="2025-01-01T00:00:00.000000Z", timestamp_local="2025-01-01T02:00:00.000000Z",
+        hostname="ws-042", username=f"user{i % 50}", os="Linux", os_release="6.8.0",
+        os_version="#1 SMP PREEMPT_DYNAMIC", architecture="x86_64",
+        public_ip=f"198.51.100.{i % 256}", geo={"city": "Stubville", "region": "Local", "country": "ZZ", "org": "AS0 Stub"},
+        local_ips={"lo": ["127.0.0.1", "::1"], "eth0": ["10.0.0.5", "fe80::1"]},
+        mac_addresses={"lo": "00:00:00:00:00:00", "eth0": "52:54:00:12:34:56"},
+        default_gateway="10.0.0.1", uuid_hash="ab" * 32,
+    )
+
+
+def bench_writer(records: int) -> None:
+    infos = [_sample_info(i) for i in range(1000)]
+    print(f"{'path':<32}{'records/s':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        d = pathlib.Path(tmp)
+        for name, save in (("save_json_log (per call)", attacker_info.save_json_log),
+                           ("save_plaintext_log (per call)", attacker_info.save_plaintext_log)):
+            t0 = time.perf_counter()
+            for i in range(records):
+                save(infos[i % 1000], d)
+            print(f"{name:<32}{records / (time.perf_counter() - t0):>14,.0f}")
+
+        for name, meth in (("LogWriter.save_json", "save_json"), ("LogWriter.save_plaintext", "save_plaintext")):
+            w = attacker_info.LogWriter(d, max_queue=records + 1)
+            submit = getattr(w, meth)
+            t0 = time.perf_counter()
+            for i in range(records):
+                submit(infos[i % 1000])
+            enq = time.perf_counter() - t0
+            w.close()
+            total = time.perf_counter() - t0
+            print(f"{name:<32}{records / total:>14,.0f}   (caller side {records / enq:,.0f}/s, {w.batches} batches)")
+
+
+def bench_crypto(records: int, batch: int = 64) -> None:
+    key = os.urandom(32)
+    infos = [_sample_info(i) for i in range(1000)]
+    print(f"{'path':<32}{'µs/record':>12}{'bytes/record':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        def report(name: str, elapsed: float, path: pathlib.Path) -> None:
+            print(f"{name:<32}{elapsed / records * 1e6:>12.1f}{path.stat().st_size / records:>14.1f}")
+
+        d = pathlib.Path(tmp, "legacy"); d.mkdir()
+        t0 = time.perf_counter()
+        for i in range(records):
+            p = attacker_info.save_json_log(infos[i % 1000], d, key)
+        report("save_json_log(key)", time.perf_counter() - t0, p)
+
+        for fmt in ("jsonl", "binary"):
+            for n in (1, batch):
+                d = pathlib.Path(tmp, f"{fmt}{n}"); d.mkdir()
+                sink = attacker_info.EncryptedLogSink(key, d, fmt)
+                t0 = time.perf_counter()
+                for i in range(0, records, n):
+                    p = sink.write_batch([infos[(i + j) % 1000] for j in range(min(n, records - i))])
+                sink.close()
+                report(f"sink {fmt} batch={n}", time.perf_counter() - t0, p)
+
+                t0 = time.perf_counter()
+                got = sum(1 for _ in attacker_info.iter_encrypted_log(p, key))
+                assert got == records, (got, records)
+                print(f"{'  └ read back':<32}{(time.perf_counter() - t0) / records * 1e6:>12.1f}")
+
+
+def bench_archive(records: int) -> None:
+    import attacker_info_archive as archive
+    infos = [_sample_info(i) for i in range(1000)]
+    t = datetime.datetime(2025, 1, 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        src = pathlib.Path(tmp, "20250101.jsonl")
+        with src.open("w", encoding="utf-8") as f:
+            for i in range(records):
+                info = infos[i % 1000]
+                info.timestamp_utc = (t + datetime.timedelta(milliseconds=37 * i)).strftime(attacker_info.TIME_FMT)
+                info.timestamp_local = info.timestamp_utc
+                f.write(attacker_info._format_json_record(info))
+
+        t0 = time.perf_counter()
+        rows = archive._read_jsonl(src)[0]
+        archive.write_archive(rows, dst := src.with_suffix(archive.ARCHIVE_SUFFIX))
+        build = time.perf_counter() - t0
+
+        def scan_jsonl(col: str | None) -> int:
+            n = 0
+            with src.open(encoding="utf-8") as f:
+                for line in f:
+                    rec = json.loads(json.loads(line)["data"])
+                    n += 1 if col is None else rec[col] is not None
+            return n
+
+        print(f"records            {records:>12,}")
+        print(f"jsonl size         {src.stat().st_size:>12,} B")
+        print(f"archive size       {dst.stat().st_size:>12,} B  ({src.stat().st_size / dst.stat().st_size:.0f}x smaller, built in {build:.2f}s)")
+        print(f"{'scan':<28}{'jsonl s':>10}{'archive s':>12}")
+        for label, cols in (("all columns", None), ("public_ip only", ["public_ip"]),
+                            ("timestamps only", ["timestamp_utc", "timestamp_local"])):
+            t0 = time.perf_counter()
+            scan_jsonl(cols[0] if cols else None)
+            raw = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            n = sum(1 for _ in archive.iter_rows(dst, cols))
+            col = time.perf_counter() - t0
+            assert n == records
+            print(f"{label:<28}{raw:>10.3f}{col:>12.3f}")
+
+
+def _fresh_info(i: int, t0: datetime.datetime) -> attacker_info.SystemInfo:
+    """A SystemInfo with its own dicts/strings, as collect_attacker_info() would return."""
+    info = _sample_info(i % 5000)
+    ts = (t0 + datetime.timedelta(milliseconds=i)).strftime(attacker_info.TIME_FMT)
+    info.timestamp_utc, info.timestamp_local = ts, ts[:]
+    return info
+
+
+def bench_events(events: int, baseline_cap: int = 200_000) -> None:
+    from attacker_info_events import EventStore
+    t0 = datetime.datetime(2025, 1, 1)
+
+    # baseline: list of SystemInfo objects (capped, then extrapolated — 1M of them needs GBs)
+    n = min(events, baseline_cap)
+    gc.collect()
+    tracemalloc.start()
+    window = [_fresh_info(i, t0) for i in range(n)]
+    base = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del window
+    gc.collect()
+
+    tracemalloc.start()
+    store = EventStore(capacity=events)
+    for i in range(events):
+        store.append(_fresh_info(i, t0))
+    compact = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    t = time.perf_counter()
+    k = min(events, 100_000)
+    for j in range(k):
+        store.json_line(j)
+    js = (time.perf_counter() - t) / k
+    info = _fresh_info(0, t0)
+    t = time.perf_counter()
+    for _ in range(k):
+        attacker_info._record_json(info)
+    ref = (time.perf_counter() - t) / k
+
+    print(f"events                     {events:>14,}")
+    print(f"list[SystemInfo]           {base / n * events / 2**20:>12.1f} MiB  ({base / n:,.0f} B/event, measured on {n:,})")
+    print(f"EventStore                 {compact / 2**20:>12.1f} MiB  ({compact / events:,.0f} B/event, {len(store.hosts)} host facts)")
+    print(f"EventStore.json_line       {js * 1e6:>12.2f} µs   vs _record_json {ref * 1e6:.2f} µs")
+
+
+def _attack_trace(events: int, rate: float = 2000.0, seed: int = 7) -> list:
+    """(ts, ip, user) tuples at `rate` ev/s: 85 % noise, 5 % each of three attack patterns."""
+    rnd = random.Random(seed)
+    noise_ips = [f"{rnd.randrange(1, 224)}.{rnd.randrange(256)}.{rnd.randrange(256)}.{rnd.randrange(256)}"
+                 for _ in range(50_000)]
+    noise_users = [f"user{i}" for i in range(20_000)]
+    trace, t = [], 1_700_000_000.0
+    for _ in range(events):
+        t += 1.0 / rate
+        r = rnd.random()
+        if r < 0.05:
+            trace.append((t, "203.0.113.66", rnd.choice(noise_users)))                    # brute force
+        elif r < 0.10:
+            trace.append((t, f"198.51.100.{rnd.randrange(256)}", rnd.choice(noise_users)))  # /24 spread
+        elif r < 0.15:
+            trace.append((t, rnd.choice(noise_ips), "admin"))                               # spraying
+        else:
+            trace.append((t, rnd.choice(noise_ips), rnd.choice(noise_users)))
+    return trace
+
+
+def bench_detect(events: int) -> None:
+    from attacker_info_detect import RateDetector
+    trace = _attack_trace(events)
+    det = RateDetector(window_s=60, thresholds={"public_ip": 200, "username": 200, "subnet": 500})
+    observe = det.observe_raw
+    t0 = time.perf_counter()
+    for ts, ip, user in trace:
+        observe(ts, ip, user)
+    dt = time.perf_counter() - t0
+    st = det.stats()
+    print(f"events          {events:>12,}")
+    print(f"throughput      {events / dt:>12,.0f} events/s  (observe_raw, one core)")
+    print(f"sketch memory   {st['sketch_bytes'] / 2**20:>12.1f} MiB")
+    print(f"alerts          {st['alerts']:>12,}")
+    keys = sorted({(a.dimension, a.key) for a in det.recent_alerts})
+    for dim, key in keys[:10]:
+        print(f"  {dim:<10} {key}")
+
+
+def _synthetic_geo_rows(n4: int, n6: int, seed: int = 11) -> List[Dict[str, str]]:
+    """Random /12–/24 IPv4 and /20–/40 IPv6 (inside 2001::/16) networks, some nested, over 5000 places."""
+    rnd = random.Random(seed)
+    places = [(f"City{i}", f"Region{i % 300}", f"C{i % 200:03d}", f"AS{64512 + i % 1000} Org{i % 1000}")
+              for i in range(5000)]
+    rows = []
+    for version, n in ((4, n4), (6, n6)):
+        bits = 32 if version == 4 else 128
+        lo, hi = (12, 24) if version == 4 else (20, 40)
+        for _ in range(n):
+            plen = rnd.randint(lo, hi)
+            net = rnd.getrandbits(plen) << (bits - plen)
+            if version == 6:
+                net = 0x2001 << 112 | net >> 16
+            addr = socket.inet_ntop(socket.AF_INET if version == 4 else socket.AF_INET6, net.to_bytes(bits // 8, "big"))
+            rows.append(dict(zip(("network", "city", "region", "country", "org"), (f"{addr}/{plen}", *rnd.choice(places)))))
+    return rows
+
+
+def bench_geoip(lookups: int, n4: int = 300_000, n6: int = 50_000, http_sample: int = 200) -> None:
+    from attacker_info_geoip import GeoIPDB, compile_db
+    rnd = random.Random(3)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = pathlib.Path(tmp) / "geo.db"
+        t0 = time.perf_counter()
+        c4, c6 = compile_db(_synthetic_geo_rows(n4, n6), path)
+        build = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        db = GeoIPDB(path)
+        opened = time.perf_counter() - t0
+        half = lookups // 2
+        v4 = [socket.inet_ntoa(rnd.getrandbits(32).to_bytes(4, "big")) for _ in range(half)]
+        v6 = [socket.inet_ntop(socket.AF_INET6, (0x2001 << 112 | rnd.getrandbits(112)).to_bytes(16, "big"))
+              for _ in range(lookups - half)]
+        print(f"networks        {n4:>10,} v4 + {n6:,} v6 → {c4:,} + {c6:,} intervals")
+        print(f"db size         {path.stat().st_size / 2**20:>10.1f} MiB  (built in {build:.1f} s, opened in {opened * 1e3:.2f} ms)")
+        lookup = db.lookup
+        for family, ips in (("IPv4", v4), ("IPv6", v6)):
+            hits = 0
+            t0 = time.perf_counter()
+            for ip in ips:
+                if lookup(ip) is not None:
+                    hits += 1
+            dt = time.perf_counter() - t0
+            print(f"offline {family}    {len(ips) / dt:>10,.0f} lookups/s  ({dt / len(ips) * 1e6:.2f} µs each, {hits / len(ips):.0%} hit)")
+        db.close()
+
+    srv = _stub_server()
+    attacker_info.GEO_IP_SVC = _url(srv) + "/geo/{ip}"
+    t0 = time.perf_counter()
+    for ip in v4[:http_sample]:
+        attacker_info._fetch_geo(ip)
+    dt = time.perf_counter() - t0
+    srv.shutdown()
+    print(f"http (stub)     {http_sample / dt:>10,.0f} lookups/s  ({dt / http_sample * 1e6:.0f} µs each, loopback)")
+
+
+LAZY_MODULES  = ("requests", "urllib3", "psutil", "uuid", "platform", "concurrent.futures", "logging", "cryptography")
+IMPORT_CHECKS = ("attacker_info", "attacker_info_query", "attacker_info_archive", "attacker_info_events",
+                 "attacker_info_detect", "attacker_info_geoip")
+
+
+def _import_cost_us(module: str) -> tuple:
+    """(cumulative µs for `module`, eagerly loaded heavy modules) in a fresh interpreter."""
+    probe = f"import {module}, sys; print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", probe], capture_output=True, text=True,
+                         cwd=pathlib.Path(__file__).parent, check=True)
+    cost = 0
+    for line in out.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            cost = int(parts[1])
+    return cost, [m for m in out.stdout.strip().split(",") if m]
+
+
+def bench_import(runs: int, max_ms: float) -> int:
+    failed = 0
+    print(f"{'module':<24}{'median ms':>10}{'max ms':>10}  eager heavy imports")
+    for module in IMPORT_CHECKS:
+        costs, eager = [], set()
+        for _ in range(runs):
+            us, heavy = _import_cost_us(module)
+            costs.append(us / 1e3)
+            eager.update(heavy)
+        med = statistics.median(costs)
+        bad = med > max_ms or eager
+        failed += bool(bad)
+        print(f"{module:<24}{med:>10.1f}{max(costs):>10.1f}  {', '.join(sorted(eager)) or '-'}{'  ✘' if bad else ''}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("suite", nargs="?", choices=["collect", "writer", "crypto", "archive", "events", "detect", "geoip", "import"], default="collect")
+    ap.add_argument("--runs", type=int, default=10)
+    ap.add_argument("--deadline", type=float, default=attacker_info.COLLECT_DEADLINE)
+    ap.add_argument("--records", type=int, default=50_000)
+    ap.add_argument("--max-ms", type=float, default=50.0, help="import suite: budget per module")
+    args = ap.parse_args()
+    if args.suite == "collect":
+        bench_collect(args.runs, args.deadline)
+    elif args.suite == "writer":
+        bench_writer(args.records)
+    elif args.suite == "crypto":
+        bench_crypto(args.records)
+    elif args.suite == "archive":
+        bench_archive(args.records)
+    elif args.suite == "events":
+        bench_events(args.records)
+    elif args.suite == "detect":
+        bench_detect(args.records)
+    elif args.suite == "geoip":
+        bench_geoip(args.records)
+    elif args.suite == "import":
+        raise SystemExit(bench_import(args.runs, args.max_ms))
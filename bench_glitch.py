@@ -0,0 +1,394 @@
+"""
+bench_glitch.py — Headless benchmarks for the glitch.py effects
+------------------------------------------------------------------------------
+* No display needed: glitch.py only opens its Tk window when run directly.
+* `effects` suite: ms per frame for each effect (shift_band,
+  color_channel_shift, scanlines, noise) at every `--sizes` resolution,
+  old per-pixel PIL code vs GlitchEngine's NumPy version on one reused
+  frame buffer, plus a full random glitch frame (apply + to_image).
+* The deterministic effects are checked pixel for pixel against the PIL
+  version before timing; noise is checked for the number of pixels touched.
+* `frames` suite: `--ticks` frames of the window's animation, the old
+  pipeline (full-screen create_base_image + font lookup per glitched string,
+  full-frame copy every tick) vs GlitchAnimation (font loaded once, text
+  tiles on a cached frame, prerendered LRU tile pool). Reports ms per tick
+  (mean / p99 / max) and Pillow image allocations per tick.
+* `pacing` suite: the render loop for `--seconds` with time.sleep standing
+  in for canvas.after — the old fixed 10 ms wait vs FramePacer at `--fps`,
+  and FramePacer with a periodic stall. Reports achieved fps, how many
+  frames need a PhotoImage conversion (unchanged ones are skipped) and
+  dropped frames. The conversion itself needs a display and is not timed.
+* `render` suite: glitch.render_frames → save_frames for `--ticks` frames
+  per size and output format, each run in a fresh process. Reports time per
+  stage (text render, text compose, effects, array → PIL export, encode,
+  and PhotoImage.paste when a display is available), peak RSS, and whether
+  two runs with the same seed give byte-identical frames.
+
+Run:
+    python bench_glitch.py effects --sizes 1080p,4k --frames 30
+    python bench_glitch.py frames --sizes 1080p --ticks 3000
+    python bench_glitch.py pacing --sizes 1080p --seconds 5 --fps 60
+    python bench_glitch.py render --sizes 1080p,4k --ticks 600 --formats raw,gif
+
+Auther : SpectralZero
+"""
+from __future__ import annotations
+
+import argparse, hashlib, os, random, resource, tempfile, time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+from PIL import Image, ImageChops, ImageDraw, ImageFont
+
+import glitch
+from glitch import BASE_TEXT, TARGET_FPS, FramePacer, GlitchAnimation, GlitchEngine, create_glitch_text, load_font
+
+SIZES: Dict[str, Tuple[int, int]] = {"720p": (1280, 720), "1080p": (1920, 1080), "1440p": (2560, 1440),
+                                     "4k": (3840, 2160)}
+
+# ─────────────────────────── reference (old PIL code) ─────────────────
+
+def pil_shift_band(img: Image.Image, glitch_height: int, glitch_start: int, glitch_shift: int) -> Image.Image:
+    band = img.crop((0, glitch_start, img.width, glitch_start + glitch_height))
+    img.paste(band, (glitch_shift, glitch_start))
+    return img
+
+
+def pil_color_channel_shift(img: Image.Image, channel: str, shift: int) -> Image.Image:
+    bands = list(img.split())
+    i = "RGB".index(channel)
+    bands[i] = ImageChops.offset(bands[i], shift, 0)
+    return Image.merge("RGB", bands)
+
+
+def pil_scanlines(img: Image.Image, line_spacing: int) -> Image.Image:
+    draw = ImageDraw.Draw(img)
+    for y in range(0, img.height, line_spacing):
+        draw.line([(0, y), (img.width, y)], fill=(0, 0, 0))
+    return img
+
+
+def pil_noise(img: Image.Image, count: int) -> Image.Image:
+    pixels = img.load()
+    for _ in range(count):
+        x = random.randint(0, img.width - 1)
+        y = random.randint(0, img.height - 1)
+        pixels[x, y] = (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
+    return img
+
+
+class LegacyAnimation:
+    """The window's tick logic as it was: a new full-screen image per glitched string, a copy per tick."""
+
+    def __init__(self, width: int, height: int, seed: int = 1):
+        self.width, self.height = width, height
+        self.random = random.Random(seed)
+        self.engine = GlitchEngine(width, height, seed + 2)
+        self.font_lookups = 0
+        self.base_image = self.current_image = self.create_base_image(BASE_TEXT)
+        self.glitched_text_image = None
+        self.text_cd = self.text_dur = self.img_cd = self.img_dur = 0
+
+    def create_base_image(self, text: str) -> Image.Image:
+        image = Image.new("RGB", (self.width, self.height), "black")
+        draw = ImageDraw.Draw(image)
+        self.font_lookups += 1
+        try:
+            font = ImageFont.truetype("arial.ttf", 60)
+        except IOError:
+            font = ImageFont.load_default()
+        bbox = draw.textbbox((0, 0), text, font=font)
+        draw.text(((self.width - (bbox[2] - bbox[0])) // 2, (self.height - (bbox[3] - bbox[1])) // 2), text,
+                  font=font, fill="Red")
+        return image
+
+    def tick(self) -> Image.Image:
+        rnd = self.random
+        if self.text_cd <= 0 and self.text_dur <= 0:
+            if rnd.random() < 0.9:
+                self.text_dur, self.text_cd = rnd.randint(10, 30), rnd.randint(200, 400)
+                self.glitched_text_image = self.create_base_image(create_glitch_text(BASE_TEXT, 0.1, rnd))
+        elif self.text_dur > 0:
+            self.text_dur -= 1
+            self.current_image = self.glitched_text_image
+        else:
+            self.text_cd -= 1
+            self.current_image = self.base_image
+        display_image = self.current_image.copy()
+        if self.img_cd <= 0 and self.img_dur <= 0:
+            if rnd.random() < 0.08:
+                self.img_dur, self.img_cd = rnd.randint(5, 15), rnd.randint(60, 180)
+        elif self.img_dur > 0:
+            self.engine.load(display_image)
+            self.engine.apply_random()
+            display_image = self.engine.to_image()
+            self.img_dur -= 1
+        else:
+            self.img_cd -= 1
+        return display_image
+
+# ─────────────────────────── helpers ──────────────────────────────────
+
+def base_frame(width: int, height: int) -> Image.Image:
+    """Red text on black, like the glitch window, plus a gradient so shifts are visible everywhere."""
+    img = Image.new("RGB", (width, height), "black")
+    arr = np.asarray(img).copy()
+    arr[..., 1] = (np.arange(width) * 255 // max(width - 1, 1)).astype(np.uint8)
+    arr[..., 2] = (np.arange(height)[:, None] * 255 // max(height - 1, 1)).astype(np.uint8)
+    img = Image.fromarray(arr)
+    ImageDraw.Draw(img).text((width // 2 - 60, height // 2), "ACCESS DENIED", fill="red")
+    return img
+
+
+def _time(fn: Callable[[], object], frames: int) -> float:
+    """ms per call: mean of the fastest half (ignores GC and scheduler hiccups)."""
+    samples: List[float] = []
+    for _ in range(frames):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    samples.sort()
+    return sum(samples[: max(1, len(samples) // 2)]) / max(1, len(samples) // 2) * 1e3
+
+
+def check(engine: GlitchEngine, base: Image.Image) -> List[str]:
+    """Differences between GlitchEngine and the PIL reference (empty = identical)."""
+    bad = []
+    cases = [("shift_band", (h, s, d), pil_shift_band) for h, s, d in ((5, 0, 20), (30, 100, -20), (12, 7, 0))]
+    cases += [("color_channel_shift", (c, d), pil_color_channel_shift) for c in "RGB" for d in (-5, 3, 0)]
+    cases += [("scanlines", (sp,), pil_scanlines) for sp in (3, 10)]
+    engine.load(base)
+    engine.scanlines(4, (10, 200, 30))
+    if not (engine.frame[::4] == (10, 200, 30)).all() or not np.array_equal(engine.frame[1::4], np.asarray(base)[1::4]):
+        bad.append("scanlines colour")
+    for name, params, ref in cases:
+        engine.load(base)
+        getattr(engine, name)(*params)
+        if not np.array_equal(engine.frame, np.asarray(ref(base.copy(), *params))):
+            bad.append(f"{name}{params}")
+    engine.load(base)
+    engine.noise(1000)
+    changed = int(np.any(engine.frame != np.asarray(base), axis=2).sum())
+    if not 900 <= changed <= 1000:
+        bad.append(f"noise touched {changed} pixels for 1000")
+    return bad
+
+# ─────────────────────────── suites ───────────────────────────────────
+
+def bench_effects(sizes: List[str], frames: int) -> None:
+    for label in sizes:
+        width, height = SIZES[label]
+        base = base_frame(width, height)
+        engine = GlitchEngine(width, height, seed=1)
+        problems = check(engine, base)
+        print(f"\n{label} ({width}x{height}), {frames} frames each — "
+              + ("output identical to PIL" if not problems else "MISMATCH: " + ", ".join(problems)))
+        print(f"{'effect':<22}{'PIL ms':>10}{'NumPy ms':>10}{'speed-up':>10}")
+        pix = width * height // 100
+        rows = (("shift_band", lambda img: pil_shift_band(img, 30, height // 2, 17),
+                 lambda: engine.shift_band(30, height // 2, 17)),
+                ("color_channel_shift", lambda img: pil_color_channel_shift(img, "G", -5),
+                 lambda: engine.color_channel_shift("G", -5)),
+                ("scanlines", lambda img: pil_scanlines(img, 3), lambda: engine.scanlines(3)),
+                ("noise", lambda img: pil_noise(img, pix), lambda: engine.noise(pix)))
+        for name, old, new in rows:
+            img = base.copy()
+            t_old = _time(lambda: old(img), max(3, frames // 10) if name == "noise" else frames)
+            engine.load(base)
+            t_new = _time(new, frames)
+            print(f"{name:<22}{t_old:>10.2f}{t_new:>10.2f}{t_old / t_new:>9.0f}×")
+        base_arr = np.asarray(base).copy()
+        t_frame = _time(lambda: (engine.load(base_arr), engine.apply_random(), engine.to_image()), frames)
+        print(f"{'random frame (1-3 fx)':<22}{'':>10}{t_frame:>10.2f}   incl. load + to_image")
+
+
+def _run_ticks(anim, ticks: int) -> Dict[str, float]:
+    before = Image.core.get_stats()
+    samples: List[float] = []
+    for _ in range(ticks):
+        t0 = time.perf_counter()
+        anim.tick()
+        samples.append(time.perf_counter() - t0)
+    after = Image.core.get_stats()
+    samples.sort()
+    return {"mean": sum(samples) / ticks * 1e3, "p99": samples[int(ticks * 0.99)] * 1e3, "max": samples[-1] * 1e3,
+            "images": (after["new_count"] - before["new_count"]) / ticks,
+            "blocks": (after["allocated_blocks"] - before["allocated_blocks"]) / ticks}
+
+
+def bench_frames(sizes: List[str], ticks: int) -> None:
+    for label in sizes:
+        width, height = SIZES[label]
+        print(f"\n{label} ({width}x{height}), {ticks:,} ticks (PhotoImage conversion not included)")
+        print(f"{'pipeline':<26}{'mean ms':>9}{'p99 ms':>9}{'max ms':>9}{'images/tick':>13}{'blocks/tick':>13}"
+              f"{'font lookups':>14}")
+        legacy = LegacyAnimation(width, height)
+        r = _run_ticks(legacy, ticks)
+        print(f"{'old (image per string)':<26}{r['mean']:>9.2f}{r['p99']:>9.2f}{r['max']:>9.2f}{r['images']:>13.2f}"
+              f"{r['blocks']:>13.2f}{legacy.font_lookups:>14}")
+        for name, prerender in (("tiles + pool", False), ("tiles + prerender thread", True)):
+            anim = GlitchAnimation(width, height, seed=1, prerender=prerender)
+            r = _run_ticks(anim, ticks)
+            anim.close()
+            print(f"{name:<26}{r['mean']:>9.2f}{r['p99']:>9.2f}{r['max']:>9.2f}{r['images']:>13.2f}"
+                  f"{r['blocks']:>13.2f}{load_font.cache_info().misses:>14}   {anim.pool.counters}")
+
+
+def _fixed_wait_loop(anim: GlitchAnimation, seconds: float) -> Dict[str, float]:
+    frames, t0 = 0, time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        anim.tick()
+        frames += 1
+        time.sleep(0.010)                        # canvas.after(10, ...) whatever the frame cost
+    return {"frames": frames, "fps": frames / (time.perf_counter() - t0), "drawn": frames, "unchanged": 0,
+            "dropped": "n/a"}
+
+
+def _paced_loop(anim: GlitchAnimation, seconds: float, fps: int, stall_every: int = 0,
+                stall_ms: float = 0.0) -> Dict[str, float]:
+    pacer = FramePacer(fps)
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        pacer.begin()
+        anim.tick()
+        if stall_every and pacer.counters["frames"] % stall_every == 0:
+            time.sleep(stall_ms / 1e3)           # e.g. a slow PhotoImage paste or a busy Tk event queue
+        time.sleep(pacer.end(anim.changed) / 1e3)
+    return pacer.stats()
+
+
+def bench_pacing(sizes: List[str], seconds: float, fps: int) -> None:
+    for label in sizes:
+        width, height = SIZES[label]
+        print(f"\n{label} ({width}x{height}), {seconds:g} s per loop, target {fps} fps")
+        print(f"{'loop':<34}{'frames':>8}{'fps':>7}{'conversions':>13}{'skipped':>9}{'dropped':>9}")
+        for name, run in (("old: fixed 10 ms wait", lambda a: _fixed_wait_loop(a, seconds)),
+                          (f"FramePacer {fps} fps", lambda a: _paced_loop(a, seconds, fps)),
+                          (f"FramePacer, 40 ms stall / 30 fr", lambda a: _paced_loop(a, seconds, fps, 30, 40))):
+            anim = GlitchAnimation(width, height, seed=1)
+            r = run(anim)
+            anim.close()
+            print(f"{name:<34}{r['frames']:>8,}{r['fps']:>7.1f}{r['drawn']:>13,}{r['unchanged']:>9,}"
+                  f"{r['dropped']:>9}")
+
+
+class StageTimer:
+    """Wraps methods on one object so the time spent in them adds up under a stage name."""
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+
+    def wrap(self, obj: Any, method: str, stage: str) -> None:
+        fn = getattr(obj, method)
+        self.seconds.setdefault(stage, 0.0)
+
+        def timed(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.seconds[stage] += time.perf_counter() - t0
+        setattr(obj, method, timed)
+
+
+def _photo_paster(width: int, height: int):
+    """PhotoImage.paste when Tk can open a display, else None."""
+    try:
+        import tkinter as tk
+        from PIL import ImageTk
+        root = tk.Tk()
+        root.withdraw()
+        return ImageTk.PhotoImage("RGB", (width, height)).paste
+    except Exception:                              # no $DISPLAY / no Tk
+        return None
+
+
+def _render_client(width: int, height: int, ticks: int, fmt: str, seed: int) -> Dict[str, Any]:
+    """One headless render with per-stage timings; runs in a fresh process for a clean peak RSS."""
+    timer = StageTimer()
+    created: List[GlitchAnimation] = []
+    real_init = GlitchAnimation.__init__
+
+    def init(self, *args, **kwargs):               # instrument the animation render_frames builds
+        real_init(self, *args, **kwargs)
+        timer.wrap(self.frames, "render_tile", "text render")
+        timer.wrap(self.frames, "show", "text compose")
+        timer.wrap(self.engine, "load", "effects")
+        timer.wrap(self.engine, "apply_random", "effects")
+        timer.wrap(self.engine, "to_image", "export")
+        created.append(self)
+    glitch.GlitchAnimation.__init__ = init
+
+    paste = _photo_paster(width, height)
+    digest = hashlib.sha256()
+
+    def add(stage: str, t0: float) -> None:
+        timer.seconds[stage] = timer.seconds.get(stage, 0.0) + time.perf_counter() - t0
+
+    def frames():
+        for image, changed in glitch.render_frames(width, height, ticks, seed):
+            if changed and paste is not None:
+                t0 = time.perf_counter()
+                paste(image)
+                add("PhotoImage.paste", t0)
+            if fmt == "raw":
+                t0 = time.perf_counter()
+                digest.update(image.tobytes())
+                add("checksum (bench)", t0)
+            yield image, changed
+
+    # raw frames go to /dev/null (GBs at 4K); gif / webp to a temp file for their size
+    path = os.devnull if fmt == "raw" else os.path.join(tempfile.mkdtemp(), f"bench.{fmt}")
+    t0 = time.perf_counter()
+    result = glitch.save_frames(frames(), path, fmt=fmt)
+    total = time.perf_counter() - t0
+    glitch.GlitchAnimation.__init__ = real_init
+    stages = dict(timer.seconds)
+    stages["encode + write"] = total - sum(stages.values())
+    size = width * height * 3 * ticks if fmt == "raw" else os.path.getsize(path)
+    if fmt != "raw":
+        os.remove(path)
+    return {"total": total, "stages": stages, "stored": result["stored"], "bytes": size,
+            "peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            "digest": digest.hexdigest() if fmt == "raw" else None, "display": paste is not None}
+
+
+def bench_render(sizes: List[str], ticks: int, formats: List[str], seed: int = 1) -> None:
+    for label in sizes:
+        width, height = SIZES[label]
+        print(f"\n{label} ({width}x{height}), {ticks:,} frames, seed {seed}")
+        for fmt in formats:
+            with ProcessPoolExecutor(1) as ex:
+                r = ex.submit(_render_client, width, height, ticks, fmt, seed).result()
+            print(f"  {fmt}: {r['total']:.2f} s ({r['total'] / ticks * 1e3:.2f} ms/frame), "
+                  f"{r['stored']:,} frames stored, {r['bytes'] / 2**20:.1f} MiB, peak RSS {r['peak_mb']:.0f} MB")
+            for stage, sec in r["stages"].items():
+                print(f"    {stage:<18}{sec * 1e3 / ticks:>8.3f} ms/frame{sec / r['total']:>8.1%}")
+            if not r["display"]:
+                print(f"    {'PhotoImage.paste':<18}{'n/a (no display)':>16}")
+            if fmt == "raw":
+                with ProcessPoolExecutor(1) as ex:
+                    again = ex.submit(_render_client, width, height, ticks, fmt, seed).result()
+                print(f"    deterministic: {'yes' if again['digest'] == r['digest'] else 'NO'}"
+                      f" (sha256 {r['digest'][:16]})")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("suite", nargs="?", choices=["effects", "frames", "pacing", "render"], default="effects")
+    ap.add_argument("--sizes", default="1080p,4k", help=",".join(SIZES))
+    ap.add_argument("--frames", type=int, default=30)
+    ap.add_argument("--ticks", type=int, default=3000, help="frames: animation ticks to run")
+    ap.add_argument("--seconds", type=float, default=5.0, help="pacing: run time per loop")
+    ap.add_argument("--fps", type=int, default=TARGET_FPS, help="pacing: target frame rate")
+    ap.add_argument("--formats", default="raw,gif", help="render: raw,gif,webp")
+    args = ap.parse_args()
+    if args.suite == "effects":
+        bench_effects(args.sizes.split(","), args.frames)
+    elif args.suite == "frames":
+        bench_frames(args.sizes.split(","), args.ticks)
+    elif args.suite == "pacing":
+        bench_pacing(args.sizes.split(","), args.seconds, args.fps)
+    elif args.suite == "render":
+        bench_render(args.sizes.split(","), args.ticks, args.formats.split(","))
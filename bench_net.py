@@ -0,0 +1,289 @@
+"""
+bench_net.py — Throughput / latency‑histogram harness for server.py + framing
+------------------------------------------------------------------------------
+* Starts `server.py` locally (`--workers` processes, ephemeral port), then
+  drives it for `--duration` seconds from `--loaders` client processes with
+  `--concurrency` connections in total, each keeping `--depth` framed
+  requests in flight.
+* Message sizes come from `--sizes`: `64` (fixed), `16-4096` (uniform), or a
+  weighted mix like `64:90,4096:9,65536:1`.
+* Round trips are recorded in an HDR‑style log‑linear histogram (µs, ≤ 1 %
+  bucket error, a few KiB no matter how many samples); loader histograms
+  are merged exactly.
+* Prints msg/s, MiB/s, p50 / p90 / p99 / p99.9 / max. `--json FILE` writes the
+  result (parameters, environment, percentiles, histogram). `--compare FILE`
+  checks against an earlier result and exits 1 if throughput drops or p99
+  rises by more than `--tolerance`.
+
+Run:
+    python bench_net.py --concurrency 64 --depth 16 --sizes 64:90,4096:10 --json base.json
+    python bench_net.py --concurrency 64 --depth 16 --sizes 64:90,4096:10 --compare base.json
+
+Auther : SpectralZero
+"""
+from __future__ import annotations
+
+import argparse, asyncio, datetime, json, multiprocessing, os, pathlib, platform, random, signal, subprocess, sys, time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from framing import HEADER, MSG_DATA, header
+
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+# ─────────────────────────── histogram ────────────────────────────────
+
+class LatencyHistogram:
+    """Log‑linear histogram of non‑negative ints (HDR style).
+
+    Values below 2**sub_bits get a bucket each; above that every power of two is
+    split into 2**sub_bits buckets, so the relative error is ≤ 2**-sub_bits.
+    """
+
+    def __init__(self, sub_bits: int = 7):
+        self.sub_bits = sub_bits
+        self._sub = 1 << sub_bits
+        self.counts: List[int] = [0] * (self._sub * 2)
+        self.total = 0
+        self.sum = 0
+        self.max = 0
+
+    def _index(self, v: int) -> int:
+        if v < self._sub:
+            return v
+        shift = v.bit_length() - 1 - self.sub_bits
+        return (shift + 1) * self._sub + (v >> shift) - self._sub
+
+    def _upper(self, idx: int) -> int:
+        """Highest value that lands in bucket `idx`."""
+        if idx < self._sub:
+            return idx
+        shift = idx // self._sub - 1
+        return ((idx % self._sub + self._sub + 1) << shift) - 1
+
+    def record(self, v: int, n: int = 1) -> None:
+        i = self._index(v)
+        if i >= len(self.counts):
+            self.counts.extend([0] * (i + 1 - len(self.counts)))
+        self.counts[i] += n
+        self.total += n
+        self.sum += v * n
+        if v > self.max:
+            self.max = v
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        if other.sub_bits != self.sub_bits:
+            raise ValueError("histograms with different precision")
+        if len(other.counts) > len(self.counts):
+            self.counts.extend([0] * (len(other.counts) - len(self.counts)))
+        for i, c in enumerate(other.counts):
+            if c:
+                self.counts[i] += c
+        self.total += other.total
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+        return self
+
+    def percentile(self, p: float) -> int:
+        if not self.total:
+            return 0
+        rank = max(1, -(-self.total * p // 100))          # ceil, 1‑based
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return min(self._upper(i), self.max)
+        return self.max
+
+    def mean(self) -> float:
+        return self.sum / self.total if self.total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"sub_bits": self.sub_bits, "total": self.total, "sum": self.sum, "max": self.max,
+                "counts": {str(i): c for i, c in enumerate(self.counts) if c}}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "LatencyHistogram":
+        h = cls(d["sub_bits"])
+        for i, c in d["counts"].items():
+            i = int(i)
+            if i >= len(h.counts):
+                h.counts.extend([0] * (i + 1 - len(h.counts)))
+            h.counts[i] = c
+        h.total, h.sum, h.max = d["total"], d["sum"], d["max"]
+        return h
+
+# ─────────────────────────── message sizes ────────────────────────────
+
+def parse_sizes(spec: str):
+    """`64` | `16-4096` | `64:90,4096:9,65536:1` → zero‑arg size sampler (seeded per loader)."""
+    if "," in spec or ":" in spec:
+        sizes, weights = zip(*((int(a), float(b)) for a, b in (part.split(":") for part in spec.split(","))))
+        return lambda rnd: rnd.choices(sizes, weights)[0]
+    if "-" in spec:
+        lo, hi = map(int, spec.split("-"))
+        return lambda rnd: rnd.randint(lo, hi)
+    n = int(spec)
+    return lambda rnd: n
+
+# ─────────────────────────── load generator ───────────────────────────
+
+async def _connection(port: int, depth: int, sampler, rnd: random.Random, until: float, warm_until: float,
+                      hist: LatencyHistogram, counters: Dict[str, int], payloads: Dict[int, bytes]) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    window = asyncio.Semaphore(depth)
+    inflight: deque = deque()                               # (send time ns, size)
+    clock, loop = time.perf_counter_ns, asyncio.get_running_loop()
+    done = loop.create_future()
+    failed = asyncio.Event()                                # either side hit a connection error
+
+    async def receive() -> None:
+        hsize = HEADER.size
+        try:
+            while True:
+                length, _ = HEADER.unpack(await reader.readexactly(hsize))
+                if length:
+                    await reader.readexactly(length)
+                t_sent, size = inflight.popleft()
+                now = clock()
+                if now >= warm_until:
+                    hist.record((now - t_sent) // 1000)
+                    counters["messages"] += 1
+                    counters["bytes"] += size
+                window.release()
+                if not inflight and done.done():
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError):
+            if not failed.is_set():
+                counters["errors"] += 1
+                failed.set()
+            window.release()                                # wake a sender parked in acquire()
+
+    rx = asyncio.create_task(receive())
+    try:
+        while clock() < until:
+            await window.acquire()
+            if failed.is_set():
+                break
+            size = sampler(rnd)
+            payload = payloads.get(size)
+            if payload is None:
+                payload = payloads[size] = header(MSG_DATA, size) + b"\0" * size
+            inflight.append((clock(), size))
+            writer.write(payload)
+            if writer.transport.get_write_buffer_size() > 256 * 1024:
+                await writer.drain()
+    except ConnectionError:
+        if not failed.is_set():
+            counters["errors"] += 1
+            failed.set()
+    done.set_result(None)
+    if inflight and not failed.is_set():
+        await rx
+    else:
+        rx.cancel()
+    writer.close()
+
+
+def _loader(port: int, connections: int, depth: int, sizes: str, duration: float, warmup: float,
+            seed: int) -> Dict[str, Any]:
+    async def run() -> Dict[str, Any]:
+        hist, counters = LatencyHistogram(), {"messages": 0, "bytes": 0, "errors": 0}
+        now = time.perf_counter_ns()
+        warm_until, until = now + int(warmup * 1e9), now + int((warmup + duration) * 1e9)
+        sampler, payloads = parse_sizes(sizes), {}
+        await asyncio.gather(*(_connection(port, depth, sampler, random.Random(seed * 1000 + c), until,
+                                           warm_until, hist, counters, payloads) for c in range(connections)))
+        return {"hist": hist.to_dict(), **counters}
+    return asyncio.run(run())
+
+# ─────────────────────────── harness ──────────────────────────────────
+
+def _git_rev() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=pathlib.Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(workers: int, loaders: int, concurrency: int, depth: int, sizes: str, duration: float,
+        warmup: float, seed: int = 1) -> Dict[str, Any]:
+    srv = subprocess.Popen([sys.executable, "server.py", "--port", "0", "--workers", str(workers)],
+                           cwd=pathlib.Path(__file__).parent, stdout=subprocess.PIPE, text=True)
+    try:
+        port = int(srv.stdout.readline().split()[3].rsplit(":", 1)[1])
+        shares = [concurrency // loaders + (i < concurrency % loaders) for i in range(loaders)]
+        with multiprocessing.Pool(loaders) as pool:
+            parts = pool.starmap(_loader, [(port, n, depth, sizes, duration, warmup, seed + i)
+                                           for i, n in enumerate(shares) if n])
+    finally:
+        srv.send_signal(signal.SIGINT)
+        srv.communicate(timeout=30)
+    hist = LatencyHistogram()
+    for part in parts:
+        hist.merge(LatencyHistogram.from_dict(part["hist"]))
+    messages = sum(p["messages"] for p in parts)
+    return {
+        "meta": {"when": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+                 "git": _git_rev(), "python": platform.python_version(), "platform": platform.platform(),
+                 "cpus": os.cpu_count()},
+        "params": {"workers": workers, "loaders": loaders, "concurrency": concurrency, "depth": depth,
+                   "sizes": sizes, "duration_s": duration, "warmup_s": warmup, "seed": seed},
+        "msg_per_s": messages / duration,
+        "mib_per_s": 2 * sum(p["bytes"] for p in parts) / duration / 2**20,
+        "messages": messages,
+        "errors": sum(p["errors"] for p in parts),
+        "latency_us": {**{f"p{p:g}": hist.percentile(p) for p in PERCENTILES},
+                       "mean": round(hist.mean(), 1), "max": hist.max},
+        "histogram": hist.to_dict(),
+    }
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regressions of `result` vs `baseline` beyond `tolerance` (fraction)."""
+    out = []
+    if result["params"] != baseline["params"]:
+        out.append(f"parameters differ from baseline: {baseline['params']}")
+    old, new = baseline["msg_per_s"], result["msg_per_s"]
+    if new < old * (1 - tolerance):
+        out.append(f"throughput {new:,.0f} msg/s vs {old:,.0f} ({new / old - 1:+.1%})")
+    for key in ("p99", "p99.9"):
+        old, new = baseline["latency_us"][key], result["latency_us"][key]
+        if old and new > old * (1 + tolerance):
+            out.append(f"{key} {new:,} µs vs {old:,} µs ({new / old - 1:+.1%})")
+    return out
+
+
+def _print(res: Dict[str, Any]) -> None:
+    lat = res["latency_us"]
+    print(f"messages   {res['messages']:>12,}  errors {res['errors']}")
+    print(f"throughput {res['msg_per_s']:>12,.0f} msg/s  {res['mib_per_s']:.1f} MiB/s (both directions)")
+    print("latency µs " + "  ".join(f"{k} {v:,}" for k, v in lat.items()))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--workers", type=int, default=1, help="server worker processes")
+    ap.add_argument("--loaders", type=int, default=1, help="client processes")
+    ap.add_argument("--concurrency", type=int, default=32, help="connections in total")
+    ap.add_argument("--depth", type=int, default=8, help="requests in flight per connection")
+    ap.add_argument("--sizes", default="64", help="64 | 16-4096 | 64:90,4096:10")
+    ap.add_argument("--duration", type=float, default=5.0)
+    ap.add_argument("--warmup", type=float, default=1.0)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--json", type=pathlib.Path, help="write the result here")
+    ap.add_argument("--compare", type=pathlib.Path, help="baseline result to check against")
+    ap.add_argument("--tolerance", type=float, default=0.10, help="allowed regression (fraction)")
+    args = ap.parse_args()
+
+    res = run(args.workers, args.loaders, args.concurrency, args.depth, args.sizes, args.duration,
+              args.warmup, args.seed)
+    _print(res)
+    if args.json:
+        args.json.write_text(json.dumps(res, indent=2), encoding="utf-8")
+    if args.compare:
+        problems = compare(res, json.loads(args.compare.read_text(encoding="utf-8")), args.tolerance)
+        for p in problems:
+            print("REGRESSION:", p)
+        raise SystemExit(1 if problems else 0)
@@ -0,0 +1,461 @@
+"""
+bench_request.py — Local benchmarks for request.safe_request
+------------------------------------------------------------------------------
+* Runs a stub HTTP/1.1 server (keep-alive) on 127.0.0.1 that counts every
+  TCP connection it accepts and every request it serves, so the numbers do
+  not depend on the network or on jsonplaceholder.typicode.com.
+* `pool` suite: N GETs through the old path (module-level requests.request,
+  one connection per call) vs the pooled safe_request, sequential and from
+  a few threads; prints req/s, connections accepted and pool_stats().
+* `async` suite: N GETs with `--delay` s of simulated server latency,
+  sequential safe_request vs fetch_all (async engine), plus the peak number
+  of requests the server saw at once (≤ PER_HOST_LIMIT).
+* `retry` suite: a fault-injecting stub (503 + Retry-After on the first tries
+  of each resource, an endpoint slower than the client timeout) shows success
+  rate with and without retries, and how long callers burn on a dead
+  endpoint with and without the circuit breaker, then its recovery.
+* `cache` suite: a stub that sends ETag + Cache-Control: max-age and answers
+  If-None-Match with 304; repeated GETs with and without enable_cache(),
+  then expiry → revalidation and a PUT that invalidates. Prints server hits,
+  hit / miss latency and cache_stats().
+* `stream` suite: a `--mb` MB JSON array (and an error response as big)
+  served locally; each client runs in a fresh process and reports time and
+  peak RSS — resp.json() on the whole body vs stream_json_array /
+  stream_chunks, and a buffered error body vs safe_request's prefix read.
+* `jsonfuzz` suite: random JSON arrays (floats, exponents, negatives,
+  nesting, non-ASCII text) cut at random byte offsets — and at every offset
+  for small ones — must parse with iter_json_array exactly as json.loads
+  does. The stream suite runs it first.
+
+Run:
+    python bench_request.py pool --requests 1000 --threads 8
+    python bench_request.py async --requests 1000 --delay 0.01 --concurrency 32
+    python bench_request.py retry --requests 200
+    python bench_request.py cache --requests 1000 --delay 0.005
+    python bench_request.py stream --mb 500
+    python bench_request.py jsonfuzz --requests 2000
+
+Auther : SpectralZero
+"""
+from __future__ import annotations
+
+import argparse, hashlib, json, random, resource, threading, time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict
+
+import requests
+
+import request
+
+# ─────────────────────────── stub server ──────────────────────────────
+
+class StubServer(ThreadingHTTPServer):
+    """Counts accepted connections (`connections`) and served requests (`hits`)."""
+
+    daemon_threads = True
+
+    def __init__(self, handler: type):
+        super().__init__(("127.0.0.1", 0), handler)
+        self.connections = 0
+        self.hits = 0
+        self.delay = 0.0                     # seconds each request takes (simulated latency)
+        self.active = self.peak_active = 0
+        self.lock = threading.Lock()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def get_request(self):
+        conn = super().get_request()
+        with self.lock:
+            self.connections += 1
+        return conn
+
+    def handle_error(self, request, client_address):
+        pass                                 # clients hanging up on slow responses is expected here
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def reset(self) -> None:
+        with self.lock:
+            self.connections = self.hits = self.peak_active = 0
+
+
+class PostsHandler(BaseHTTPRequestHandler):
+    """/posts/<id> → small JSON object, like the demo API."""
+
+    protocol_version = "HTTP/1.1"            # keep-alive
+    disable_nagle_algorithm = True           # headers and body go out as separate writes
+
+    def do_GET(self):
+        srv = self.server
+        with srv.lock:
+            srv.hits += 1
+            srv.active += 1
+            srv.peak_active = max(srv.peak_active, srv.active)
+        if srv.delay:
+            time.sleep(srv.delay)
+        with srv.lock:
+            srv.active -= 1
+        post_id = self.path.rstrip("/").rsplit("/", 1)[-1]
+        body = json.dumps({"userId": 1, "id": post_id, "title": "stub title", "body": "stub body"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in self.extra_headers().items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def extra_headers(self) -> Dict[str, str]:
+        return {}
+
+    def log_message(self, *args):
+        pass
+
+
+class FaultHandler(PostsHandler):
+    """/flaky/<id>: 503 (Retry-After: 0) for the first `fail_first` hits per id, then 200.
+    /slow/<id>: sleeps `slow_for` s before answering (longer than the client timeout)."""
+
+    fail_first = 2
+    slow_for = 2.0
+    seen: Dict[str, int] = {}
+
+    def do_GET(self):
+        if self.path.startswith("/flaky/"):
+            with self.server.lock:
+                n = self.seen[self.path] = self.seen.get(self.path, 0) + 1
+            if n <= self.fail_first:
+                with self.server.lock:
+                    self.server.hits += 1
+                self.send_response(503)
+                self.send_header("Retry-After", "0")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+        elif self.path.startswith("/slow/") and self.slow_for:
+            time.sleep(self.slow_for)
+        super().do_GET()
+
+
+class CachingHandler(PostsHandler):
+    """/posts/<id> with ETag + `Cache-Control: max-age=<max_age>`; If-None-Match → 304; PUT bumps the version."""
+
+    max_age = 1
+    versions: Dict[str, int] = {}
+
+    def _etag(self) -> str:
+        v = self.versions.get(self.path.split("?", 1)[0], 0)
+        return '"%s"' % hashlib.sha1(f"{self.path}:{v}".encode()).hexdigest()[:16]
+
+    def do_GET(self):
+        etag = self._etag()
+        if self.headers.get("If-None-Match") == etag:
+            with self.server.lock:
+                self.server.hits += 1
+                self.server.not_modified = getattr(self.server, "not_modified", 0) + 1
+            if self.server.delay:
+                time.sleep(self.server.delay)
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", f"max-age={self.max_age}")
+            self.end_headers()
+            return
+        super().do_GET()
+
+    def extra_headers(self) -> Dict[str, str]:
+        return {"ETag": self._etag(), "Cache-Control": f"max-age={self.max_age}"}
+
+    def do_PUT(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        path = self.path.split("?", 1)[0]
+        with self.server.lock:
+            self.versions[path] = self.versions.get(path, 0) + 1
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+class BigHandler(PostsHandler):
+    """/big/<mb>: a JSON array of posts about <mb> MB long. /big-error/<mb>: the same body with status 500."""
+
+    block = ",".join(json.dumps({"userId": i % 10, "id": i, "title": f"stub title {i}",
+                                 "body": "stub body " * 16}) for i in range(4096)).encode()
+
+    def do_GET(self):
+        kind, mb = self.path.strip("/").split("/")
+        repeats = max(1, int(float(mb) * 2**20) // len(self.block))
+        with self.server.lock:
+            self.server.hits += 1
+        self.send_response(500 if kind == "big-error" else 200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(2 + repeats * len(self.block) + repeats - 1))
+        self.end_headers()
+        try:
+            self.wfile.write(b"[" + self.block)
+            for _ in range(repeats - 1):
+                self.wfile.write(b"," + self.block)
+            self.wfile.write(b"]")
+        except OSError:
+            pass                                 # client stopped reading (error prefix)
+
+# ─────────────────────────── suites ───────────────────────────────────
+
+def _run(srv: StubServer, n: int, threads: int, call: Callable[[str], object]) -> Dict[str, float]:
+    srv.reset()
+    urls = [f"{srv.url}/posts/{i % 100}" for i in range(n)]
+    t0 = time.perf_counter()
+    if threads > 1:
+        with ThreadPoolExecutor(threads) as ex:
+            list(ex.map(call, urls))
+    else:
+        for u in urls:
+            call(u)
+    dt = time.perf_counter() - t0
+    return {"req_s": n / dt, "connections": srv.connections, "hits": srv.hits, "peak": srv.peak_active}
+
+
+def bench_pool(n: int, threads: int) -> None:
+    srv = StubServer(PostsHandler)
+    request.QUIET = True
+    request.configure_pool(pool_maxsize=max(threads, request.POOL_MAXSIZE))
+    old = lambda u: requests.request("GET", u, timeout=request.TIMEOUT).raise_for_status()
+    new = lambda u: request.safe_request("GET", u)
+    print(f"{'path':<34}{'req/s':>10}{'connections':>13}{'requests':>10}")
+    for label, call, t in (("requests.request (per call)", old, 1), ("safe_request (pooled)", new, 1),
+                           (f"requests.request × {threads} threads", old, threads),
+                           (f"safe_request × {threads} threads", new, threads)):
+        r = _run(srv, n, t, call)
+        print(f"{label:<34}{r['req_s']:>10,.0f}{r['connections']:>13,}{r['hits']:>10,}")
+    print("pool_stats:", request.pool_stats())
+    srv.shutdown()
+
+
+def bench_async(n: int, delay: float, concurrency: int, per_host: int) -> None:
+    srv = StubServer(PostsHandler)
+    srv.delay = delay
+    request.QUIET = True
+    request.configure_async(max_concurrency=concurrency, per_host_limit=per_host)
+    urls = [f"{srv.url}/posts/{i % 100}" for i in range(n)]
+    print(f"{n:,} GETs, {delay * 1e3:.0f} ms server latency, limits {concurrency} overall / {per_host} per host")
+    print(f"{'path':<26}{'req/s':>10}{'seconds':>9}{'peak in flight':>16}{'errors':>8}")
+    seq = _run(srv, n, 1, lambda u: request.safe_request("GET", u))
+    print(f"{'safe_request (sequential)':<26}{seq['req_s']:>10,.0f}{n / seq['req_s']:>9.2f}{seq['peak']:>16}{0:>8}")
+    srv.reset()
+    t0 = time.perf_counter()
+    results = request.fetch_all(urls)
+    dt = time.perf_counter() - t0
+    errors = sum(isinstance(r, BaseException) for r in results)
+    print(f"{'fetch_all (async)':<26}{n / dt:>10,.0f}{dt:>9.2f}{srv.peak_active:>16}{errors:>8}")
+    print(f"speed-up {seq['req_s'] and (n / dt) / seq['req_s']:.1f}×   pool: {request.pool_stats()}")
+    srv.shutdown()
+
+
+def bench_retry(n: int, timeout: float = 0.2) -> None:
+    srv = StubServer(FaultHandler)
+    request.QUIET = True
+    quick = request.RetryPolicy(backoff=0.01)
+
+    def attempt(urls, **kw):
+        ok = failed = 0
+        t0 = time.perf_counter()
+        for u in urls:
+            try:
+                request.safe_request("GET", u, timeout=timeout, **kw)
+                ok += 1
+            except requests.exceptions.RequestException:
+                failed += 1
+        return ok, failed, time.perf_counter() - t0
+
+    print(f"{'scenario':<44}{'ok':>6}{'failed':>8}{'seconds':>9}{'server hits':>13}")
+    request.breaker.threshold = 0                  # breaker off: every flaky id fails twice by design
+    for label, kw in (("flaky (503 ×2), no retry", {"retry": request.NO_RETRY}),
+                      ("flaky (503 ×2), retry 3 tries", {"retry": quick})):
+        FaultHandler.seen.clear()
+        srv.reset()
+        ok, failed, dt = attempt([f"{srv.url}/flaky/{i}" for i in range(n)], **kw)
+        print(f"{label:<44}{ok:>6}{failed:>8}{dt:>9.2f}{srv.hits:>13}")
+
+    dead = [f"{srv.url}/slow/{i}" for i in range(max(n // 10, 10))]
+    for label, threshold in (("dead endpoint, retries, no breaker", 0), ("dead endpoint, retries + breaker", 5)):
+        request.breaker.threshold, request.breaker.cooldown = threshold, 0.5
+        request.breaker.reset()
+        ok, failed, dt = attempt(dead, retry=quick)
+        print(f"{label:<44}{ok:>6}{failed:>8}{dt:>9.2f}{'':>13}")
+
+    FaultHandler.slow_for = 0                      # endpoint recovers
+    time.sleep(request.breaker.cooldown)
+    ok, failed, dt = attempt(dead[:5], retry=quick)
+    print(f"{'after cool-down, endpoint healthy again':<44}{ok:>6}{failed:>8}{dt:>9.2f}"
+          f"{'':>13}  breaker {request.breaker.state(srv.url.split('//')[1])}")
+    print("counters:", request.retry_stats())
+    srv.shutdown()
+
+
+def bench_cache(n: int, delay: float, max_age: float = 0.5) -> None:
+    srv = StubServer(CachingHandler)
+    srv.delay = delay
+    CachingHandler.max_age = max_age
+    request.QUIET = True
+    urls = [f"{srv.url}/posts/{i % 20}" for i in range(n)]
+
+    def timed(url):
+        t0 = time.perf_counter()
+        resp = request.safe_request("GET", url)
+        return time.perf_counter() - t0, getattr(resp, "from_cache", False)
+
+    print(f"{n:,} GETs over 20 URLs, {delay * 1e3:.0f} ms server latency, max-age {max_age:g} s")
+    print(f"{'path':<28}{'req/s':>10}{'server hits':>13}{'hit ms':>9}{'miss ms':>9}")
+    for label, on in (("safe_request, no cache", False), ("safe_request + cache", True)):
+        request.disable_cache()
+        if on:
+            request.enable_cache()
+        srv.reset()
+        t0 = time.perf_counter()
+        samples = [timed(u) for u in urls]
+        dt = time.perf_counter() - t0
+        hit = [s for s, cached in samples if cached] or [float("nan")]
+        miss = [s for s, cached in samples if not cached] or [float("nan")]
+        print(f"{label:<28}{n / dt:>10,.0f}{srv.hits:>13,}{sum(hit) / len(hit) * 1e3:>9.3f}"
+              f"{sum(miss) / len(miss) * 1e3:>9.3f}")
+
+    srv.reset()
+    srv.not_modified = 0
+    time.sleep(max_age)                            # everything is stale now
+    for u in urls[:20]:
+        request.safe_request("GET", u)
+    print(f"after max-age: 20 GETs → {srv.hits} server hits, {srv.not_modified} of them 304 (body reused), "
+          f"{srv.connections} new connection(s)")
+    leaked = srv.connections > 1                   # every 304 should hand its connection back to the pool
+    if leaked:
+        print("  revalidation leaks connections: 304 responses are not released")
+    request.safe_request("PUT", urls[0], json={"title": "changed"})
+    srv.reset()
+    resp = request.safe_request("GET", urls[0])
+    print(f"after PUT {urls[0].rsplit('/', 2)[-2:]}: from_cache={getattr(resp, 'from_cache', False)}, "
+          f"server hits {srv.hits}")
+    print("cache_stats:", request.cache_stats())
+    request.disable_cache()
+    srv.shutdown()
+    if leaked:
+        raise SystemExit(1)
+
+
+def _peak_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024   # KiB on Linux
+
+
+def _stream_client(mode: str, url: str) -> Dict[str, float]:
+    """Runs in a fresh process so ru_maxrss is this mode's peak only."""
+    request.QUIET = True
+    base = _peak_mb()
+    t0 = time.perf_counter()
+    items = nbytes = 0
+    if mode == "resp.json()":
+        items = len(request.safe_request("GET", url).json())
+    elif mode == "stream_json_array":
+        items = sum(1 for _ in request.stream_json_array(url))
+    elif mode == "stream_chunks":
+        nbytes = sum(len(c) for c in request.stream_chunks("GET", url))
+    elif mode == "error, buffered":
+        resp = requests.get(url, timeout=request.TIMEOUT)
+        nbytes = len(resp.text[:200])
+    elif mode == "error, safe_request":
+        try:
+            request.safe_request("GET", url, retry=request.NO_RETRY)
+        except requests.exceptions.HTTPError as e:
+            nbytes = len(e.response.content)
+    return {"seconds": time.perf_counter() - t0, "items": items, "bytes": nbytes,
+            "peak_mb": _peak_mb(), "base_mb": base}
+
+
+def _random_json(rnd: random.Random, depth: int = 0):
+    kind = rnd.randrange(8 if depth < 3 else 5)
+    if kind == 0:
+        return rnd.randint(-10**6, 10**6)
+    if kind == 1:
+        return rnd.choice([rnd.uniform(-1e3, 1e3), rnd.uniform(-1, 1) * 10 ** rnd.randint(-30, 30), 0.5, -0.0])
+    if kind == 2:
+        return "".join(rnd.choice('ab "\\\né€😀,]') for _ in range(rnd.randrange(12)))
+    if kind == 3:
+        return rnd.choice([True, False, None])
+    if kind == 4:
+        return rnd.randint(0, 9)
+    if kind == 5:
+        return [_random_json(rnd, depth + 1) for _ in range(rnd.randrange(4))]
+    return {f"k{i}": _random_json(rnd, depth + 1) for i in range(rnd.randrange(4))}
+
+
+def check_json_parser(trials: int, seed: int = 1) -> int:
+    """Chunk-boundary fuzz of request.iter_json_array against json.loads; returns the number of failures."""
+    rnd, failures = random.Random(seed), 0
+    for t in range(trials):
+        doc = [_random_json(rnd) for _ in range(rnd.randrange(1, 12))]
+        raw = json.dumps(doc, ensure_ascii=rnd.random() < 0.5,
+                         separators=rnd.choice([(",", ":"), (", ", ": ")])).encode()
+        if len(raw) <= 200:
+            splits = [[raw[:i], raw[i:]] for i in range(len(raw) + 1)]
+        else:
+            splits = []
+        for _ in range(5):
+            cuts = sorted(rnd.sample(range(1, len(raw)), min(len(raw) - 1, rnd.randint(1, 40))))
+            splits.append([raw[a:b] for a, b in zip([0] + cuts, cuts + [len(raw)])])
+        expected = json.loads(raw)
+        for chunks in splits:
+            try:
+                ok = list(request.iter_json_array(chunks)) == expected
+            except ValueError:
+                ok = False
+            if not ok:
+                failures += 1
+                if failures <= 3:
+                    print(f"  mismatch: {[bytes(c) for c in chunks]!r}"[:300])
+                break
+    print(f"iter_json_array fuzz: {trials:,} documents, {failures} failing")
+    return failures
+
+
+def bench_stream(mb: float) -> None:
+    if check_json_parser(300):
+        raise SystemExit(1)
+    srv = StubServer(BigHandler)
+    print(f"{mb:g} MB JSON array ({len(BigHandler.block) // 4096} B per item), each client in a new process")
+    print(f"{'client':<22}{'seconds':>9}{'MB/s':>8}{'items/bytes':>13}{'peak RSS MB':>13}{'Δ MB':>9}")
+    for mode, path in (("resp.json()", "big"), ("stream_json_array", "big"), ("stream_chunks", "big"),
+                       ("error, buffered", "big-error"), ("error, safe_request", "big-error")):
+        with ProcessPoolExecutor(1) as ex:
+            try:
+                r = ex.submit(_stream_client, mode, f"{srv.url}/{path}/{mb:g}").result()
+            except (BrokenProcessPool, MemoryError) as e:
+                print(f"{mode:<22}failed: {type(e).__name__}")
+                continue
+        print(f"{mode:<22}{r['seconds']:>9.2f}{mb / r['seconds']:>8.0f}{r['items'] or r['bytes']:>13,}"
+              f"{r['peak_mb']:>13,.0f}{r['peak_mb'] - r['base_mb']:>9,.0f}")
+    srv.shutdown()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("suite", nargs="?", choices=["pool", "async", "retry", "cache", "stream", "jsonfuzz"], default="pool")
+    ap.add_argument("--requests", type=int, default=1000)
+    ap.add_argument("--threads", type=int, default=8)
+    ap.add_argument("--delay", type=float, default=0.01, help="async/cache: simulated server latency (s)")
+    ap.add_argument("--concurrency", type=int, default=request.MAX_CONCURRENCY)
+    ap.add_argument("--per-host", type=int, default=request.PER_HOST_LIMIT)
+    ap.add_argument("--mb", type=float, default=500, help="stream: response size (MB)")
+    args = ap.parse_args()
+    if args.suite == "pool":
+        bench_pool(args.requests, args.threads)
+    elif args.suite == "async":
+        bench_async(args.requests, args.delay, args.concurrency, args.per_host)
+    elif args.suite == "retry":
+        bench_retry(args.requests)
+    elif args.suite == "cache":
+        bench_cache(args.requests, args.delay)
+    elif args.suite == "stream":
+        bench_stream(args.mb)
+    elif args.suite == "jsonfuzz":
+        raise SystemExit(1 if check_json_parser(args.requests) else 0)
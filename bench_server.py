@@ -0,0 +1,216 @@
+"""
+bench_server.py — Concurrent‑client load benchmark for server.py
+------------------------------------------------------------------------------
+* Starts an EchoServer on an ephemeral local port (own event loop, own thread)
+  and opens `--clients` concurrent connections to it.
+* `load` suite: every client sends `--messages` framed echo requests of
+  `--size` bytes, one at a time, and waits for the full echo before the next.
+* Reports connect time, peak open connections, messages/s, MB/s, round‑trip
+  p50/p99 and the server's live counters. `--limit` caps the server below the
+  client count to show extra connections being refused, not hung.
+* `framing` suite: round‑trips multi‑MB payloads and `--messages` pipelined
+  small frames over one connection, checking every byte and the order.
+* `scaling` suite: starts `server.py --workers n` for n = 1, 2, 4 … `--workers`
+  and drives each with `--loaders` client processes (client.run_pipelined),
+  printing messages/s and the speed‑up over one worker.
+* Raises the soft RLIMIT_NOFILE to the hard limit (each client costs two fds
+  here: ours + the server's).
+
+Run:
+    python bench_server.py load --clients 2000 --messages 20 --size 64
+    python bench_server.py load --clients 1500 --limit 1000
+    python bench_server.py framing --messages 100000
+    python bench_server.py scaling --workers 8 --loaders 8 --messages 200000
+
+Auther : SpectralZero
+"""
+from __future__ import annotations
+
+import argparse, asyncio, multiprocessing, os, signal, socket, statistics, subprocess, sys, threading, time
+from typing import Dict, List, Optional
+
+from framing import HEADER, MSG_DATA, FramedSocket, encode
+from server import EchoServer
+
+CONNECT_CONCURRENCY = 256     # connects in flight at once (stays under the listen backlog)
+
+
+def _raise_fd_limit() -> int:
+    try:
+        import resource
+    except ImportError:                            # Windows
+        return 0
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return hard
+
+
+def _pct(samples: List[float], q: float) -> float:
+    s = sorted(samples)
+    return s[min(int(q * len(s)), len(s) - 1)] if s else float("nan")
+
+
+class ServerThread:
+    """EchoServer on its own loop in a daemon thread; `server` is usable once started."""
+
+    def __init__(self, **kw):
+        self.kw = kw
+        self.server: Optional[EchoServer] = None
+        self.loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.server = self.loop.run_until_complete(EchoServer(**self.kw).start())
+        self._ready.set()
+        self.loop.run_until_complete(self.server.serve_forever())
+
+    def start(self) -> "ServerThread":
+        self.thread.start()
+        self._ready.wait()
+        return self
+
+    def stats(self) -> Dict[str, int]:
+        return self.server.stats()
+
+    def stop(self) -> None:
+        asyncio.run_coroutine_threadsafe(self.server.shutdown(1.0), self.loop).result()
+        self.thread.join()
+
+
+async def _client(port: int, messages: int, payload: bytes, gate: asyncio.Semaphore,
+                  opened: asyncio.Event, need: int, counters: Dict[str, int], rtts: List[float]) -> None:
+    async with gate:
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        except OSError:
+            counters["connect_errors"] += 1
+            need_open = False
+        else:
+            need_open = True
+    counters["ready"] += 1
+    if counters["ready"] == need:
+        opened.set()
+    if not need_open:
+        return
+    await opened.wait()                            # all clients connected → traffic starts together
+    frame, reply = encode(MSG_DATA, payload), HEADER.size + len(payload)
+    try:
+        for _ in range(messages):
+            t0 = time.perf_counter()
+            writer.write(frame)
+            await reader.readexactly(reply)
+            rtts.append(time.perf_counter() - t0)
+            counters["messages"] += 1
+    except (asyncio.IncompleteReadError, ConnectionError):
+        counters["refused"] += 1                   # server closed us (connection limit)
+    finally:
+        writer.close()
+
+
+async def _load(port: int, clients: int, messages: int, size: int, srv: ServerThread) -> None:
+    gate, opened = asyncio.Semaphore(CONNECT_CONCURRENCY), asyncio.Event()
+    counters = {"ready": 0, "messages": 0, "connect_errors": 0, "refused": 0}
+    rtts: List[float] = []
+    payload = b"x" * size
+    t0 = time.perf_counter()
+    tasks = [asyncio.create_task(_client(port, messages, payload, gate, opened, clients, counters, rtts))
+             for _ in range(clients)]
+    await opened.wait()
+    t_conn = time.perf_counter() - t0
+    t1 = time.perf_counter()
+    await asyncio.gather(*tasks)
+    dt = time.perf_counter() - t1
+    st = srv.stats()
+    n = counters["messages"]
+    print(f"clients         {clients:>10,}  (connected in {t_conn:.2f} s, peak open {st['peak_open']:,})")
+    print(f"refused         {counters['refused'] + counters['connect_errors']:>10,}  (server rejected {st['rejected']:,})")
+    print(f"messages        {n:>10,} × {size} B")
+    print(f"throughput      {n / dt:>10,.0f} msg/s  {2 * n * size / dt / 2**20:.1f} MiB/s (both directions)")
+    if rtts:
+        print(f"round trip      p50 {_pct(rtts, .5) * 1e3:.2f} ms  p99 {_pct(rtts, .99) * 1e3:.2f} ms  "
+              f"mean {statistics.fmean(rtts) * 1e3:.2f} ms")
+    print(f"server bytes    in {st['bytes_in']:,}  out {st['bytes_out']:,}  paused {st['paused']}")
+
+
+def bench_framing(port: int, messages: int, sizes=(1 * 2**20, 8 * 2**20, 32 * 2**20)) -> None:
+    with FramedSocket(socket.create_connection(("127.0.0.1", port))) as conn:
+        for size in sizes:
+            payload = os.urandom(size)
+            t0 = time.perf_counter()
+            conn.send(MSG_DATA, payload)
+            kind, echo = conn.recv()
+            dt = time.perf_counter() - t0
+            ok = kind == MSG_DATA and echo == payload
+            print(f"{size / 2**20:>6.0f} MiB frame   {2 * size / dt / 2**20:>8.1f} MiB/s round trip  {'ok' if ok else 'MISMATCH'}")
+
+        msgs = [b"msg-%d" % i for i in range(messages)]
+        sender = threading.Thread(target=lambda: [conn.send_many((MSG_DATA, m) for m in msgs[i:i + 1000])
+                                                   for i in range(0, messages, 1000)])
+        t0 = time.perf_counter()
+        sender.start()                          # writes while we read, so neither side's buffers fill up
+        bad = 0
+        for m in msgs:
+            kind, echo = conn.recv()
+            bad += kind != MSG_DATA or echo != m
+        dt = time.perf_counter() - t0
+        sender.join()
+        print(f"pipelined      {messages:>10,} frames  {messages / dt:>10,.0f} msg/s  "
+              f"{'in order' if not bad else f'{bad} MISMATCHED'}")
+
+
+def _load_process(port: int, messages: int, connections: int, depth: int) -> Dict[str, float]:
+    from client import run_pipelined
+    return run_pipelined([b"m%d" % i for i in range(messages)], "127.0.0.1", port, connections, depth)
+
+
+def bench_scaling(max_workers: int, loaders: int, messages: int, connections: int = 4, depth: int = 64) -> None:
+    counts = sorted({1, max_workers, *(1 << k for k in range(max_workers.bit_length()) if 1 << k <= max_workers)})
+    per_loader = messages // loaders
+    print(f"cpus {os.cpu_count()}  loaders {loaders} × {connections} connections × depth {depth}  "
+          f"{per_loader * loaders:,} messages per run")
+    print(f"{'workers':>8}{'msg/s':>12}{'speed-up':>10}{'p99 ms':>9}")
+    base = None
+    with multiprocessing.Pool(loaders) as pool:
+        for n in counts:
+            srv = subprocess.Popen([sys.executable, "server.py", "--port", "0", "--workers", str(n)],
+                                   cwd=os.path.dirname(os.path.abspath(__file__)), stdout=subprocess.PIPE, text=True)
+            try:
+                port = int(srv.stdout.readline().split()[3].rsplit(":", 1)[1])
+                t0 = time.perf_counter()
+                results = pool.starmap(_load_process, [(port, per_loader, connections, depth)] * loaders)
+                dt = time.perf_counter() - t0
+            finally:
+                srv.send_signal(signal.SIGINT)
+                srv.communicate(timeout=30)
+            rate = sum(r["received"] for r in results) / dt
+            base = base or rate
+            print(f"{n:>8}{rate:>12,.0f}{rate / base:>9.2f}×{max(r['p99_ms'] for r in results):>9.2f}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("suite", nargs="?", choices=["load", "framing", "scaling"], default="load")
+    ap.add_argument("--clients", type=int, default=1000)
+    ap.add_argument("--messages", type=int, default=20)
+    ap.add_argument("--size", type=int, default=64)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="scaling: max server workers")
+    ap.add_argument("--loaders", type=int, default=os.cpu_count() or 1, help="scaling: client processes")
+    ap.add_argument("--limit", type=int, default=None, help="server max connections (default: no cap below clients)")
+    args = ap.parse_args()
+
+    _raise_fd_limit()
+    if args.suite == "scaling":
+        bench_scaling(args.workers, args.loaders, args.messages)
+        raise SystemExit(0)
+    srv = ServerThread(host="127.0.0.1", port=0, max_connections=args.limit or args.clients + 16).start()
+    try:
+        if args.suite == "load":
+            asyncio.run(_load(srv.server.port, args.clients, args.messages, args.size, srv))
+        else:
+            bench_framing(srv.server.port, args.messages)
+    finally:
+        srv.stop()
+        print(f"after shutdown  open {srv.stats()['open']}  closed {srv.stats()['closed']:,}")
@@ -0,0 +1,159 @@
+"""
+bench_stream_io.py — Throughput / peak‑memory benchmark for stream_io
+------------------------------------------------------------------------------
+* Generates a `--gb` GB file per format (text, CSV, JSON Lines, XML) in
+  `--dir` (a temp dir by default, removed afterwards unless `--keep`).
+* Each reader runs in a fresh process and reports seconds, MB/s, records
+  and peak RSS: the whole‑file way (`f.read()`, `list(csv.reader(f))`,
+  a list of every JSON line, `ET.parse`) vs the stream_io generator, plus a
+  streaming copy through the matching writer (to /dev/null).
+* Whole‑file readers are only run on files up to `--naive-max-mb` MB — on
+  multi‑GB inputs they need several times the file size in RAM.
+
+Run:
+    python bench_stream_io.py --gb 1
+    python bench_stream_io.py --gb 5 --formats csv,jsonl --dir /data/tmp
+
+Auther : SpectralZero
+"""
+from __future__ import annotations
+
+import argparse, csv, json, os, resource, shutil, tempfile, time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Tuple
+
+import stream_io
+
+FORMATS = ("text", "csv", "jsonl", "xml")
+CSV_TYPES = {"id": "int", "amount": "float", "active": "bool", "day": "date"}
+
+# ─────────────────────────── data generation ──────────────────────────
+
+def _records(n: int) -> List[Dict[str, object]]:
+    return [{"id": i, "name": f"user {i}", "amount": round(i * 1.37 % 10_000, 2), "active": i % 3 != 0,
+             "day": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}", "note": "lorem ipsum dolor sit amet"}
+            for i in range(n)]
+
+
+def _block(fmt: str, recs: List[Dict[str, object]]) -> Tuple[str, str, str]:
+    """(file head, repeated body block, file tail) for a format."""
+    if fmt == "text":
+        return "", "".join(f"{r['id']} {r['name']} {r['note']} {r['amount']}\n" for r in recs), ""
+    if fmt == "csv":
+        body = "".join(f"{r['id']},{r['name']},{r['amount']},{str(r['active']).lower()},{r['day']},"
+                       f"\"{r['note']}, etc\"\n" for r in recs)
+        return ",".join(recs[0]) + "\n", body, ""
+    if fmt == "jsonl":
+        return "", "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in recs), ""
+    body = "".join(f'<record id="{r["id"]}"><name>{r["name"]}</name><amount>{r["amount"]}</amount>'
+                   f'<active>{r["active"]}</active><day>{r["day"]}</day><note>{r["note"]}</note></record>\n'
+                   for r in recs)
+    return '<?xml version="1.0" encoding="utf-8"?>\n<export><records>\n', body, "</records></export>\n"
+
+
+def generate(fmt: str, path: str, size: int) -> Tuple[int, float]:
+    """Write about `size` bytes of `fmt` (a block of 10k records repeated); returns (records, seconds)."""
+    head, body, tail = _block(fmt, _records(10_000))
+    block = body.encode()
+    repeats = max(1, size // len(block))
+    t0 = time.perf_counter()
+    with open(path, "wb", buffering=stream_io.WRITE_BUFFER) as f:
+        f.write(head.encode())
+        for _ in range(repeats):
+            f.write(block)
+        f.write(tail.encode())
+    return repeats * 10_000, time.perf_counter() - t0
+
+# ─────────────────────────── readers (run in a child process) ─────────
+
+def _naive(fmt: str, path: str) -> int:
+    if fmt == "text":
+        with open(path, encoding="utf-8") as f:
+            return f.read().count("\n")
+    if fmt == "csv":
+        with open(path, encoding="utf-8", newline="") as f:
+            return len(list(csv.reader(f))) - 1
+    if fmt == "jsonl":
+        with open(path, encoding="utf-8") as f:
+            return len([json.loads(line) for line in f.read().splitlines()])
+    return len(ET.parse(path).getroot().findall("./records/record"))
+
+
+def _stream(fmt: str, path: str) -> int:
+    if fmt == "text":
+        return sum(chunk.count("\n") for chunk in stream_io.read_chunks(path))
+    if fmt == "csv":
+        return sum(1 for _ in stream_io.iter_csv(path, CSV_TYPES, as_dict=False))
+    if fmt == "jsonl":
+        return sum(1 for _ in stream_io.read_jsonl(path))
+    return sum(1 for _ in stream_io.iter_xml(path, "record"))
+
+
+def _copy(fmt: str, path: str) -> int:
+    if fmt == "csv":
+        return stream_io.write_csv(os.devnull, stream_io.iter_csv(path, CSV_TYPES))
+    if fmt == "jsonl":
+        return stream_io.write_jsonl(os.devnull, stream_io.read_jsonl(path))
+    if fmt == "xml":
+        records = map(stream_io.element_to_dict, stream_io.iter_xml(path, "record"))
+        return stream_io.write_jsonl(os.devnull, records)
+    lines = 0
+    with open(os.devnull, "w", encoding="utf-8") as out:
+        for chunk in stream_io.read_chunks(path):
+            out.write(chunk)
+            lines += chunk.count("\n")
+    return lines
+
+
+READERS: Dict[str, Callable[[str, str], int]] = {"whole file": _naive, "stream_io": _stream,
+                                                 "stream copy": _copy}
+
+
+def _measure(reader: str, fmt: str, path: str) -> Dict[str, float]:
+    t0 = time.perf_counter()
+    n = READERS[reader](fmt, path)
+    return {"seconds": time.perf_counter() - t0, "records": n,
+            "peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}
+
+# ─────────────────────────── harness ──────────────────────────────────
+
+def run(formats: List[str], gb: float, directory: str, naive_max_mb: float) -> None:
+    size = int(gb * 1e9)
+    for fmt in formats:
+        path = os.path.join(directory, f"bench.{fmt}")
+        records, dt = generate(fmt, path, size)
+        mb = os.path.getsize(path) / 1e6
+        print(f"\n{fmt}: {mb:,.0f} MB, {records:,} records (written in {dt:.1f} s, {mb / dt:,.0f} MB/s)")
+        print(f"  {'reader':<14}{'seconds':>9}{'MB/s':>8}{'records':>14}{'peak RSS MB':>13}")
+        for reader in READERS:
+            if reader == "whole file" and mb > naive_max_mb:
+                print(f"  {reader:<14}skipped (> --naive-max-mb {naive_max_mb:g})")
+                continue
+            with ProcessPoolExecutor(1) as ex:
+                try:
+                    r = ex.submit(_measure, reader, fmt, path).result()
+                except (BrokenProcessPool, MemoryError) as e:
+                    print(f"  {reader:<14}failed: {type(e).__name__}")
+                    continue
+            print(f"  {reader:<14}{r['seconds']:>9.2f}{mb / r['seconds']:>8.0f}{r['records']:>14,}"
+                  f"{r['peak_mb']:>13,.0f}")
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--gb", type=float, default=1.0, help="size of each generated file (GB)")
+    ap.add_argument("--formats", default=",".join(FORMATS), help=",".join(FORMATS))
+    ap.add_argument("--dir", help="where to write the files (default: a temp dir)")
+    ap.add_argument("--keep", action="store_true", help="keep the temp dir")
+    ap.add_argument("--naive-max-mb", type=float, default=500, help="largest file for the whole-file readers")
+    args = ap.parse_args()
+
+    directory = args.dir or tempfile.mkdtemp(prefix="bench_stream_io_")
+    try:
+        run(args.formats.split(","), args.gb, directory, args.naive_max_mb)
+    finally:
+        if args.dir is None and not args.keep:
+            shutil.rmtree(directory, ignore_errors=True)
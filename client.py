@@ -1,17 +1,176 @@
-import socket
+"""
+client.py — Client for the server.py echo server
+------------------------------------------------------------------------------
+* Interactive (default): type a line, get the echo back.
+* Batch mode (`--batch FILE` or `--batch -` for stdin): one message per line,
+  sent without waiting for each reply. Up to `--depth` requests are in
+  flight per connection; they are written `--batch-size` frames per send.
+* `--connections N` spreads the messages round‑robin over a pool of N
+  connections (one sender + one receiver thread each).
+* The server echoes frames in order per connection, so replies are matched
+  FIFO and checked against what was sent.
+* Prints throughput and round‑trip latency percentiles at the end, so this
+  doubles as a load generator for the server.
+
+Example usage:
+    python client.py
+    python client.py --batch messages.txt --connections 8 --depth 128
+    seq 100000 | python client.py --batch - --repeat 5
+
+Auther : SpectralZero
+"""
+from __future__ import annotations
+
+import argparse, socket, sys, threading, time
+from collections import deque
+from typing import Deque, Dict, List, Sequence, Tuple
+
+from framing import FramedSocket, MSG_DATA
 
 # Server configuration
 HOST = '127.0.0.1'  # Localhost
-PORT = 4444        # Port 
-
-with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as client_socket:
-    client_socket.connect((HOST, PORT))
-    print(f"Connected to server {HOST}:{PORT}")
-    
-    while True:
-        message = input("Enter message to send (type 'exit' to quit): ")
-        if message.lower() == 'exit':
-            break
-        client_socket.sendall(message.encode())
-        response = client_socket.recv(1024)
-        print(f"Received from server: {response.decode()}")
+PORT = 4444        # Port
+DEPTH      = 64     # requests in flight per connection
+BATCH_SIZE = 32     # frames written per send
+
+
+def interactive(host: str = HOST, port: int = PORT) -> None:
+    with FramedSocket(socket.create_connection((host, port))) as conn:
+        print(f"Connected to server {host}:{port}")
+
+        while True:
+            message = input("Enter message to send (type 'exit' to quit): ")
+            if message.lower() == 'exit':
+                break
+            conn.send(MSG_DATA, message.encode())
+            _, response = conn.recv()      # one frame = the whole echoed message
+            print(f"Received from server: {bytes(response).decode()}")
+
+# ─────────────────────────── pipelined mode ───────────────────────────
+
+def percentile(sorted_samples: Sequence[float], q: float) -> float:
+    if not sorted_samples:
+        return float("nan")
+    return sorted_samples[min(int(q * len(sorted_samples)), len(sorted_samples) - 1)]
+
+
+class PipelinedConnection:
+    """One connection with a bounded window of in‑flight requests."""
+
+    def __init__(self, host: str, port: int, depth: int = DEPTH, batch_size: int = BATCH_SIZE):
+        self.conn = FramedSocket(socket.create_connection((host, port)))
+        self.conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.window = threading.Semaphore(depth)
+        self.batch_size = batch_size
+        self.pending: Deque[Tuple[float, bytes]] = deque()   # (send time, payload), oldest first
+        self.latencies: List[float] = []
+        self.received = self.mismatched = 0
+        self.error: BaseException | None = None
+        self.aborted = threading.Event()                      # set by whichever side fails first
+
+    def _fail(self, e: BaseException) -> None:
+        if self.error is None:
+            self.error = e
+        self.aborted.set()
+        self.window.release()                                 # wake a sender blocked on the window
+
+    def _send(self, messages: Sequence[bytes]) -> None:
+        i, n = 0, len(messages)
+        window, pending, aborted = self.window, self.pending, self.aborted
+        try:
+            while i < n:
+                window.acquire()                              # at least one slot …
+                if aborted.is_set():
+                    return
+                j = i + 1
+                while j < n and j - i < self.batch_size and window.acquire(blocking=False):
+                    j += 1                                    # … and any others free right now
+                now = time.perf_counter()
+                chunk = messages[i:j]
+                pending.extend((now, m) for m in chunk)
+                self.conn.send_many((MSG_DATA, m) for m in chunk)
+                i = j
+        except BaseException as e:                            # surfaced in the summary
+            self._fail(e)
+            try:
+                self.conn.sock.shutdown(socket.SHUT_RDWR)     # unblock the receiver
+            except OSError:
+                pass
+
+    def _receive(self, expected: int) -> None:
+        pending, window, lat = self.pending, self.window, self.latencies
+        try:
+            for _ in range(expected):
+                if self.aborted.is_set():
+                    return
+                _, payload = self.conn.recv()
+                t_sent, sent = pending.popleft()
+                lat.append(time.perf_counter() - t_sent)
+                if payload != sent:
+                    self.mismatched += 1
+                self.received += 1
+                window.release()
+        except BaseException as e:                            # surfaced in the summary
+            self._fail(e)
+
+    def run(self, messages: Sequence[bytes]) -> List[threading.Thread]:
+        threads = [threading.Thread(target=self._send, args=(messages,), daemon=True),
+                   threading.Thread(target=self._receive, args=(len(messages),), daemon=True)]
+        for t in threads:
+            t.start()
+        return threads
+
+
+def run_pipelined(messages: Sequence[bytes], host: str = HOST, port: int = PORT, connections: int = 1,
+                  depth: int = DEPTH, batch_size: int = BATCH_SIZE) -> Dict[str, float]:
+    """Send every message (round‑robin over `connections`) and wait for all echoes; returns a summary."""
+    pool = [PipelinedConnection(host, port, depth, batch_size) for _ in range(connections)]
+    shares = [messages[k::connections] for k in range(connections)]
+    t0 = time.perf_counter()
+    threads = [t for conn, share in zip(pool, shares) for t in conn.run(share)]
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    for conn in pool:
+        conn.conn.close()
+    lat = sorted(x for conn in pool for x in conn.latencies)
+    received = sum(c.received for c in pool)
+    errors = [repr(c.error) for c in pool if c.error is not None]
+    return {
+        "messages": len(messages), "received": received,
+        "mismatched": sum(c.mismatched for c in pool), "errors": len(errors),
+        "elapsed_s": elapsed, "msg_per_s": received / elapsed if elapsed else 0.0,
+        "mib_per_s": sum(len(m) for m in messages) / elapsed / 2**20 if elapsed else 0.0,
+        "p50_ms": percentile(lat, .50) * 1e3, "p90_ms": percentile(lat, .90) * 1e3,
+        "p99_ms": percentile(lat, .99) * 1e3, "max_ms": (lat[-1] if lat else float("nan")) * 1e3,
+    }
+
+
+def _read_messages(path: str, repeat: int) -> List[bytes]:
+    src = sys.stdin.buffer if path == "-" else open(path, "rb")
+    with src:
+        lines = [line.rstrip(b"\r\n") for line in src]
+    return lines * repeat
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Echo client: interactive, or pipelined batch / load mode.")
+    ap.add_argument("--host", default=HOST)
+    ap.add_argument("--port", type=int, default=PORT)
+    ap.add_argument("--batch", metavar="FILE", help="send every line of FILE ('-' = stdin) pipelined")
+    ap.add_argument("--connections", type=int, default=1)
+    ap.add_argument("--depth", type=int, default=DEPTH, help="in-flight requests per connection")
+    ap.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="frames per send")
+    ap.add_argument("--repeat", type=int, default=1, help="send the input this many times")
+    args = ap.parse_args()
+
+    if args.batch is None:
+        interactive(args.host, args.port)
+    else:
+        res = run_pipelined(_read_messages(args.batch, args.repeat), args.host, args.port,
+                            args.connections, args.depth, args.batch_size)
+        print(f"sent {res['messages']:,}  received {res['received']:,}  mismatched {res['mismatched']}  "
+              f"errors {res['errors']}  in {res['elapsed_s']:.2f} s")
+        print(f"throughput {res['msg_per_s']:,.0f} msg/s  {res['mib_per_s']:.2f} MiB/s")
+        print(f"latency ms  p50 {res['p50_ms']:.2f}  p90 {res['p90_ms']:.2f}  p99 {res['p99_ms']:.2f}  "
+              f"max {res['max_ms']:.2f}")
@@ -0,0 +1,237 @@
+"""
+framing.py — Length‑prefixed message frames shared by client.py and server.py
+------------------------------------------------------------------------------
+* Wire format: 4‑byte big‑endian payload length | 1‑byte message type | payload.
+  One frame is one message, whatever the TCP segmentation — no truncation of
+  large messages, no merging of small ones, and requests can be pipelined.
+* FrameBuffer is the receive side: a preallocated bytearray filled through
+  `recv_into` (or asyncio's BufferedProtocol) and parsed in place; payloads
+  come out as memoryviews into it, so nothing is copied or concatenated.
+  A leftover partial frame is moved to the front only near the buffer's end.
+* A payload larger than the buffer gets its own bytearray that the socket
+  reads straight into. It starts at the receive buffer's size and doubles as
+  bytes actually arrive (up to the announced length), so a bare header costs
+  nothing and a multi‑MB message is copied about twice at most. A FrameBudget
+  shared by many FrameBuffers caps the bytes all of them hold this way.
+* FramedSocket wraps a blocking socket for the client side; frames go out
+  with scatter/gather `sendmsg` (header and payload never joined).
+
+Example usage:
+    conn = FramedSocket(socket.create_connection((HOST, PORT)))
+    conn.send(MSG_DATA, b"hello")
+    kind, payload = conn.recv()
+
+Auther : SpectralZero
+"""
+from __future__ import annotations
+
+import socket, struct
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+HEADER      = struct.Struct("!IB")   # payload length, message type
+MAX_FRAME   = 64 * 2**20             # largest payload accepted (bytes)
+RECV_BUFFER = 256 * 1024             # preallocated receive buffer per connection
+BIG_FRAME_CHUNK = 1 * 2**20          # smallest step a large-frame buffer grows by
+
+# Message types
+MSG_DATA  = 1    # echoed back unchanged
+MSG_PING  = 2    # answered with MSG_PONG (same payload)
+MSG_PONG  = 3
+MSG_CLOSE = 4    # peer is done; server closes after flushing
+MSG_ERROR = 5    # payload is a UTF‑8 reason
+
+Frame = Tuple[int, memoryview]
+
+
+class FrameError(ValueError):
+    """Malformed or oversized frame — the connection should be dropped."""
+
+
+def header(kind: int, length: int) -> bytes:
+    if length > MAX_FRAME:
+        raise FrameError(f"payload of {length} bytes exceeds MAX_FRAME")
+    return HEADER.pack(length, kind)
+
+
+def encode(kind: int, payload: bytes = b"") -> bytes:
+    """Header + payload as one bytes object (convenient for small frames)."""
+    return header(kind, len(payload)) + payload
+
+# ─────────────────────────── receive side ─────────────────────────────
+
+class FrameBudget:
+    """Byte budget for large-frame buffers, shared by the FrameBuffers of one event loop / thread."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self.peak = 0
+
+    def take(self, n: int) -> bool:
+        if self.used + n > self.limit:
+            return False
+        self.used += n
+        self.peak = max(self.peak, self.used)
+        return True
+
+    def give(self, n: int) -> None:
+        self.used -= n
+
+
+class FrameBuffer:
+    """Receive buffer + in‑place parser.
+
+    Loop: `n = sock.recv_into(fb.get_buffer())`, `fb.filled(n)`, then iterate
+    `fb.frames()`.  Yielded payloads are views into the buffer and are only
+    valid until the next `get_buffer()` — copy (`bytes(p)`) anything kept.
+    Payloads too big for the buffer (see `_grow_big`) are the exception:
+    their buffer is never reused, so the view may be kept.
+    """
+
+    def __init__(self, size: int = RECV_BUFFER, max_frame: int = MAX_FRAME,
+                 budget: Optional[FrameBudget] = None):
+        self.buf = bytearray(size)
+        self.mv = memoryview(self.buf)
+        self.start = self.end = 0            # unparsed bytes are buf[start:end]
+        self.max_frame = max_frame
+        self.budget = budget
+        self._big: Optional[bytearray] = None   # dedicated buffer for an oversized payload, grown on demand
+        self._big_kind = 0
+        self._big_len = 0                       # announced payload length
+        self._big_fill = 0
+
+    def _grow_big(self) -> None:
+        """Make room for more of the large payload: double (≥ BIG_FRAME_CHUNK), never past its length."""
+        old = len(self._big)
+        new = min(self._big_len, max(old * 2, old + BIG_FRAME_CHUNK))
+        if self.budget is not None and not self.budget.take(new - old):
+            raise FrameError(f"no memory budget left for a {self._big_len}-byte frame")
+        big = bytearray(new)
+        big[:self._big_fill] = memoryview(self._big)[:self._big_fill]
+        self._big = big
+
+    def release(self) -> None:
+        """Drop a partly received large payload (connection gone) and return its budget."""
+        if self._big is not None:
+            if self.budget is not None:
+                self.budget.give(len(self._big))
+            self._big = None
+
+    def get_buffer(self, sizehint: int = -1) -> memoryview:
+        """Writable region for the next read."""
+        if self._big is not None:
+            if self._big_fill == len(self._big):
+                self._grow_big()
+            return memoryview(self._big)[self._big_fill:]
+        if self.start == self.end:
+            self.start = self.end = 0
+        elif self.end > len(self.buf) - 4096:   # nearly out of room: move the partial frame to the front
+            n = self.end - self.start
+            self.buf[:n] = self.mv[self.start:self.end]
+            self.start, self.end = 0, n
+        return self.mv[self.end:]
+
+    def filled(self, n: int) -> None:
+        if self._big is not None:
+            self._big_fill += n
+        else:
+            self.end += n
+
+    # BufferedProtocol spelling
+    buffer_updated = filled
+
+    def frames(self) -> Iterator[Frame]:
+        """Every complete frame received so far."""
+        if self._big is not None:
+            if self._big_fill < self._big_len:
+                if self._big_fill == len(self._big):
+                    self._grow_big()             # here, so a FrameError reaches the caller of frames()
+                return
+            big, self._big = self._big, None
+            if self.budget is not None:
+                self.budget.give(len(big))
+            yield self._big_kind, memoryview(big)
+        hsize, cap = HEADER.size, len(self.buf)
+        while self.end - self.start >= hsize:
+            length, kind = HEADER.unpack_from(self.buf, self.start)
+            if length > self.max_frame:
+                raise FrameError(f"incoming frame of {length} bytes exceeds max_frame")
+            body = self.start + hsize
+            if self.end - body >= length:
+                self.start = body + length
+                yield kind, self.mv[body:body + length]
+            elif hsize + length > cap:       # will never fit: stream it into its own buffer
+                have = self.end - body
+                size = min(length, max(have, cap))
+                if self.budget is not None and not self.budget.take(size):
+                    raise FrameError(f"no memory budget left for a {length}-byte frame")
+                self._big = bytearray(size)
+                self._big[:have] = self.mv[body:self.end]
+                self._big_kind, self._big_len, self._big_fill = kind, length, have
+                self.start = self.end = 0
+                return
+            else:
+                return
+
+# ─────────────────────────── blocking socket wrapper ──────────────────
+
+def _sendmsg_all(sock: socket.socket, parts: List[memoryview]) -> None:
+    while parts:
+        sent = sock.sendmsg(parts[:1024])    # IOV_MAX is 1024 on Linux/macOS
+        while sent:
+            if sent >= len(parts[0]):
+                sent -= len(parts.pop(0))
+            else:
+                parts[0] = parts[0][sent:]
+                sent = 0
+        while parts and not len(parts[0]):
+            parts.pop(0)
+
+
+class FramedSocket:
+    """Blocking framed connection (client side)."""
+
+    def __init__(self, sock: socket.socket, recv_buffer: int = RECV_BUFFER):
+        self.sock = sock
+        self.rx = FrameBuffer(recv_buffer)
+        self._pending: Iterator[Frame] = iter(())
+        self._sendmsg = hasattr(sock, "sendmsg")   # not on Windows
+
+    def send_many(self, frames: Iterable[Tuple[int, bytes]]) -> None:
+        """Write several frames with one gather write (pipelining)."""
+        parts: List[memoryview] = []
+        for kind, payload in frames:
+            parts.append(memoryview(header(kind, len(payload))))
+            if payload:
+                parts.append(memoryview(payload))
+        if self._sendmsg:
+            _sendmsg_all(self.sock, parts)
+        else:
+            self.sock.sendall(b"".join(parts))
+
+    def send(self, kind: int, payload: bytes = b"") -> None:
+        self.send_many(((kind, payload),))
+
+    def recv(self) -> Frame:
+        """Next frame (payload view valid until the next recv); raises ConnectionError on EOF."""
+        while True:
+            for frame in self._pending:
+                return frame
+            n = self.sock.recv_into(self.rx.get_buffer())
+            if not n:
+                raise ConnectionError("connection closed by peer")
+            self.rx.filled(n)
+            self._pending = self.rx.frames()
+
+    def close(self) -> None:
+        try:
+            self.send(MSG_CLOSE)
+        except OSError:
+            pass
+        self.sock.close()
+
+    def __enter__(self) -> "FramedSocket":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -1,8 +1,436 @@
 # glitch.py
 
 import tkinter as tk
-from PIL import Image, ImageDraw, ImageFont, ImageChops, ImageTk
+from PIL import Image, ImageColor, ImageDraw, ImageFont, ImageTk
+from collections import OrderedDict, deque
+import argparse
+import functools
+import numpy as np
+import os
 import random
+import sys
+import threading
+import time
+
+GLITCH_EFFECTS = ('shift_band', 'color_channel_shift', 'scanlines', 'noise')
+
+# Glitch characters to use
+GLITCH_CHARS = ['Ѭ', '҂', '█▀█\n█▄█', '∭', '☠☠☠\n☠☠☠', '∬', '∰', '⛢', '⎯⎯⎯⎯⎯\n⎯⎯⎯⎯⎯', '𝔄', '𝔅', '𝔇', '⬢', '⬣',
+                'ᚠ', '⧈⧉⧈\n⧉⧈⧉', 'ᚢ', '⧈⧉⧈', 'ᚦ', '▓▓▓\n▓▓▓', 'ᚩ', '█▓▒░\n░▒▓█']
+
+BASE_TEXT = "ACCESS DENIED"
+FONT_SIZE = 60
+TEXT_COLOR = 'Red'
+TILE_CACHE_SIZE = 32     # rendered glitched strings kept (LRU)
+PRERENDER_AHEAD = 4      # glitched strings the background thread keeps ready
+TARGET_FPS = 60          # frame rate the Tk loop paces itself to
+
+
+class GlitchEngine:
+    """
+    The glitch effects as NumPy operations on one reusable RGB frame buffer
+    (height x width x 3, uint8). Same look as the old per-pixel PIL code,
+    but no Python loop over pixels or rows and no new image per effect.
+    """
+
+    def __init__(self, width, height, seed=None):
+        self.width, self.height = width, height
+        self.frame = np.zeros((height, width, 3), dtype=np.uint8)
+        self._rows = self.frame.reshape(height, width * 3)          # same memory, one row per line
+        self._plane = np.empty((height, width), dtype=np.uint8)    # scratch for channel shifts
+        self.image = Image.new('RGB', (width, height))             # reused output image
+        self.random = random.Random(seed)                          # effect choice and parameters
+        self.rng = np.random.default_rng(seed)                     # noise pixels
+
+    def load(self, src):
+        # Copy a PIL image (or an array of the same shape) into the frame buffer
+        np.copyto(self.frame, src if isinstance(src, np.ndarray) else np.asarray(src))
+
+    def to_image(self):
+        # Write the frame buffer into the reused PIL image (one copy, no allocation)
+        self.image.frombytes(self.frame)
+        return self.image
+
+    def shift_band(self, glitch_height, glitch_start, glitch_shift):
+        # Move rows [start, start + height) sideways; uncovered pixels keep their value
+        band = self.frame[glitch_start:glitch_start + glitch_height]
+        if glitch_shift > 0:
+            band[:, glitch_shift:] = band[:, :-glitch_shift]
+        elif glitch_shift < 0:
+            band[:, :glitch_shift] = band[:, -glitch_shift:]
+
+    def color_channel_shift(self, channel, shift):
+        # Roll one channel horizontally, wrapping around (like ImageChops.offset)
+        shift %= self.width
+        if not shift:
+            return
+        c = 'RGB'.index(channel)
+        plane, src = self._plane, self.frame[:, :, c]
+        plane[:, shift:] = src[:, :-shift]
+        plane[:, :shift] = src[:, -shift:]
+        src[...] = plane
+
+    def scanlines(self, line_spacing, line_color=(0, 0, 0)):
+        # Every `line_spacing`-th row, written as whole rows (plain memset for grey/black)
+        if line_color[0] == line_color[1] == line_color[2]:
+            self._rows[::line_spacing] = line_color[0]
+        else:
+            self._rows[::line_spacing] = np.tile(np.array(line_color, dtype=np.uint8), self.width)
+
+    def noise(self, count):
+        # `count` random pixels (repeats allowed) get random colours
+        ys = self.rng.integers(0, self.height, count)
+        xs = self.rng.integers(0, self.width, count)
+        self.frame[ys, xs] = self.rng.integers(0, 256, (count, 3), dtype=np.uint8)
+
+    def apply_random(self):
+        # 1-3 random effects with the same parameter ranges as before
+        rnd = self.random
+        for _ in range(rnd.randint(1, 3)):
+            effect = rnd.choice(GLITCH_EFFECTS)
+            if effect == 'shift_band':
+                glitch_height = rnd.randint(5, 30)
+                glitch_start = rnd.randint(0, self.height - glitch_height)
+                self.shift_band(glitch_height, glitch_start, rnd.randint(-20, 20))
+            elif effect == 'color_channel_shift':
+                shift = rnd.randint(-5, 5)
+                self.color_channel_shift(rnd.choice('RGB'), shift)
+            elif effect == 'scanlines':
+                self.scanlines(rnd.randint(3, 10))
+            elif effect == 'noise':
+                self.noise(self.width * self.height // 100)
+
+
+# Function to apply advanced glitch effects
+def glitch_image_real_time(img, engine=None):
+    # Pass the same engine every frame to reuse its buffers
+    if engine is None:
+        engine = GlitchEngine(img.width, img.height)
+    engine.load(img)
+    engine.apply_random()
+    return engine.to_image()
+
+
+# Create a function to generate glitchy text
+def create_glitch_text(original_text, glitch_probability=0.9, rnd=random):
+    glitched_text = ''
+    for char in original_text:
+        if char != ' ' and rnd.random() < glitch_probability:
+            glitched_text += rnd.choice(GLITCH_CHARS)
+        else:
+            glitched_text += char
+    return glitched_text
+
+
+@functools.lru_cache(maxsize=None)
+def load_font(font_size=FONT_SIZE):
+    # Looked up once per size (a missing font file is not retried every frame)
+    try:
+        # Replace 'arial.ttf' with the path to a font file on your system
+        return ImageFont.truetype('arial.ttf', font_size)
+    except IOError:
+        return ImageFont.load_default()
+
+
+class TextFrames:
+    """
+    One full-screen frame (allocated once, as a PIL image and a matching
+    array for the glitch engine) showing centred text. Text is rasterized
+    into a small tile the size of its bounding box, and changing the text
+    only repaints the old and new tile areas.
+    """
+
+    def __init__(self, width, height, font=None, fill=TEXT_COLOR, background='black'):
+        self.width, self.height = width, height
+        self.font = font or load_font()
+        self.fill, self.background = fill, background
+        self.image = Image.new('RGB', (width, height), background)
+        self.array = np.empty((height, width, 3), dtype=np.uint8)
+        self.array[...] = ImageColor.getrgb(background)
+        self._measure = ImageDraw.Draw(Image.new('RGB', (1, 1)))
+        self._shown = None       # tile currently painted into self.image
+
+    def render_tile(self, text):
+        # -> (tile image, (x, y), tile array) placed exactly where a full-frame draw.text would put the ink
+        bbox = self._measure.textbbox((0, 0), text, font=self.font)
+        text_x = (self.width - (bbox[2] - bbox[0])) // 2
+        text_y = (self.height - (bbox[3] - bbox[1])) // 2
+        x0, y0 = max(text_x + bbox[0], 0), max(text_y + bbox[1], 0)
+        x1, y1 = min(text_x + bbox[2], self.width), min(text_y + bbox[3], self.height)
+        tile = Image.new('RGB', (max(x1 - x0, 1), max(y1 - y0, 1)), self.background)
+        ImageDraw.Draw(tile).text((text_x - x0, text_y - y0), text, font=self.font, fill=self.fill)
+        return tile, (x0, y0), np.asarray(tile)
+
+    def show(self, tile):
+        # Paint `tile` (from render_tile) into the frame; returns True if the frame changed
+        if tile is self._shown:
+            return False
+        if self._shown is not None:
+            old, (x, y), _ = self._shown
+            self.image.paste(self.background, (x, y, x + old.width, y + old.height))
+            self.array[y:y + old.height, x:x + old.width] = ImageColor.getrgb(self.background)
+        img, (x, y), arr = tile
+        self.image.paste(img, (x, y))
+        self.array[y:y + img.height, x:x + img.width] = arr
+        self._shown = tile
+        return True
+
+
+class GlitchFramePool:
+    """
+    Rendered text tiles keyed by glitched string (LRU, `max_tiles` kept).
+    A background thread keeps `ahead` freshly glitched strings rendered, so
+    the Tk callback only has to paste a ready tile. If that thread fails,
+    the exception is kept in `error` and tiles are rendered on demand again.
+    """
+
+    def __init__(self, frames, base_text=BASE_TEXT, glitch_probability=0.1, max_tiles=TILE_CACHE_SIZE,
+                 ahead=PRERENDER_AHEAD, seed=None):
+        self.frames, self.base_text = frames, base_text
+        self.glitch_probability = glitch_probability
+        self.max_tiles, self.ahead = max_tiles, ahead
+        self.random = random.Random(seed)
+        self._tiles = OrderedDict()
+        self._ready = deque()
+        self._lock = threading.Lock()          # tiles / random
+        self._cond = threading.Condition()     # ready queue
+        self._thread = None
+        self._filling = False                  # prerender thread still producing (guarded by _cond)
+        self._stop = threading.Event()
+        self.error = None                      # exception that ended the prerender thread, if any
+        self.counters = {'hits': 0, 'renders': 0, 'evictions': 0, 'prerendered': 0, 'waited': 0}
+
+    def tile(self, text):
+        with self._lock:
+            tile = self._tiles.get(text)
+            if tile is not None:
+                self._tiles.move_to_end(text)
+                self.counters['hits'] += 1
+                return tile
+        tile = self.frames.render_tile(text)     # outside the lock: this is the slow part
+        with self._lock:
+            self._tiles[text] = tile
+            self.counters['renders'] += 1
+            while len(self._tiles) > self.max_tiles:
+                self._tiles.popitem(last=False)
+                self.counters['evictions'] += 1
+        return tile
+
+    def _glitched(self):
+        with self._lock:
+            text = create_glitch_text(self.base_text, self.glitch_probability, self.random)
+        return text, self.tile(text)
+
+    def _fill(self):
+        try:
+            while True:
+                with self._cond:
+                    while len(self._ready) >= self.ahead and not self._stop.is_set():
+                        self._cond.wait()
+                if self._stop.is_set():
+                    return
+                item = self._glitched()
+                with self._cond:
+                    self._ready.append(item)
+                    self.counters['prerendered'] += 1
+                    self._cond.notify_all()
+        except Exception as e:
+            self.error = e
+        finally:
+            # Wake next_glitched() so it never waits on a thread that is gone
+            with self._cond:
+                self._filling = False
+                self._cond.notify_all()
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self.error = None
+            self._filling = True
+            self._thread = threading.Thread(target=self._fill, name='glitch-prerender', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def next_glitched(self):
+        # -> (glitched string, tile): the next prerendered one (waits if the thread is behind),
+        # or rendered here when no thread runs; same sequence for the same seed either way.
+        # Once the thread has died (see `error`) the leftovers are used up, then we render here.
+        with self._cond:
+            if self._thread is not None:
+                if not self._ready and self._filling:
+                    self.counters['waited'] += 1
+                    self._cond.wait_for(lambda: self._ready or not self._filling)
+                if self._ready:
+                    item = self._ready.popleft()
+                    self._cond.notify_all()
+                    return item
+        return self._glitched()
+
+
+class GlitchAnimation:
+    """
+    Frame generator behind the glitch window (no Tk needed): call tick()
+    once per frame and display the image it returns. `changed` tells
+    whether that image differs from the previous tick's.
+    """
+
+    def __init__(self, width, height, base_text=BASE_TEXT, seed=None, font=None, prerender=True):
+        self.random = random.Random(seed)                    # glitch timing
+        self.frames = TextFrames(width, height, font)
+        self.pool = GlitchFramePool(self.frames, base_text,
+                                    seed=None if seed is None else seed + 1)
+        self.engine = GlitchEngine(width, height, None if seed is None else seed + 2)
+        self.base_tile = self.frames.render_tile(base_text)
+        self.glitched_tile = None
+        self.current_tile = self.base_tile
+        self.frames.show(self.base_tile)
+        # Variables to control glitch timing and duration
+        self.text_glitch_cooldown = 0
+        self.text_glitch_duration = 0
+        self.image_glitch_cooldown = 0
+        self.image_glitch_duration = 0
+        self.changed = True
+        self._dirty = True       # next frame differs even if the text does not (first frame, after a glitch)
+        if prerender:
+            self.pool.start()
+
+    def close(self):
+        self.pool.stop()
+
+    def tick(self):
+        rnd = self.random
+        # Text glitch handling
+        if self.text_glitch_cooldown <= 0 and self.text_glitch_duration <= 0:
+            if rnd.random() < 0.9:
+                self.text_glitch_duration = rnd.randint(10, 30)
+                self.text_glitch_cooldown = rnd.randint(200, 400)
+                _, self.glitched_tile = self.pool.next_glitched()
+        else:
+            if self.text_glitch_duration > 0:
+                self.text_glitch_duration -= 1
+                self.current_tile = self.glitched_tile
+            else:
+                self.text_glitch_cooldown -= 1
+                self.current_tile = self.base_tile
+        changed = self.frames.show(self.current_tile) or self._dirty
+
+        # Image glitch handling
+        if self.image_glitch_cooldown <= 0 and self.image_glitch_duration <= 0:
+            if rnd.random() < 0.08:
+                self.image_glitch_duration = rnd.randint(5, 15)
+                self.image_glitch_cooldown = rnd.randint(60, 180)
+        else:
+            if self.image_glitch_duration > 0:
+                # Apply glitch effect
+                self.image_glitch_duration -= 1
+                self.engine.load(self.frames.array)
+                self.engine.apply_random()
+                self.changed = self._dirty = True
+                return self.engine.to_image()
+            else:
+                self.image_glitch_cooldown -= 1
+        self.changed, self._dirty = changed, False
+        return self.frames.image
+
+
+class FramePacer:
+    """
+    Frame timing on a fixed timeline at `fps`: the wait before the next frame
+    is what is left of the period after this frame's work. A frame starting a
+    whole period late counts as dropped (once per missed period) and the
+    timeline skips ahead rather than trying to catch up.
+    """
+
+    def __init__(self, fps=TARGET_FPS, clock=time.perf_counter):
+        self.period = 1.0 / fps
+        self.clock = clock
+        self.deadline = self.started = self._frame_start = None
+        self.busy = self.worst = 0.0
+        self.counters = {'frames': 0, 'drawn': 0, 'unchanged': 0, 'dropped': 0}
+
+    def begin(self):
+        now = self._frame_start = self.clock()
+        if self.deadline is None:
+            self.deadline = self.started = now
+        late = now - self.deadline
+        if late >= self.period:
+            missed = int(late // self.period)
+            self.counters['dropped'] += missed
+            self.deadline += missed * self.period
+        self.counters['frames'] += 1
+
+    def end(self, drawn=True):
+        # -> milliseconds to wait before the next frame
+        now = self.clock()
+        work = now - self._frame_start
+        self.busy += work
+        self.worst = max(self.worst, work)
+        self.counters['drawn' if drawn else 'unchanged'] += 1
+        self.deadline += self.period
+        return max(0, int((self.deadline - now) * 1000))
+
+    def stats(self):
+        frames = self.counters['frames']
+        elapsed = self.clock() - self.started if self.started is not None else 0.0
+        return {**self.counters,
+                'fps': frames / elapsed if elapsed else 0.0,
+                'mean_frame_ms': self.busy / frames * 1e3 if frames else 0.0,
+                'worst_frame_ms': self.worst * 1e3}
+
+
+# Headless rendering: the same frames as the window, written to a file
+def render_frames(width, height, count, seed=0, base_text=BASE_TEXT):
+    # Yield (image, changed) for `count` ticks; the same seed gives the same frames.
+    # The image is reused between ticks: copy it to keep it.
+    animation = GlitchAnimation(width, height, base_text, seed=seed, prerender=False)
+    try:
+        for _ in range(count):
+            image = animation.tick()
+            yield image, animation.changed
+    finally:
+        animation.close()
+
+
+def save_frames(frames, path, fps=TARGET_FPS, fmt=None):
+    # Write (image, changed) pairs as an animated GIF / WebP, or raw RGB24 frames
+    # ('raw', '-' = stdout, e.g. for `ffmpeg -f rawvideo -pix_fmt rgb24 -s WxH -r FPS -i -`).
+    fmt = (fmt or os.path.splitext(path)[1].lstrip('.') or 'raw').lower()
+    fmt = 'raw' if fmt in ('rgb', 'bin') else fmt
+    frame_ms = 1000.0 / fps
+    count = 0
+    if fmt == 'raw':
+        out = sys.stdout.buffer if path == '-' else open(path, 'wb')
+        try:
+            for image, _ in frames:
+                out.write(image.tobytes())
+                count += 1
+        finally:
+            if out is not sys.stdout.buffer:
+                out.close()
+        return {'frames': count, 'stored': count, 'format': fmt}
+    if fmt not in ('gif', 'webp'):
+        raise ValueError(f"unknown output format {fmt!r} (gif, webp or raw)")
+
+    # Unchanged frames only lengthen the previous frame, so memory grows with changes, not length
+    stored, durations = [], []
+    for image, changed in frames:
+        if changed or not stored:
+            stored.append(image.convert('P', palette=Image.ADAPTIVE) if fmt == 'gif' else image.copy())
+            durations.append(0.0)
+        durations[-1] += frame_ms
+        count += 1
+    stored[0].save(path, format=fmt.upper(), save_all=True, append_images=stored[1:],
+                   duration=[max(int(round(d)), 20) for d in durations], loop=0)
+    return {'frames': count, 'stored': len(stored), 'format': fmt}
+
 
 def run_glitch_effect_tkinter():
     # Create a new full-screen Tkinter window
@@ -19,104 +447,14 @@ def run_glitch_effect_tkinter():
     canvas = tk.Canvas(glitch_window, width=width, height=height, highlightthickness=0)
     canvas.pack()
 
-    # Glitch characters to use
-    glitch_chars = ['Ѭ', '҂', '█▀█\n█▄█', '∭', '☠☠☠\n☠☠☠', '∬', '∰', '⛢', '⎯⎯⎯⎯⎯\n⎯⎯⎯⎯⎯', '𝔄', '𝔅', '𝔇', '⬢', '⬣',
-                    'ᚠ', '⧈⧉⧈\n⧉⧈⧉', 'ᚢ', '⧈⧉⧈', 'ᚦ', '▓▓▓\n▓▓▓', 'ᚩ', '█▓▒░\n░▒▓█']
+    # Frames come from here; text tiles are rendered ahead in a background thread
+    animation = GlitchAnimation(width, height)
+    pacer = FramePacer(TARGET_FPS)
 
-    # Create a function to generate glitchy text
-    def create_glitch_text(original_text, glitch_probability=0.9):
-        glitched_text = ''
-        for char in original_text:
-            if char != ' ' and random.random() < glitch_probability:
-                glitched_text += random.choice(glitch_chars)
-            else:
-                glitched_text += char
-        return glitched_text
-
-    # Create a function to generate the base image
-    def create_base_image(text):
-        image = Image.new('RGB', (width, height), 'black')
-        draw = ImageDraw.Draw(image)
-
-        # Add hacker-themed text
-        font_size = 60
-        try:
-            # Replace 'arial.ttf' with the path to a font file on your system
-            font = ImageFont.truetype('arial.ttf', font_size)
-        except IOError:
-            font = ImageFont.load_default()
-
-        # Calculate text size
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-
-        # Center the text
-        text_x = (width - text_width) // 2
-        text_y = (height - text_height) // 2
-
-        # Draw the text
-        draw.text((text_x, text_y), text, font=font, fill='Red')
-        return image
-
-    # Function to apply advanced glitch effects
-    def glitch_image_real_time(img):
-        num_glitches = random.randint(1, 3)
-        for _ in range(num_glitches):
-            effect = random.choice(['shift_band', 'color_channel_shift', 'scanlines', 'noise'])
-            if effect == 'shift_band':
-                # Randomly select the glitch parameters
-                glitch_height = random.randint(5, 30)
-                glitch_start = random.randint(0, img.height - glitch_height)
-                glitch_shift = random.randint(-20, 20)
-
-                # Crop a horizontal band from the image
-                box = (0, glitch_start, img.width, glitch_start + glitch_height)
-                band = img.crop(box)
-
-                # Shift the band horizontally
-                img.paste(band, (glitch_shift, glitch_start))
-            elif effect == 'color_channel_shift':
-                # Split into R, G, B channels
-                r, g, b = img.split()
-                # Shift one channel
-                shift = random.randint(-5, 5)
-                channel_to_shift = random.choice(['R', 'G', 'B'])
-                if channel_to_shift == 'R':
-                    r = ImageChops.offset(r, shift, 0)
-                elif channel_to_shift == 'G':
-                    g = ImageChops.offset(g, shift, 0)
-                elif channel_to_shift == 'B':
-                    b = ImageChops.offset(b, shift, 0)
-                # Merge back
-                img = Image.merge('RGB', (r, g, b))
-            elif effect == 'scanlines':
-                draw = ImageDraw.Draw(img)
-                line_spacing = random.randint(3, 10)
-                line_color = (0, 0, 0)
-                for y in range(0, img.height, line_spacing):
-                    draw.line([(0, y), (img.width, y)], fill=line_color)
-            elif effect == 'noise':
-                # Add random noise
-                pixels = img.load()
-                for _ in range(img.width * img.height // 100):
-                    x = random.randint(0, img.width - 1)
-                    y = random.randint(0, img.height - 1)
-                    pixels[x, y] = (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
-        return img
-
-    # Variables to control glitch timing and duration
-    text_glitch_cooldown = 0
-    text_glitch_duration = 0
-    image_glitch_cooldown = 0
-    image_glitch_duration = 0
-
-    base_text = "ACCESS DENIED"
-
-    # Create the base image once
-    base_image = create_base_image(base_text)
-    current_image = base_image.copy()
-    glitched_text_image = None
+    # One canvas item and one PhotoImage for the whole run; frames are pasted into it
+    photo = ImageTk.PhotoImage('RGB', (width, height))
+    canvas.create_image(0, 0, anchor=tk.NW, image=photo)
+    canvas.image = photo  # Keep a reference
 
     # Update the canvas with the glitch effect
     def update_canvas():
@@ -124,47 +462,15 @@ def run_glitch_effect_tkinter():
         if not canvas.winfo_exists():
             return  # Stop updating if the canvas has been destroyed
 
-        nonlocal text_glitch_cooldown, text_glitch_duration, image_glitch_cooldown, image_glitch_duration
-        nonlocal current_image, glitched_text_image
+        pacer.begin()
+        display_image = animation.tick()
 
-        # Text glitch handling
-        if text_glitch_cooldown <= 0 and text_glitch_duration <= 0:
-            if random.random() < 0.9:
-                text_glitch_duration = random.randint(10, 30)
-                text_glitch_cooldown = random.randint(200, 400)
-                # Create glitchy text image
-                glitched_text = create_glitch_text(base_text, glitch_probability=0.1)
-                glitched_text_image = create_base_image(glitched_text)
-        else:
-            if text_glitch_duration > 0:
-                text_glitch_duration -= 1
-                current_image = glitched_text_image
-            else:
-                text_glitch_cooldown -= 1
-                current_image = base_image
-
-        # Image glitch handling
-        display_image = current_image.copy()
-
-        if image_glitch_cooldown <= 0 and image_glitch_duration <= 0:
-            if random.random() < 0.08:
-                image_glitch_duration = random.randint(5, 15)
-                image_glitch_cooldown = random.randint(60, 180)
-        else:
-            if image_glitch_duration > 0:
-                # Apply glitch effect
-                display_image = glitch_image_real_time(display_image)
-                image_glitch_duration -= 1
-            else:
-                image_glitch_cooldown -= 1
+        # Convert into the PhotoImage only when the frame changed
+        if animation.changed:
+            photo.paste(display_image)
 
-        # Convert the PIL image to a PhotoImage
-        photo = ImageTk.PhotoImage(display_image)
-        canvas.create_image(0, 0, anchor=tk.NW, image=photo)
-        canvas.image = photo  # Keep a reference
-
-        # Update the canvas every 50 milliseconds
-        canvas.after(10, update_canvas)
+        # Next frame at the next TARGET_FPS slot, minus the time this one took
+        canvas.after(pacer.end(animation.changed), update_canvas)
 
     # Start updating the canvas
     update_canvas()
@@ -174,5 +480,28 @@ def run_glitch_effect_tkinter():
 
     # Start the glitch window's mainloop
     glitch_window.mainloop()
+    animation.close()
+    return pacer.stats()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Full-screen glitch effect; `render` writes it to a file instead.')
+    commands = parser.add_subparsers(dest='command')
+    render = commands.add_parser('render', help='render frames headless (no display needed)')
+    render.add_argument('out', help="output file: .gif, .webp, or raw RGB24 frames (.rgb / .raw, '-' = stdout)")
+    render.add_argument('--frames', type=int, default=300)
+    render.add_argument('--size', default='1280x720', help='WIDTHxHEIGHT')
+    render.add_argument('--fps', type=int, default=TARGET_FPS)
+    render.add_argument('--seed', type=int, default=0)
+    render.add_argument('--format', choices=['gif', 'webp', 'raw'])
+    render.add_argument('--text', default=BASE_TEXT)
+    args = parser.parse_args()
 
-run_glitch_effect_tkinter()
+    if args.command == 'render':
+        width, height = map(int, args.size.lower().split('x'))
+        started = time.perf_counter()
+        result = save_frames(render_frames(width, height, args.frames, args.seed, args.text), args.out,
+                             args.fps, args.format)
+        print(f"{result['frames']} frames ({result['stored']} stored) {width}x{height} {result['format']} "
+              f"-> {args.out} in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+    else:
+        run_glitch_effect_tkinter()
@@ -2,57 +2,861 @@
 http_requests_demo.py
 A beginner-friendly but complete demo of HTTP with Python 'requests'.
 
+All calls go through one shared, pooled `requests.Session`, so repeated
+requests to the same host reuse kept-alive TCP/TLS connections instead of
+paying a new handshake every time (see configure_pool / pool_stats).
+
+async_safe_request / gather_requests / fetch_all are the asyncio versions:
+same errors as safe_request, run on a worker pool over the same session,
+with an overall concurrency cap and a per-host cap.
+
+Idempotent requests are retried on timeouts, connection errors and
+429/502/503/504 with exponential backoff + jitter (Retry-After is honoured),
+and a per-host circuit breaker fails fast once a host keeps failing.
+
+enable_cache() turns on an HTTP cache for GET: byte-bounded in-memory LRU
+(+ optional directory), Cache-Control / Expires freshness, ETag /
+Last-Modified revalidation, Vary, and invalidation on PUT/PATCH/DELETE.
+
+Large bodies: safe_request(..., stream=True) leaves the body on the wire,
+stream_chunks() iterates it in chunks and stream_json_array() yields the
+items of a JSON array one at a time, so memory stays at one chunk + one
+item. Error bodies are only read up to ERROR_BODY_PREFIX bytes.
+
 Run: python http_requests_demo.py
 """
 
 import requests
+import asyncio
+import codecs
+import functools
+import hashlib
 import json
+import os
+import random
+import re
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
 
 # Using JSONPlaceholder - a free fake API for testing
 BASE_URL = "https://jsonplaceholder.typicode.com"
 TIMEOUT = 10  # seconds
 
+# Connection pool settings for the shared session
+POOL_CONNECTIONS = 10   # how many different hosts keep a pool
+POOL_MAXSIZE = 10       # kept-alive connections per host
+POOL_BLOCK = False      # True = wait for a free connection instead of opening an extra one
+QUIET = False           # True = no per-request printing (benchmarks, bulk use)
+
+# Async engine settings
+MAX_CONCURRENCY = 32    # requests in flight at once across all hosts
+PER_HOST_LIMIT = 8      # requests in flight at once to one host
+
+# Retry / circuit breaker settings
+RETRY_ATTEMPTS = 3      # total tries for idempotent methods (1 = never retry)
+RETRY_BACKOFF = 0.25    # first backoff (s); doubles every attempt, full jitter
+RETRY_MAX_DELAY = 10.0  # longest single wait; a longer Retry-After is not waited for
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"})
+BREAKER_THRESHOLD = 5   # consecutive failures that open a host's circuit
+BREAKER_COOLDOWN = 30.0 # seconds an open circuit fails fast before one trial request
+
+# Response cache settings (off until enable_cache())
+CACHE_MAX_BYTES = 32 * 2**20   # bodies kept in memory
+CACHE_DIR = None               # optional directory that keeps entries across runs
+
+# Streaming settings
+STREAM_CHUNK = 64 * 1024       # bytes per chunk when iterating a body
+ERROR_BODY_PREFIX = 1024       # bytes of a 4xx/5xx body that are read (the rest is dropped)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_per_host: Dict[str, int] = {}          # "scheme://host[:port]" -> pool size override
+_calls = 0
+
+
+def _log(msg: str) -> None:
+    if not QUIET:
+        print(msg)
+
+
+def _new_session() -> requests.Session:
+    sess = requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, pool_block=POOL_BLOCK)
+    sess.mount("http://", adapter)
+    sess.mount("https://", adapter)
+    for prefix, size in _per_host.items():
+        # A more specific mount wins, so this host gets its own pool size
+        sess.mount(prefix, HTTPAdapter(pool_connections=1, pool_maxsize=size, pool_block=POOL_BLOCK))
+    return sess
+
+
+def get_session() -> requests.Session:
+    """The shared session behind safe_request (created on first use)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _new_session()
+    return _session
+
+
+def configure_pool(pool_connections: Optional[int] = None, pool_maxsize: Optional[int] = None,
+                   block: Optional[bool] = None, per_host: Optional[Dict[str, int]] = None) -> None:
+    """
+    Change pool sizes. per_host maps a URL prefix to its own pool size, e.g.
+    {"https://jsonplaceholder.typicode.com": 20}. Takes effect for the next request
+    (the current session and its connections are closed).
+    """
+    global POOL_CONNECTIONS, POOL_MAXSIZE, POOL_BLOCK
+    if pool_connections is not None:
+        POOL_CONNECTIONS = pool_connections
+    if pool_maxsize is not None:
+        POOL_MAXSIZE = pool_maxsize
+    if block is not None:
+        POOL_BLOCK = block
+    if per_host is not None:
+        _per_host.clear()
+        for prefix, size in per_host.items():
+            parts = urlsplit(prefix)
+            _per_host[f"{parts.scheme}://{parts.netloc}"] = size
+    close_session()
+
+
+def close_session() -> None:
+    """Close the shared session (and its kept-alive connections)."""
+    global _session, _calls
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+        _calls = 0
+
+
+def pool_stats() -> Dict[str, float]:
+    """
+    Connection reuse metrics for the shared session: requests sent vs TCP
+    connections opened by the pools (a pool dropped for exceeding
+    POOL_CONNECTIONS takes its counts with it).
+    """
+    requests_sent = opened = pools = 0
+    if _session is not None:
+        seen = set()
+        for adapter in _session.adapters.values():
+            if id(adapter) in seen:
+                continue
+            seen.add(id(adapter))
+            container = adapter.poolmanager.pools
+            for key in container.keys():
+                pool = container.get(key)
+                if pool is None:
+                    continue
+                pools += 1
+                requests_sent += pool.num_requests
+                opened += pool.num_connections
+    return {
+        "calls": _calls,
+        "pools": pools,
+        "requests": requests_sent,
+        "connections_opened": opened,
+        "reused": max(requests_sent - opened, 0),
+        "reuse_ratio": (requests_sent - opened) / requests_sent if requests_sent else 0.0,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Retries and circuit breaker
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    attempts: int = RETRY_ATTEMPTS
+    backoff: float = RETRY_BACKOFF
+    max_delay: float = RETRY_MAX_DELAY
+    statuses: frozenset = RETRY_STATUSES
+    methods: frozenset = IDEMPOTENT_METHODS
+
+    def delay(self, attempt: int) -> float:
+        """Full jitter: uniform in [0, backoff * 2**(attempt-1)], capped."""
+        return random.uniform(0, min(self.max_delay, self.backoff * 2 ** (attempt - 1)))
+
+
+NO_RETRY = RetryPolicy(attempts=1)
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised without touching the network while a host's circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Per-host breaker. closed -> (threshold consecutive failures) -> open:
+    calls fail fast with CircuitOpenError -> after cooldown one trial call is
+    let through (half-open) -> success closes it, failure opens it again.
+    """
+
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, cooldown: float = BREAKER_COOLDOWN):
+        self.threshold, self.cooldown = threshold, cooldown
+        self._lock = threading.Lock()
+        self._failures: Dict[str, int] = {}
+        self._opened_at: Dict[str, float] = {}
+        self._trial: Dict[str, bool] = {}         # host -> a half-open trial is in flight
+        self.counters = {"opened": 0, "short_circuited": 0, "trials": 0, "closed": 0}
+
+    def state(self, host: str) -> str:
+        with self._lock:
+            if host not in self._opened_at:
+                return "closed"
+            if self._trial.get(host) or time.monotonic() - self._opened_at[host] >= self.cooldown:
+                return "half-open"
+            return "open"
+
+    def before(self, host: str) -> None:
+        if not self.threshold:
+            return
+        with self._lock:
+            opened = self._opened_at.get(host)
+            if opened is None:
+                return
+            if time.monotonic() - opened >= self.cooldown and not self._trial.get(host):
+                self._trial[host] = True
+                self.counters["trials"] += 1
+                return
+            self.counters["short_circuited"] += 1
+        raise CircuitOpenError(f"circuit open for {host} (retry after {self.cooldown:.0f}s cool-down)")
+
+    def success(self, host: str) -> None:
+        with self._lock:
+            self._failures.pop(host, None)
+            if self._opened_at.pop(host, None) is not None:
+                self.counters["closed"] += 1
+            self._trial.pop(host, None)
+
+    def failure(self, host: str) -> None:
+        if not self.threshold:
+            return
+        with self._lock:
+            n = self._failures[host] = self._failures.get(host, 0) + 1
+            if self._trial.pop(host, None) or (n >= self.threshold and host not in self._opened_at):
+                self._opened_at[host] = time.monotonic()      # (re)open, restart the cool-down
+                self.counters["opened"] += 1
+
+    def release(self, host: str) -> None:
+        """The call ended without telling us anything about the host (e.g. a bad URL)."""
+        with self._lock:
+            self._trial.pop(host, None)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._failures.clear()
+            self._opened_at.clear()
+            self._trial.clear()
+
+
+breaker = CircuitBreaker()
+DEFAULT_RETRY = RetryPolicy()
+_retry_counters = {"retries": 0, "gave_up": 0}
+
+
+def retry_stats() -> Dict[str, int]:
+    return {**_retry_counters, **breaker.counters}
+
+
+def _retry_after(resp: requests.Response) -> Optional[float]:
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _send(method: str, url: str, session: requests.Session, policy: RetryPolicy,
+          kwargs: Dict[str, Any]) -> requests.Response:
+    """One logical request: breaker check, send, retry idempotent failures."""
+    host = urlsplit(url).netloc
+    attempts = policy.attempts if method.upper() in policy.methods else 1
+    for attempt in range(1, attempts + 1):
+        breaker.before(host)
+        try:
+            resp = session.request(method=method, url=url, **kwargs)
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+            breaker.failure(host)
+            if attempt == attempts:
+                _retry_counters["gave_up"] += attempt > 1
+                raise
+            wait = policy.delay(attempt)
+            _log(f"[RETRY] {type(e).__name__} on attempt {attempt}/{attempts}, waiting {wait:.2f}s")
+        except BaseException:
+            breaker.release(host)
+            raise
+        else:
+            if resp.status_code >= 500:
+                breaker.failure(host)
+            else:
+                breaker.success(host)
+            if resp.status_code not in policy.statuses or attempt == attempts:
+                _retry_counters["gave_up"] += attempt > 1 and resp.status_code in policy.statuses
+                return resp
+            wait = _retry_after(resp)
+            if wait is None:
+                wait = policy.delay(attempt)
+            elif wait > policy.max_delay:
+                return resp                        # server asks for longer than we are willing to wait
+            _log(f"[RETRY] status {resp.status_code} on attempt {attempt}/{attempts}, waiting {wait:.2f}s")
+            _read_error_prefix(resp)
+        _retry_counters["retries"] += 1
+        time.sleep(wait)
+    raise AssertionError("unreachable")
+
+
+# ---------------------------------------------------------------------------
+# Response cache for GET
+# ---------------------------------------------------------------------------
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    try:
+        return parsedate_to_datetime(value).timestamp() if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _cache_control(headers) -> Dict[str, Optional[str]]:
+    out: Dict[str, Optional[str]] = {}
+    for part in headers.get("Cache-Control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            out[name.lower()] = value.strip('"') or None
+    return out
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    expires: float                 # time.time() until which no revalidation is needed
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    vary: Dict[str, Optional[str]] = field(default_factory=dict)   # request header -> value it was stored for
+    size: int = field(init=False)
+
+    def __post_init__(self):
+        self.size = self.measure()
+
+    def measure(self) -> int:
+        return len(self.body) + sum(len(k) + len(v) for k, v in self.headers.items())
+
+    def fresh(self) -> bool:
+        return time.time() < self.expires
+
+    def matches(self, req_headers) -> bool:
+        """Was this response stored for a request with the same values of its Vary headers?"""
+        return all(req_headers.get(name) == value for name, value in self.vary.items())
+
+    def response(self) -> requests.Response:
+        resp = requests.Response()
+        resp.status_code, resp.reason, resp.url = self.status, "OK", self.url
+        resp.headers = CaseInsensitiveDict(self.headers)
+        resp._content = self.body
+        resp.encoding = requests.utils.get_encoding_from_headers(resp.headers)
+        resp._content_consumed = True     # iter_content() serves the stored body
+        resp.from_cache = True
+        return resp
+
 
-def safe_request(method: str, url: str, **kwargs) -> requests.Response:
+class ResponseCache:
+    """
+    GET cache keyed by the full URL (with query). Each entry remembers the
+    request's values of the headers named in Vary; a request that differs in
+    any of them is a miss. Responses with no-store, Vary: * or a status other
+    than 200 are not kept, nor are answers to requests carrying Authorization
+    unless the response is marked public. no-cache, or no freshness info but
+    a validator, means "revalidate every time".
+    """
+
+    def __init__(self, max_bytes: int = CACHE_MAX_BYTES, directory: Optional[str] = CACHE_DIR):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "revalidations": 0, "not_modified": 0,
+                         "stores": 0, "evictions": 0, "invalidations": 0, "disk_hits": 0}
+
+    # ---- disk store
+    @staticmethod
+    def _digest(text: str) -> str:
+        return hashlib.sha256(text.encode()).hexdigest()[:32]
+
+    def _path(self, key: str) -> str:
+        # <resource hash>-<key hash>: every query variant of a resource shares the prefix
+        return os.path.join(self.directory, f"{self._digest(_resource(key))}-{self._digest(key)}")
+
+    def _load(self, key: str) -> Optional[CacheEntry]:
+        try:
+            with open(self._path(key) + ".json", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(self._path(key) + ".body", "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        return CacheEntry(meta["url"], meta["status"], meta["headers"], body, meta["expires"],
+                          meta.get("etag"), meta.get("last_modified"), meta.get("vary", {}))
+
+    def _save(self, key: str, e: CacheEntry) -> None:
+        base = self._path(key)
+        try:
+            with open(base + ".body", "wb") as f:
+                f.write(e.body)
+            with open(base + ".json", "w", encoding="utf-8") as f:
+                json.dump({"url": e.url, "status": e.status, "headers": e.headers, "expires": e.expires,
+                           "etag": e.etag, "last_modified": e.last_modified, "vary": e.vary}, f)
+        except OSError:
+            pass
+
+    # ---- memory LRU
+    def _put(self, key: str, e: CacheEntry) -> None:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.size
+        if e.size > self.max_bytes:
+            return
+        self._entries[key] = e
+        self._bytes += e.size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self.counters["evictions"] += 1
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            e = self._entries.get(key)
+            if e is not None:
+                self._entries.move_to_end(key)
+                return e
+        if self.directory:
+            e = self._load(key)
+            if e is not None:
+                self.counters["disk_hits"] += 1
+                with self._lock:
+                    self._put(key, e)
+        return e
+
+    def store(self, key: str, resp: requests.Response, req_headers) -> Optional[CacheEntry]:
+        """Keep `resp` if it is cacheable; `req_headers` are the headers of the request it answers."""
+        cc = _cache_control(resp.headers)
+        vary = [name.strip().lower() for name in resp.headers.get("Vary", "").split(",") if name.strip()]
+        if resp.status_code != 200 or "no-store" in cc or "*" in vary:
+            return None
+        sent = resp.request.headers if resp.request is not None else {}
+        if ("Authorization" in req_headers or "Authorization" in sent) and "public" not in cc:
+            return None                                  # someone's own data: never hand it to another caller
+        etag, last_mod = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+        expires = self._expiry(resp.headers, cc)
+        if expires <= time.time() and not (etag or last_mod):
+            return None                                  # nothing to reuse or revalidate with
+        e = CacheEntry(resp.url, resp.status_code, dict(resp.headers), resp.content, expires, etag, last_mod,
+                       {name: req_headers.get(name) for name in vary})
+        with self._lock:
+            self._put(key, e)
+            self.counters["stores"] += 1
+        if self.directory:
+            self._save(key, e)
+        return e
+
+    @staticmethod
+    def _expiry(headers, cc: Dict[str, Optional[str]]) -> float:
+        now = time.time()
+        if "no-cache" in cc:
+            return now
+        if cc.get("max-age") is not None:
+            try:
+                age = float(headers.get("Age", 0) or 0)
+                return now + max(float(cc["max-age"]) - age, 0.0)
+            except ValueError:
+                return now
+        expires = _http_date(headers.get("Expires"))
+        if expires is not None:
+            date = _http_date(headers.get("Date")) or now
+            return now + max(expires - date, 0.0)        # relative to the server's clock
+        return now
+
+    def refresh(self, key: str, e: CacheEntry, resp: requests.Response) -> None:
+        """304 Not Modified: keep the body, take the new freshness / validators."""
+        with self._lock:
+            if self._entries.get(key) is e:
+                self._bytes -= self._entries.pop(key).size
+            e.headers.update({k: v for k, v in resp.headers.items() if k.lower() not in ("content-length",)})
+            e.expires = self._expiry(resp.headers, _cache_control(resp.headers))
+            e.etag = resp.headers.get("ETag", e.etag)
+            e.last_modified = resp.headers.get("Last-Modified", e.last_modified)
+            e.size = e.measure()
+            self._put(key, e)
+        if self.directory:
+            self._save(key, e)
+
+    def invalidate(self, url: str) -> None:
+        """
+        Forget every entry for `url`'s resource (any query string), in memory
+        and on disk. `url` must be normalised like the keys (see _cache_request).
+        """
+        base = _resource(url)
+        with self._lock:
+            keys = [k for k in self._entries if _resource(k) == base]
+            for k in keys:
+                self._bytes -= self._entries.pop(k).size
+            self.counters["invalidations"] += 1
+        if self.directory:
+            prefix = self._digest(base) + "-"
+            try:
+                names = [n for n in os.listdir(self.directory) if n.startswith(prefix)]
+            except OSError:
+                names = []
+            for name in names:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.counters, "entries": len(self._entries), "bytes": self._bytes}
+
+
+_cache: Optional[ResponseCache] = None
+
+
+def enable_cache(max_bytes: int = CACHE_MAX_BYTES, directory: Optional[str] = CACHE_DIR) -> ResponseCache:
+    """Turn on the GET cache for safe_request (safe_request(..., cache=False) skips it per call)."""
+    global _cache
+    _cache = ResponseCache(max_bytes, directory)
+    return _cache
+
+
+def disable_cache() -> None:
+    global _cache
+    _cache = None
+
+
+def cache_stats() -> Dict[str, int]:
+    return _cache.stats() if _cache is not None else {}
+
+
+def _resource(url: str) -> str:
+    """A cache key without its query string / fragment."""
+    return url.split("#", 1)[0].split("?", 1)[0]
+
+
+def _cache_request(url: str, session: requests.Session, kwargs: Dict[str, Any]) -> requests.PreparedRequest:
+    """The GET as the session would send it: final URL (the cache key) plus merged headers, auth and cookies."""
+    return session.prepare_request(requests.Request("GET", url, headers=kwargs.get("headers"),
+                                                    params=kwargs.get("params"), auth=kwargs.get("auth"),
+                                                    cookies=kwargs.get("cookies")))
+
+
+def _cached_get(url: str, session: requests.Session, policy: RetryPolicy,
+                kwargs: Dict[str, Any]) -> requests.Response:
+    prep = _cache_request(url, session, kwargs)
+    cache, key, req_headers = _cache, prep.url, prep.headers
+    headers = kwargs.get("headers") or {}
+    no_cache = "no-cache" in str(req_headers.get("Cache-Control", "")).lower()
+    e = None if no_cache else cache.get(key)
+    if e is not None and not e.matches(req_headers):
+        e = None                                         # stored for another variant (Vary)
+    if e is not None and e.fresh():
+        cache.counters["hits"] += 1
+        _log("[CACHE] hit")
+        return e.response()
+    if e is not None and (e.etag or e.last_modified):
+        cond = dict(headers)
+        if e.etag:
+            cond["If-None-Match"] = e.etag
+        if e.last_modified:
+            cond["If-Modified-Since"] = e.last_modified
+        cache.counters["revalidations"] += 1
+        resp = _send("GET", url, session, policy, {**kwargs, "headers": cond})
+        if resp.status_code == 304:
+            _read_error_prefix(resp)                     # sent with stream=True: finish it so the connection is reused
+            cache.counters["not_modified"] += 1
+            cache.refresh(key, e, resp)
+            _log("[CACHE] revalidated (304)")
+            return e.response()
+    else:
+        cache.counters["misses"] += 1
+        resp = _send("GET", url, session, policy, kwargs)
+    cache.store(key, resp, req_headers)
+    return resp
+
+
+# ---------------------------------------------------------------------------
+# Streaming bodies
+# ---------------------------------------------------------------------------
+
+def _read_error_prefix(resp: requests.Response, limit: int = ERROR_BODY_PREFIX) -> None:
+    """
+    Keep only the first `limit` bytes of an unread body as resp.content and
+    close the response. A short body is read to the end, so its connection
+    goes back to the pool; a long one is not downloaded at all.
+    """
+    if resp._content is False:
+        try:
+            resp._content = resp.raw.read(limit, decode_content=True) or b""
+        except Exception:                        # body is only used for the error message
+            resp._content = b""
+    resp.close()
+    resp._content_consumed = True
+
+
+def stream_chunks(method: str, url: str, chunk_size: int = STREAM_CHUNK, **kwargs) -> Iterator[bytes]:
+    """The response body in chunks of up to `chunk_size` bytes (never held whole in memory)."""
+    with safe_request(method, url, stream=True, **kwargs) as resp:
+        yield from resp.iter_content(chunk_size)
+
+
+_WS = re.compile(r"[ \t\n\r]*")
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*\Z")     # what may still follow a number cut off by a chunk end
+
+
+def iter_json_array(chunks: Iterable[bytes], encoding: str = "utf-8") -> Iterator[Any]:
+    """
+    Yield the items of a top-level JSON array as the bytes arrive.
+    Only the current item and the last chunk are kept in memory.
+    Raises json.JSONDecodeError on malformed or truncated input.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder(encoding)()
+    source = iter(chunks)
+    buf, pos, eof = "", 0, False
+    state = "start"                               # start → first → item / comma → … → done
+    need = 0                                      # don't re-parse a partial item until this much is buffered
+
+    while True:
+        pos = _WS.match(buf, pos).end()
+        if pos < len(buf):
+            ch = buf[pos]
+            if state == "start":
+                if ch != "[":
+                    raise json.JSONDecodeError("expected a JSON array", buf, pos)
+                pos, state = pos + 1, "first"
+                continue
+            if ch == "]" and state in ("first", "comma"):
+                return
+            if state == "comma":
+                if ch != ",":
+                    raise json.JSONDecodeError("expected ',' or ']'", buf, pos)
+                pos, state = pos + 1, "item"
+                continue
+            if len(buf) - pos >= need or eof:
+                try:
+                    item, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    need = 2 * (len(buf) - pos)   # big item: wait for it to double, not for every chunk
+                else:
+                    # "3" from "3." or "2" from "2e" may still grow: only yield a number once
+                    # something that cannot continue it has arrived
+                    cut = (not eof and isinstance(item, (int, float)) and not isinstance(item, bool)
+                           and _NUMBER_TAIL.match(buf, end))
+                    if not cut:
+                        yield item
+                        pos, state, need = end, "comma", 0
+                        continue
+        if eof:
+            raise json.JSONDecodeError("truncated JSON array", buf, pos)
+        parts, have = [buf[pos:]], len(buf) - pos
+        while True:                               # read until a re-parse is worth it (or the end)
+            chunk = next(source, None)
+            eof = chunk is None
+            parts.append(text.decode(chunk or b"", final=eof))
+            have += len(parts[-1])
+            if eof or (parts[-1] and have >= need):
+                break
+        buf, pos = "".join(parts), 0
+
+
+def stream_json_array(url: str, method: str = "GET", chunk_size: int = STREAM_CHUNK,
+                      **kwargs) -> Iterator[Any]:
+    """Items of the JSON array at `url`, one at a time (e.g. every post of /posts)."""
+    return iter_json_array(stream_chunks(method, url, chunk_size, **kwargs))
+
+
+def safe_request(method: str, url: str, session: Optional[requests.Session] = None,
+                 retry: Optional[RetryPolicy] = None, cache: bool = True,
+                 **kwargs) -> requests.Response:
     """
     Wrapper around requests to add timeout, basic error handling,
     and consistent printing. Raises for non-2xx responses.
+    Uses the shared pooled session unless you pass your own `session`.
+    Idempotent methods are retried per `retry` (default RetryPolicy(); NO_RETRY
+    turns it off); an open circuit raises CircuitOpenError (a ConnectionError).
+    With enable_cache() on, GETs may be answered from the cache (cache=False
+    skips it) and PUT/PATCH/DELETE drop the cached copy of their URL.
+    stream=True returns before the body is read (use iter_content or
+    stream_chunks); error bodies are cut to ERROR_BODY_PREFIX bytes.
     """
+    global _calls
     # Ensure we always have a timeout unless the caller overrides it
     kwargs.setdefault("timeout", TIMEOUT)
+    # The body is always fetched lazily so an error body is never downloaded whole
+    stream = kwargs.pop("stream", False)
+    kwargs["stream"] = True
     
     # For development/testing, you can disable SSL verification if needed
     # kwargs.setdefault("verify", False)  # Uncomment if you have SSL issues
     
     try:
-        print(f"Making {method} request to: {url}")
-        resp = requests.request(method=method, url=url, **kwargs)
+        _log(f"Making {method} request to: {url}")
+        _calls += 1
+        sess, policy, verb = session or get_session(), retry or DEFAULT_RETRY, method.upper()
+        if _cache is not None and cache and verb == "GET" and not stream:
+            resp = _cached_get(url, sess, policy, kwargs)
+        else:
+            resp = _send(method, url, sess, policy, kwargs)
+            if _cache is not None and verb in ("PUT", "PATCH", "DELETE") and resp.ok:
+                _cache.invalidate(_cache_request(url, sess, kwargs).url)
+        if not resp.ok:
+            _read_error_prefix(resp)
+        elif not stream:
+            resp.content                        # buffer the body, as requests does by default
         
         # Print response info
-        print(f"Response status: {resp.status_code}")
+        _log(f"Response status: {resp.status_code}")
         if resp.headers.get('Content-Type'):
-            print(f"Content-Type: {resp.headers.get('Content-Type')}")
+            _log(f"Content-Type: {resp.headers.get('Content-Type')}")
         
         # Raise HTTPError for 4xx/5xx so we handle errors consistently
         resp.raise_for_status()
         return resp
         
     except requests.exceptions.HTTPError as e:
-        print(f"[HTTP ERROR] {e} | Status: {getattr(e.response, 'status_code', '?')}")
-        if hasattr(e.response, 'text'):
-            print(f"Error response: {e.response.text[:200]}...")
+        _log(f"[HTTP ERROR] {e} | Status: {getattr(e.response, 'status_code', '?')}")
+        if e.response is not None:
+            _log(f"Error response: {e.response.content[:200].decode('utf-8', 'replace')}...")
         raise
     except requests.exceptions.Timeout:
-        print("[ERROR] Request timed out.")
+        _log("[ERROR] Request timed out.")
         raise
     except requests.exceptions.ConnectionError as e:
-        print(f"[ERROR] Connection problem: {e}")
+        _log(f"[ERROR] Connection problem: {e}")
         raise
     except requests.exceptions.RequestException as e:
-        print(f"[ERROR] General request error: {e}")
+        _log(f"[ERROR] General request error: {e}")
         raise
 
 
+# ---------------------------------------------------------------------------
+# Async engine: asyncio front end over the pooled session
+# ---------------------------------------------------------------------------
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[asyncio.Semaphore, Dict[str, asyncio.Semaphore]]]" = \
+    weakref.WeakKeyDictionary()                 # semaphores belong to one event loop
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(MAX_CONCURRENCY, thread_name_prefix="safe_request")
+    return _executor
+
+
+def configure_async(max_concurrency: Optional[int] = None, per_host_limit: Optional[int] = None) -> None:
+    """Change the async limits (applies to event loops started afterwards)."""
+    global MAX_CONCURRENCY, PER_HOST_LIMIT, _executor
+    if max_concurrency is not None:
+        MAX_CONCURRENCY = max_concurrency
+    if per_host_limit is not None:
+        PER_HOST_LIMIT = per_host_limit
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        _executor = None
+    _limits.clear()
+    if POOL_MAXSIZE < PER_HOST_LIMIT:
+        configure_pool(pool_maxsize=PER_HOST_LIMIT)   # otherwise extra connections are thrown away
+
+
+def _semaphores(host: str) -> Tuple[asyncio.Semaphore, asyncio.Semaphore]:
+    loop = asyncio.get_running_loop()
+    overall, hosts = _limits.get(loop, (None, None))
+    if overall is None:
+        overall, hosts = asyncio.Semaphore(MAX_CONCURRENCY), {}
+        _limits[loop] = (overall, hosts)
+    per_host = hosts.get(host)
+    if per_host is None:
+        per_host = hosts[host] = asyncio.Semaphore(PER_HOST_LIMIT)
+    return overall, per_host
+
+
+async def async_safe_request(method: str, url: str, **kwargs) -> requests.Response:
+    """
+    Awaitable safe_request: same timeout, printing and exceptions (HTTPError,
+    Timeout, ConnectionError, RequestException), limited to MAX_CONCURRENCY
+    in flight overall and PER_HOST_LIMIT per host.
+    """
+    overall, per_host = _semaphores(urlsplit(url).netloc)
+    async with per_host, overall:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(),
+                                          functools.partial(safe_request, method, url, **kwargs))
+
+
+RequestSpec = Union[str, Tuple[str, str], Tuple[str, str, Dict[str, Any]]]
+
+
+async def gather_requests(specs: Iterable[RequestSpec],
+                          return_exceptions: bool = True) -> List[Union[requests.Response, BaseException]]:
+    """
+    Run many requests concurrently; results come back in input order.
+    Each spec is a URL (GET), (method, url) or (method, url, kwargs).
+    With return_exceptions=True a failed request gives its exception in
+    its slot instead of cancelling the rest.
+    """
+    calls = []
+    for spec in specs:
+        if isinstance(spec, str):
+            method, url, kw = "GET", spec, {}
+        elif len(spec) == 2:
+            (method, url), kw = spec, {}
+        else:
+            method, url, kw = spec
+        calls.append(async_safe_request(method, url, **kw))
+    return await asyncio.gather(*calls, return_exceptions=return_exceptions)
+
+
+def fetch_all(urls: Sequence[str], method: str = "GET",
+              **kwargs) -> List[Union[requests.Response, BaseException]]:
+    """Blocking helper: fetch every URL concurrently and return responses/exceptions in order."""
+    return asyncio.run(gather_requests([(method, u, kwargs) for u in urls]))
+
+
 def demo_basic_get():
     print("\n=== 1) BASIC GET ===")
     url = f"{BASE_URL}/posts/1"
@@ -167,14 +971,27 @@ def demo_with_session():
             "Accept": "application/json"
         })
         # First request
-        r1 = safe_request("GET", f"{BASE_URL}/posts/2")
+        r1 = safe_request("GET", f"{BASE_URL}/posts/2", session=sess)
         print("First request title:", r1.json().get("title"))
 
-        # Second request reuses the same session
-        r2 = safe_request("GET", f"{BASE_URL}/posts/3")
+        # Second request reuses the same session (and its connection)
+        r2 = safe_request("GET", f"{BASE_URL}/posts/3", session=sess)
         print("Second request title:", r2.json().get("title"))
 
 
+def demo_streaming():
+    print("\n=== 9) STREAMING A LARGE JSON ARRAY ===")
+    count, longest = 0, ""
+    for photo in stream_json_array(f"{BASE_URL}/photos"):   # 5000 items, parsed one at a time
+        count += 1
+        if len(photo.get("title", "")) > len(longest):
+            longest = photo["title"]
+    print("Photos streamed:", count)
+    print("Longest title:", longest)
+    size = sum(len(chunk) for chunk in stream_chunks("GET", f"{BASE_URL}/comments"))
+    print(f"/comments read in chunks: {size:,} bytes")
+
+
 def demo_error_handling():
     print("\n=== 8) ERROR HANDLING DEMO ===")
     
@@ -208,9 +1025,11 @@ if __name__ == "__main__":
         demo_patch_update()
         demo_delete()
         demo_with_session()
+        demo_streaming()
         demo_error_handling()
 
         print("\n🎉 All demos finished successfully!")
+        print("Connection pool:", pool_stats())
         
     except Exception as e:
         print(f"\n💥 Demo stopped due to error: {e}")
@@ -1,20 +1,481 @@
-import socket
+"""
+server.py — Multi‑client asyncio echo server
+------------------------------------------------------------------------------
+* Accepts connections in a loop on HOST:PORT; one event loop serves thousands
+  of concurrent clients with non‑blocking I/O.
+* Speaks the length‑prefixed frames from framing.py: DATA frames are echoed,
+  PING gets PONG, CLOSE ends the connection.  Frames are parsed in place in a
+  per‑connection receive buffer (BufferedProtocol, no recv copies); pipelined
+  replies are written with one send.  `--raw` keeps the old byte echo.
+* Bounded memory per connection: when a client stops reading, its pending
+  echo output reaches MAX_BUFFER and we stop reading from it (backpressure)
+  until the kernel drains the backlog. Frames may carry at most MAX_FRAME
+  bytes; payloads bigger than the receive buffer grow their own buffer only
+  as data arrives, and all of those together stay under BIG_FRAME_BUDGET
+  (a connection that would exceed it gets an ERROR frame and is closed).
+* Connection limit (MAX_CONNECTIONS): extra clients are accepted and closed
+  straight away, so they fail fast instead of hanging in the backlog.
+* Idle connections are closed after IDLE_TIMEOUT seconds.
+* Graceful shutdown on SIGINT / SIGTERM: stop accepting, close every
+  connection (pending replies are still flushed), and abort the ones that
+  have not drained after SHUTDOWN_GRACE seconds.
+* Live counters (open / accepted / rejected / bytes in & out) via
+  `EchoServer.stats()` or `--stats-every N` on the command line.
+* `--workers N`: pre‑fork mode for multiple cores. A Supervisor starts N
+  worker processes that each bind HOST:PORT with SO_REUSEPORT (the kernel
+  spreads connections), or share one inherited listening socket where
+  SO_REUSEPORT is missing / `--no-reuseport`. Crashed workers are restarted
+  (with back‑off) and per‑worker counters are summed.
+
+Example usage:
+    python server.py                      # 127.0.0.1:4444
+    python server.py --port 5555 --max-connections 20000 --stats-every 5
+    python server.py --raw -v             # byte echo, e.g. for telnet / nc
+    python server.py --workers 4 --stats-every 5
+
+Auther : SpectralZero
+"""
+from __future__ import annotations
+
+import argparse, asyncio, multiprocessing, os, queue, signal, socket, time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Deque, Dict, List, Optional, Set
+
+from framing import (FrameBudget, FrameBuffer, FrameError, HEADER, MSG_CLOSE, MSG_DATA, MSG_ERROR, MSG_PING,
+                     MSG_PONG, RECV_BUFFER, encode, header)
 
 # Server configuration
 HOST = '127.0.0.1'  # Localhost
 PORT = 4444        # Port to listen on
+MAX_CONNECTIONS = 10_000      # open connections before new ones are refused
+MAX_BUFFER      = 256 * 1024  # per‑connection unsent echo bytes before reading pauses
+MAX_FRAME       = 8 * 2**20   # largest payload a client may send (framing allows up to 64 MiB)
+BIG_FRAME_BUDGET = 256 * 2**20    # bytes all connections may hold in partly received large frames
+IDLE_TIMEOUT    = 300.0       # seconds without traffic before a connection is closed
+SHUTDOWN_GRACE  = 5.0         # seconds open connections get to finish on shutdown
+BACKLOG         = 4096        # listen() backlog — bursts of connects queue here
+ZERO_COPY_MIN   = 64 * 1024   # payloads at least this big in their own buffer are written without copying
+WORKER_STATS_EVERY = 1.0      # seconds between worker → supervisor counter reports
+RESTART_BACKOFF    = (0.1, 5.0)   # first / max delay before restarting a crashing worker slot
+
+# ─────────────────────────── counters ─────────────────────────────────
+
+@dataclass(slots=True)
+class ServerStats:
+    open: int = 0
+    peak_open: int = 0
+    accepted: int = 0
+    rejected: int = 0
+    closed: int = 0
+    idle_closed: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    paused: int = 0            # times a slow reader made us stop reading
+    frames_in: int = 0
+    frames_out: int = 0
+    bad_frames: int = 0        # connections dropped for malformed / oversized frames
+
+# ─────────────────────────── connection ───────────────────────────────
+
+class EchoProtocol(asyncio.Protocol):
+    """One client connection; writes what it reads, pausing reads while the client lags."""
+
+    __slots__ = ("server", "transport", "peer", "last_seen")
+
+    def __init__(self, server: "EchoServer"):
+        self.server = server
+        self.transport: Optional[asyncio.Transport] = None
+        self.peer = None
+        self.last_seen = 0.0
+
+    def connection_made(self, transport: asyncio.Transport) -> None:
+        srv, st = self.server, self.server.counters
+        self.transport, self.peer = transport, transport.get_extra_info("peername")
+        if srv.closing or st.open >= srv.max_connections:
+            st.rejected += 1
+            transport.abort()
+            return
+        transport.set_write_buffer_limits(high=srv.max_buffer)
+        st.accepted += 1
+        st.open += 1
+        st.peak_open = max(st.peak_open, st.open)
+        self.last_seen = time.monotonic()
+        srv.connections.add(self)
+        if srv.verbose:
+            print(f"Connected by {self.peer}")
+
+    def data_received(self, data: bytes) -> None:
+        st = self.server.counters
+        st.bytes_in += len(data)
+        self.last_seen = time.monotonic()
+        if self.server.verbose:
+            print(f"Received: {data.decode(errors='replace')}")
+        self.transport.write(data)              # Echo the data back
+        st.bytes_out += len(data)
+
+    def pause_writing(self) -> None:            # client's echo backlog hit MAX_BUFFER
+        self.server.counters.paused += 1
+        self.transport.pause_reading()
+
+    def resume_writing(self) -> None:
+        self.transport.resume_reading()
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        srv = self.server
+        if self in srv.connections:
+            srv.connections.discard(self)
+            srv.counters.open -= 1
+            srv.counters.closed += 1
+            if not srv.connections:
+                srv._drained.set()
 
-with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server_socket:
-    server_socket.bind((HOST, PORT))
-    server_socket.listen()
-    print(f"Server listening on {HOST}:{PORT}")
-    
-    conn, addr = server_socket.accept()
-    with conn:
-        print(f"Connected by {addr}")
+
+class FramedEchoProtocol(EchoProtocol, asyncio.BufferedProtocol):
+    """Framed connection: the transport reads straight into `rx` and frames are handled in place."""
+
+    __slots__ = ("rx",)
+
+    def __init__(self, server: "EchoServer"):
+        super().__init__(server)
+        self.rx = FrameBuffer(server.recv_buffer, server.max_frame, server.big_frames)
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return self.rx.get_buffer(sizehint)
+
+    def buffer_updated(self, nbytes: int) -> None:
+        srv, st = self.server, self.server.counters
+        st.bytes_in += nbytes
+        self.last_seen = time.monotonic()
+        self.rx.filled(nbytes)
+        out: List[bytes] = []
+        write, rx_buf = self.transport.write, self.rx.buf
+        try:
+            for kind, payload in self.rx.frames():
+                st.frames_in += 1
+                if kind == MSG_DATA or kind == MSG_PING:
+                    if srv.verbose:
+                        print(f"Received: {bytes(payload).decode(errors='replace')}")
+                    reply = MSG_DATA if kind == MSG_DATA else MSG_PONG
+                    n = len(payload)
+                    if n >= ZERO_COPY_MIN and payload.obj is not rx_buf:
+                        # dedicated big-frame buffer, never reused: the transport may keep the view.
+                        # Views into the receive ring must be copied (joined) before the next read.
+                        out.append(header(reply, n))
+                        write(b"".join(out))
+                        write(payload)
+                        out.clear()
+                    else:
+                        out.append(header(reply, n))
+                        out.append(payload)
+                    st.frames_out += 1
+                    st.bytes_out += HEADER.size + n
+                elif kind == MSG_CLOSE:
+                    if out:
+                        write(b"".join(out))
+                    self.transport.close()
+                    return
+                else:
+                    raise FrameError(f"unexpected message type {kind}")
+        except FrameError as e:
+            st.bad_frames += 1
+            out.append(encode(MSG_ERROR, str(e).encode()))
+            write(b"".join(out))
+            self.transport.close()
+            return
+        if out:
+            write(b"".join(out))               # every pipelined reply in one send
+
+    def eof_received(self) -> None:
+        return None                            # close our side too
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self.rx.release()                      # hand a half-received large frame's memory back
+        super().connection_lost(exc)
+
+# ─────────────────────────── server ───────────────────────────────────
+
+class EchoServer:
+    def __init__(self, host: str = HOST, port: int = PORT, max_connections: int = MAX_CONNECTIONS,
+                 max_buffer: int = MAX_BUFFER, idle_timeout: float = IDLE_TIMEOUT, verbose: bool = False,
+                 raw: bool = False, recv_buffer: int = RECV_BUFFER, max_frame: int = MAX_FRAME,
+                 big_frame_budget: int = BIG_FRAME_BUDGET,
+                 sock: Optional[socket.socket] = None, reuse_port: bool = False):
+        self.host, self.port = host, port
+        self.sock, self.reuse_port = sock, reuse_port
+        self.protocol = EchoProtocol if raw else FramedEchoProtocol
+        self.recv_buffer, self.max_frame = recv_buffer, max_frame
+        self.big_frames = FrameBudget(big_frame_budget)
+        self.max_connections, self.max_buffer = max_connections, max_buffer
+        self.idle_timeout, self.verbose = idle_timeout, verbose
+        self.counters = ServerStats()
+        self.connections: Set[EchoProtocol] = set()
+        self.closing = False
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._drained = asyncio.Event()
+        self._stopped = asyncio.Event()
+        self._reaper: Optional[asyncio.Task] = None
+
+    async def start(self) -> "EchoServer":
+        loop = asyncio.get_running_loop()
+        if self.sock is not None:                                # inherited listening socket
+            self._server = await loop.create_server(lambda: self.protocol(self), sock=self.sock, backlog=BACKLOG)
+        else:
+            self._server = await loop.create_server(lambda: self.protocol(self), self.host, self.port,
+                                                    backlog=BACKLOG, reuse_address=True,
+                                                    reuse_port=self.reuse_port or None)
+        self.port = self._server.sockets[0].getsockname()[1]      # resolves port 0
+        if self.idle_timeout:
+            self._reaper = asyncio.create_task(self._reap_idle())
+        return self
+
+    async def _reap_idle(self) -> None:
         while True:
-            data = conn.recv(1024)
-            if not data:
-                break
-            print(f"Received: {data.decode()}")
-            conn.sendall(data)  # Echo the data back
+            await asyncio.sleep(max(self.idle_timeout / 4, 0.05))
+            cutoff = time.monotonic() - self.idle_timeout
+            for conn in [c for c in self.connections
+                         if c.last_seen < cutoff and not c.transport.is_closing()]:   # closed ones may still be draining
+                self.counters.idle_closed += 1
+                conn.transport.close()
+
+    def stats(self) -> Dict[str, int]:
+        return asdict(self.counters)
+
+    async def serve_forever(self) -> None:
+        await self._stopped.wait()
+
+    async def shutdown(self, grace: float = SHUTDOWN_GRACE) -> None:
+        """Stop accepting, close every connection, and abort those not flushed within `grace` s."""
+        if self.closing:
+            return await self._stopped.wait()
+        self.closing = True
+        self._server.close()
+        if self._reaper:
+            self._reaper.cancel()
+        for conn in list(self.connections):
+            conn.transport.close()              # stops reading; buffered replies are sent before the socket closes
+        if self.connections:
+            self._drained.clear()
+            try:
+                await asyncio.wait_for(self._drained.wait(), grace)
+            except asyncio.TimeoutError:
+                for conn in list(self.connections):
+                    conn.transport.abort()
+        await self._server.wait_closed()
+        self._stopped.set()
+
+# ─────────────────────────── pre‑fork workers ─────────────────────────
+
+def _worker_main(slot: int, host: str, port: int, sock: Optional[socket.socket], opts: Dict[str, Any],
+                 grace: float, stats_q) -> None:
+    signal.signal(signal.SIGINT, signal.SIG_IGN)           # Ctrl+C is the supervisor's job
+    asyncio.run(_worker(slot, host, port, sock, opts, grace, stats_q))
+
+
+async def _worker(slot: int, host: str, port: int, sock: Optional[socket.socket], opts: Dict[str, Any],
+                  grace: float, stats_q) -> None:
+    server = await EchoServer(host, port, sock=sock, reuse_port=sock is None, **opts).start()
+    try:
+        asyncio.get_running_loop().add_signal_handler(
+            signal.SIGTERM, lambda: asyncio.ensure_future(server.shutdown(grace)))
+    except NotImplementedError:
+        pass
+
+    async def report() -> None:
+        while True:
+            stats_q.put((slot, os.getpid(), server.stats()))
+            await asyncio.sleep(WORKER_STATS_EVERY)
+
+    reporter = asyncio.create_task(report())
+    await server.serve_forever()
+    reporter.cancel()
+    stats_q.put((slot, os.getpid(), server.stats()))
+
+
+class Supervisor:
+    """Runs `workers` EchoServer processes on one address; restarts them and sums their counters."""
+
+    def __init__(self, workers: int, host: str = HOST, port: int = PORT, reuse_port: Optional[bool] = None,
+                 grace: float = SHUTDOWN_GRACE, **opts):
+        self.workers, self.host, self.port, self.grace, self.opts = workers, host, port, grace, opts
+        self.reuse_port = hasattr(socket, "SO_REUSEPORT") if reuse_port is None else reuse_port
+        self.restarts = 0
+        self._ctx = multiprocessing.get_context()
+        self._stats_q = self._ctx.Queue()
+        self._procs: List[Optional[multiprocessing.process.BaseProcess]] = [None] * workers
+        self._latest: Dict[int, Dict[str, int]] = {}       # pid → last report of a live worker
+        self._retired: Dict[str, int] = {}                 # summed counters of exited workers
+        self._backoff = [RESTART_BACKOFF[0]] * workers
+        self._restart_at = [0.0] * workers
+        self._crashes: List[Deque[float]] = [deque(maxlen=5) for _ in range(workers)]
+        self._sock: Optional[socket.socket] = None
+        self.stopping = False
+
+    def start(self) -> "Supervisor":
+        self._sock = socket.socket(socket.AF_INET6 if ":" in self.host else socket.AF_INET)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if self.reuse_port:
+            # Bound, never listening: reserves the port (and resolves port 0) for the workers' group.
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        self._sock.bind((self.host, self.port))
+        if not self.reuse_port:
+            self._sock.listen(BACKLOG)
+        self.port = self._sock.getsockname()[1]
+        for slot in range(self.workers):
+            self._spawn(slot)
+        return self
+
+    def _spawn(self, slot: int) -> None:
+        p = self._ctx.Process(target=_worker_main, name=f"echo-worker-{slot}", daemon=True,
+                              args=(slot, self.host, self.port, None if self.reuse_port else self._sock,
+                                    self.opts, self.grace, self._stats_q))
+        p.start()
+        self._procs[slot] = p
+
+    def _drain(self) -> None:
+        while True:
+            try:
+                _, pid, st = self._stats_q.get_nowait()
+            except queue.Empty:
+                return
+            self._latest[pid] = st
+
+    def _retire(self, pid: int) -> None:
+        st = self._latest.pop(pid, None)
+        for k, v in (st or {}).items():
+            if k == "peak_open":
+                self._retired[k] = max(self._retired.get(k, 0), v)
+            elif k != "open":
+                self._retired[k] = self._retired.get(k, 0) + v
+
+    def poll(self) -> None:
+        """Collect reports and restart any worker that died (call periodically)."""
+        self._drain()
+        now = time.monotonic()
+        for slot, p in enumerate(self._procs):
+            if p is not None and not p.is_alive():
+                p.join()
+                self._drain()
+                self._retire(p.pid)
+                self._procs[slot] = None
+                if self.stopping:
+                    continue
+                crashes = self._crashes[slot]
+                crashes.append(now)
+                # crash‑looping slot (5 exits within a minute): back off exponentially
+                if len(crashes) == crashes.maxlen and now - crashes[0] < 60:
+                    self._backoff[slot] = min(self._backoff[slot] * 2, RESTART_BACKOFF[1])
+                else:
+                    self._backoff[slot] = RESTART_BACKOFF[0]
+                self._restart_at[slot] = now + self._backoff[slot]
+            if self._procs[slot] is None and not self.stopping and now >= self._restart_at[slot]:
+                self._spawn(slot)
+                self.restarts += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Summed counters as of each worker's last report (a killed worker's final second is lost)."""
+        total = {"open": 0, **self._retired}
+        total.setdefault("peak_open", 0)
+        for st in self._latest.values():
+            for k, v in st.items():
+                total[k] = total.get(k, 0) + v             # peak_open: sum of per‑worker peaks
+        total["workers"] = sum(p is not None and p.is_alive() for p in self._procs)
+        total["restarts"] = self.restarts
+        return total
+
+    def worker_stats(self) -> Dict[int, Dict[str, int]]:
+        return dict(self._latest)
+
+    def stop(self) -> None:
+        """SIGTERM every worker (graceful shutdown inside), kill stragglers after `grace`."""
+        self.stopping = True
+        procs = [p for p in self._procs if p is not None]
+        for p in procs:
+            p.terminate()
+        deadline = time.monotonic() + self.grace + 1
+        for p in procs:
+            p.join(max(deadline - time.monotonic(), 0))
+            if p.is_alive():
+                p.kill()
+                p.join()
+        self.poll()
+        if self._sock is not None:
+            self._sock.close()
+
+    def run(self, stats_every: float = 0) -> None:
+        """Supervise until SIGINT / SIGTERM."""
+        stop = []
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stop.append(True))
+        next_report = time.monotonic() + stats_every if stats_every else float("inf")
+        try:
+            while not stop:
+                time.sleep(0.1)
+                self.poll()
+                if time.monotonic() >= next_report:
+                    print(" ".join(f"{k}={v}" for k, v in self.stats().items()), flush=True)
+                    next_report += stats_every
+        finally:
+            self.stop()
+
+# ─────────────────────────── CLI entry ────────────────────────────────
+
+async def _main(args: argparse.Namespace) -> None:
+    server = await EchoServer(args.host, args.port, args.max_connections, args.max_buffer,
+                              args.idle_timeout, args.verbose, args.raw, max_frame=args.max_frame,
+                              big_frame_budget=args.big_frame_budget).start()
+    print(f"Server listening on {server.host}:{server.port}", flush=True)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, lambda: asyncio.ensure_future(server.shutdown(args.grace)))
+        except NotImplementedError:               # Windows: Ctrl+C raises KeyboardInterrupt instead
+            pass
+
+    async def report() -> None:
+        while True:
+            await asyncio.sleep(args.stats_every)
+            print(" ".join(f"{k}={v}" for k, v in server.stats().items()), flush=True)
+
+    reporter = asyncio.create_task(report()) if args.stats_every else None
+    try:
+        await server.serve_forever()
+    finally:
+        if reporter:
+            reporter.cancel()
+        await server.shutdown(args.grace)
+        print("Server stopped:", " ".join(f"{k}={v}" for k, v in server.stats().items()))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Multi-client asyncio echo server.")
+    ap.add_argument("--host", default=HOST)
+    ap.add_argument("--port", type=int, default=PORT)
+    ap.add_argument("--max-connections", type=int, default=MAX_CONNECTIONS)
+    ap.add_argument("--max-buffer", type=int, default=MAX_BUFFER, help="per-connection echo backlog (bytes)")
+    ap.add_argument("--max-frame", type=int, default=MAX_FRAME, help="largest accepted payload (bytes)")
+    ap.add_argument("--big-frame-budget", type=int, default=BIG_FRAME_BUDGET,
+                    help="bytes all connections may hold in partly received large frames (per worker)")
+    ap.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT, help="0 disables")
+    ap.add_argument("--grace", type=float, default=SHUTDOWN_GRACE)
+    ap.add_argument("--stats-every", type=float, default=0, help="print counters every N seconds")
+    ap.add_argument("--raw", action="store_true", help="plain byte echo instead of framed messages")
+    ap.add_argument("-v", "--verbose", action="store_true", help="log every connection and message")
+    ap.add_argument("--workers", type=int, default=1, help="pre-fork N worker processes")
+    ap.add_argument("--no-reuseport", action="store_true", help="workers share one inherited socket")
+    args = ap.parse_args()
+
+    if args.workers > 1:
+        sup = Supervisor(args.workers, args.host, args.port, reuse_port=False if args.no_reuseport else None,
+                         grace=args.grace, max_connections=args.max_connections, max_buffer=args.max_buffer,
+                         idle_timeout=args.idle_timeout, verbose=args.verbose, raw=args.raw,
+                         max_frame=args.max_frame, big_frame_budget=args.big_frame_budget).start()
+        print(f"Server listening on {sup.host}:{sup.port} "
+              f"({sup.workers} workers, {'SO_REUSEPORT' if sup.reuse_port else 'shared socket'})", flush=True)
+        sup.run(args.stats_every)
+        print("Server stopped:", " ".join(f"{k}={v}" for k, v in sup.stats().items()))
+    else:
+        try:
+            asyncio.run(_main(args))
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,249 @@
+"""
+stream_io.py — Constant‑memory readers / writers for large text, CSV, JSONL and XML files
+------------------------------------------------------------------------------
+* The streaming counterparts of `f.read()`, `csv.reader(f)` into a list,
+  `json.load` and `ET.parse`: every reader is a generator that holds one
+  chunk / row / record / element at a time, whatever the file size.
+* read_chunks: text in fixed‑size pieces (the incremental decoder keeps
+  multi‑byte characters whole across chunk boundaries).
+* iter_csv: rows with per‑column type conversion (int, float, bool, dates,
+  any callable); bad values raise CSVRowError with the line number, or the
+  row is skipped. batched() groups any stream into lists for bulk output,
+  write_csv writes rows batch by batch.
+* read_jsonl / write_jsonl: one JSON document per line (JSON Lines).
+* iter_xml: `ET.iterparse` that yields each matching element once it is
+  complete (nested matches included), then clears it and detaches it (and
+  anything else already finished) from its parent, so the tree never grows.
+* Paths ending in `.gz` are read / written through gzip transparently.
+
+Example usage:
+    for row in iter_csv("export.csv", types={"id": int, "amount": float}):
+        ...
+    write_jsonl("out.jsonl", read_jsonl("in.jsonl"))
+    for rec in iter_xml("dump.xml", "record"):
+        print(element_to_dict(rec))
+
+Auther : SpectralZero
+"""
+from __future__ import annotations
+
+import csv, datetime, gzip, json, os
+import xml.etree.ElementTree as ET
+from itertools import islice
+from typing import (Any, Callable, Dict, IO, Iterable, Iterator, List, Mapping, Optional, Sequence, TypeVar,
+                    Union)
+
+CHUNK_SIZE = 1 << 20        # characters per read_chunks() piece
+BATCH_SIZE = 10_000         # rows per batch for batched() / write_csv / write_jsonl
+WRITE_BUFFER = 1 << 20      # bytes of OS‑level write buffering
+
+PathLike = Union[str, "os.PathLike[str]"]
+T = TypeVar("T")
+
+# ─────────────────────────── helpers ──────────────────────────────────
+
+def open_text(path: PathLike, mode: str = "r", encoding: str = "utf-8", newline: Optional[str] = None,
+              errors: str = "strict") -> IO[str]:
+    """open() for text that understands `.gz` and uses a large write buffer."""
+    if os.fspath(path).endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding=encoding, newline=newline, errors=errors)
+    buffering = WRITE_BUFFER if mode[0] in "wa" else -1
+    return open(path, mode, encoding=encoding, newline=newline, errors=errors, buffering=buffering)
+
+
+def batched(items: Iterable[T], size: int = BATCH_SIZE) -> Iterator[List[T]]:
+    """Lists of up to `size` consecutive items (the last one may be shorter)."""
+    if size < 1:
+        raise ValueError("batch size must be at least 1")
+    it = iter(items)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+# ─────────────────────────── text ─────────────────────────────────────
+
+def read_chunks(path: PathLike, size: int = CHUNK_SIZE, encoding: str = "utf-8",
+                errors: str = "strict") -> Iterator[str]:
+    """The file's text in pieces of up to `size` characters."""
+    with open_text(path, encoding=encoding, errors=errors) as f:
+        while True:
+            chunk = f.read(size)
+            if not chunk:
+                return
+            yield chunk
+
+# ─────────────────────────── CSV ──────────────────────────────────────
+
+class CSVRowError(ValueError):
+    """A value that its column's converter rejected."""
+
+    def __init__(self, line: int, column: str, value: str, cause: Exception):
+        super().__init__(f"line {line}, column {column!r}: cannot convert {value!r} ({cause})")
+        self.line, self.column, self.value = line, column, value
+
+
+_TRUE, _FALSE = {"1", "true", "t", "yes", "y"}, {"0", "false", "f", "no", "n"}
+
+
+def to_bool(value: str) -> bool:
+    v = value.strip().lower()
+    if v in _TRUE:
+        return True
+    if v in _FALSE:
+        return False
+    raise ValueError(f"not a boolean: {value!r}")
+
+
+# Short names accepted in `types` besides any callable
+CONVERTERS: Dict[str, Callable[[str], Any]] = {
+    "str": str, "int": int, "float": float, "bool": to_bool,
+    "date": datetime.date.fromisoformat, "datetime": datetime.datetime.fromisoformat,
+    "json": json.loads,
+}
+
+
+def iter_csv(path: PathLike, types: Optional[Mapping[str, Union[str, Callable[[str], Any]]]] = None, *,
+             as_dict: bool = True, skip_bad: bool = False, empty_as_none: bool = True,
+             encoding: str = "utf-8", **fmtparams) -> Iterator[Union[Dict[str, Any], List[Any]]]:
+    """
+    Rows of a CSV file with a header line. `types` maps column name → converter
+    (callable or a CONVERTERS name); other columns stay str. Empty cells become
+    None in typed columns when `empty_as_none`. A failed conversion raises
+    CSVRowError, or drops the row when `skip_bad`. Rows come out as dicts, or
+    as lists in header order with `as_dict=False` (cheaper).
+    """
+    with open_text(path, encoding=encoding, newline="") as f:
+        reader = csv.reader(f, **fmtparams)
+        header = next(reader, None)
+        if header is None:
+            return
+        types = types or {}
+        unknown = set(types) - set(header)
+        if unknown:
+            raise KeyError(f"columns not in header: {sorted(unknown)}")
+        convert = []                              # (index, name, converter) for typed columns only
+        for i, name in enumerate(header):
+            t = types.get(name)
+            if t is not None:
+                convert.append((i, name, CONVERTERS[t] if isinstance(t, str) else t))
+        for row in reader:
+            if not row:
+                continue
+            try:
+                for i, name, fn in convert:
+                    value = row[i]
+                    row[i] = None if empty_as_none and value == "" else fn(value)
+            except (ValueError, TypeError, IndexError) as e:
+                if skip_bad:
+                    continue
+                raise CSVRowError(reader.line_num, name, row[i] if i < len(row) else "", e) from None
+            yield dict(zip(header, row)) if as_dict else row
+
+
+def write_csv(path: PathLike, rows: Iterable[Union[Mapping[str, Any], Sequence[Any]]],
+              fieldnames: Optional[Sequence[str]] = None, batch_size: int = BATCH_SIZE,
+              encoding: str = "utf-8", **fmtparams) -> int:
+    """
+    Write rows (dicts, or sequences after a `fieldnames` header) in batches;
+    the header comes from `fieldnames` or the first dict's keys. Returns the
+    number of rows written.
+    """
+    count = 0
+    with open_text(path, "w", encoding=encoding, newline="") as f:
+        writer = csv.writer(f, **fmtparams)
+        for batch in batched(rows, batch_size):
+            if count == 0:
+                if fieldnames is None and isinstance(batch[0], Mapping):
+                    fieldnames = list(batch[0])
+                if fieldnames is not None:
+                    writer.writerow(fieldnames)
+            if fieldnames is not None and isinstance(batch[0], Mapping):
+                batch = [[r.get(k) for k in fieldnames] for r in batch]
+            writer.writerows(batch)
+            count += len(batch)
+    return count
+
+# ─────────────────────────── JSON Lines ───────────────────────────────
+
+def read_jsonl(path: PathLike, skip_bad: bool = False, encoding: str = "utf-8") -> Iterator[Any]:
+    """One decoded document per non‑blank line; bad lines raise (with the line number) or are skipped."""
+    decode = json.JSONDecoder().decode
+    with open_text(path, encoding=encoding) as f:
+        for n, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield decode(line)
+            except json.JSONDecodeError as e:
+                if not skip_bad:
+                    raise json.JSONDecodeError(f"line {n}: {e.msg}", e.doc, e.pos) from None
+
+
+def write_jsonl(path: PathLike, records: Iterable[Any], append: bool = False, batch_size: int = BATCH_SIZE,
+                encoding: str = "utf-8", **dumps_kwargs) -> int:
+    """Write each record as one compact JSON line; returns the number written."""
+    dumps_kwargs.setdefault("ensure_ascii", False)
+    dumps_kwargs.setdefault("separators", (",", ":"))
+    encode = json.JSONEncoder(**dumps_kwargs).encode
+    count = 0
+    with open_text(path, "a" if append else "w", encoding=encoding) as f:
+        for batch in batched(records, batch_size):
+            f.write("\n".join(map(encode, batch)))
+            f.write("\n")
+            count += len(batch)
+    return count
+
+# ─────────────────────────── XML ──────────────────────────────────────
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_xml(source: Union[PathLike, IO[bytes]], tag: str) -> Iterator[ET.Element]:
+    """
+    Each complete element named `tag` (a `{namespace}name` must match exactly;
+    a bare name matches in any namespace), in the order they end — so a match
+    nested in another match comes out before its ancestor. An outermost match
+    is cleared and detached after the consumer moves on, together with any
+    other finished element outside a match, so memory stays flat; nested
+    matches stay attached to it until then. Copy what you need before the
+    outermost match is released.
+    """
+    if not hasattr(source, "read") and os.fspath(source).endswith(".gz"):
+        with gzip.open(source, "rb") as f:
+            yield from iter_xml(f, tag)
+        return
+    match = (lambda t: t == tag) if tag.startswith("{") else (lambda t: _local(t) == tag)
+    stack: List[ET.Element] = []
+    inside = 0                                    # how many open matching elements we are in
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            if match(elem.tag):
+                inside += 1
+            continue
+        stack.pop()
+        if match(elem.tag):
+            inside -= 1
+            yield elem
+        if inside:
+            continue                              # part of a match still being built: keep it
+        elem.clear()
+        if not stack:
+            return                                # root closed
+        stack[-1].remove(elem)                    # earlier finished siblings are gone, so this is child 0
+
+
+def element_to_dict(elem: ET.Element) -> Dict[str, Any]:
+    """Attributes plus child `name: text` pairs (repeated children become lists)."""
+    out: Dict[str, Any] = dict(elem.attrib)
+    for child in elem:
+        key, text = _local(child.tag), (child.text or "").strip()
+        if key in out:
+            prev = out[key]
+            out[key] = prev + [text] if isinstance(prev, list) else [prev, text]
+        else:
+            out[key] = text
+    return out
@@ -1,19 +1,23 @@
 """
-Python examples 
+Python examples
 for reading and writing .txt, .csv, .xml, and .json files
 
 Created on: 2025-11-08
 By: Jamal Alqbail
 Id: 3200606025
 """
-import csv
-import json
 import xml.etree.ElementTree as ET
 
+from stream_io import iter_csv, iter_xml, read_chunks, read_jsonl, write_csv, write_jsonl
+
 """
 Note: i have used with statement to handle file operations,
-it closes the file automatically after the block is executed. 
+it closes the file automatically after the block is executed.
 Much easier :))
+
+Reading goes through stream_io: every reader hands back one piece / row /
+record / element at a time, so the same code works on multi-GB files
+(f.read(), json.load and ET.parse load the whole file into memory).
 """
 
 
@@ -24,55 +28,52 @@ with open("example.txt", "w") as f:
     f.write("Hello, world!\nThis is a text file.")
 
 print("\n----- TXT File Example (Reading) -----")
-# Read from TXT file
-with open("example.txt", "r") as f:
-    content = f.read()
-    print(content)
+# Read from TXT file, one chunk at a time instead of f.read()
+for chunk in read_chunks("example.txt"):
+    print(chunk, end="")
+print()
 
 
 # -------- CSV File Example --------
 print("\n----- CSV File Example (Writing) -----")
-# Write to CSV file
-with open("example.csv", "w", newline="") as f:
-    writer = csv.writer(f)
-    writer.writerow(["Name", "Age", "ID"])
-    writer.writerow(["Fadi", 23, "3110606025"])
-    writer.writerow(["Khalid", 25, "3321606026"])
+# Write to CSV file (header first, rows are written in batches)
+write_csv("example.csv", [
+    {"Name": "Fadi", "Age": 23, "ID": "3110606025"},
+    {"Name": "Khalid", "Age": 25, "ID": "3321606026"},
+])
 
 print("\n----- CSV File Example (Reading) -----")
-# Read from CSV file
-with open("example.csv", "r") as f:
-    reader = csv.reader(f)
-    for row in reader:
-        print(row)
+# Read from CSV file row by row, Age converted to int
+for row in iter_csv("example.csv", types={"Age": int}):
+    print(row)
 
 
 # -------- JSON File Example --------
-data = {"name": "Jamal", "age": 24, "skills": ["Python", "Security"]}
+# One JSON object per line (JSON Lines), so records can be read one at a time
+data = [{"name": "Jamal", "age": 24, "skills": ["Python", "Security"]},
+        {"name": "Fadi", "age": 23, "skills": ["C", "Networking"]}]
 print("\n----- JSON File Example (Writing) -----")
-# Write to JSON file
-with open("example.json", "w") as f:
-    json.dump(data, f, indent=2)
+# Write to JSON Lines file
+write_jsonl("example.jsonl", data)
 
 print("\n----- JSON File Example (Reading) -----")
-# Read from JSON file
-with open("example.json", "r") as f:
-    loaded = json.load(f)
-    print(loaded)
+# Read from JSON Lines file, one record at a time instead of json.load
+for record in read_jsonl("example.jsonl"):
+    print(record)
 
 
 # -------- XML File Example --------
 print("\n----- XML File Example (Writing) -----")
 # Write XML file
-root = ET.Element("person")
-ET.SubElement(root, "name").text = "Jamal"
-ET.SubElement(root, "age").text = "24"
+root = ET.Element("people")
+person = ET.SubElement(root, "person")
+ET.SubElement(person, "name").text = "Jamal"
+ET.SubElement(person, "age").text = "24"
 tree = ET.ElementTree(root)
 tree.write("example.xml")
 
 print("\n----- XML File Example (Reading) -----")
-# Read XML file
-tree = ET.parse("example.xml")
-root = tree.getroot()
-for child in root:
-    print(child.tag, ":", child.text)
+# Read XML file one <person> at a time instead of ET.parse
+for person in iter_xml("example.xml", "person"):
+    for child in person:
+        print(child.tag, ":", child.text)